@@ -141,6 +141,8 @@ class Agent:
             "structures": []
         }
 
+        # Czy w obozie stoi ognisko - aktualizowane przy budowie zamiast przeszukiwania struktur co klatkę
+        self.has_fire = False
         self.init_camp_structures()
 
         self.knowledge = knowledge
@@ -185,6 +187,8 @@ class Agent:
         )
         self.camp["structures"].append(new_struct)
         self.camp["level"] += 1
+        if structure_type == "fire":
+            self.has_fire = True
         return True, f"Zbudowano {recipe['name']}"
 
     def calculate_carry_capacity(self):
@@ -606,13 +610,11 @@ class Agent:
         self.day_progress += delta_time / SECONDS_PER_DAY
         self.is_night = self.day_progress >= NIGHT_START
 
-        has_fire = any(s.type == "fire" for s in self.camp["structures"])
-
         if self.is_night:
             if not self.in_camp:
                 self.hp -= NIGHT_HP_DRAIN * delta_time
                 self.warmth -= 0.1 * delta_time
-            elif not has_fire: # In camp but no fire
+            elif not self.has_fire: # In camp but no fire
                 self.warmth -= 0.05 * delta_time
 
 
@@ -1,6 +1,7 @@
 # main.py
 import pygame
 import json
+from collections import deque
 from settings import SCREEN_WIDTH, SCREEN_HEIGHT, FPS, BLACK
 from agent import Agent, AIKnowledge
 from world import WorldMap
@@ -26,8 +27,8 @@ class Game:
         self.running = True
         self.paused = False
 
-        self.log = []
         self.max_log = 8
+        self.log = deque(maxlen=self.max_log)
 
         self.simulation_active = False
         self.action_cooldown = 0
@@ -36,16 +37,15 @@ class Game:
     def start_new_attempt(self):
         self.world_map = WorldMap()
         self.agent = Agent(self.knowledge, self.world_map, self.add_log)
-        self.log = []
+        self.log = deque(maxlen=self.max_log)
         self.add_log(f"=== PRÓBA #{self.knowledge.attempts + 1} ===")
         self.add_log(f"Rekord: {self.knowledge.best_survival_days}/180 dni")
         self.simulation_active = True
         self.action_cooldown = 0
 
     def add_log(self, message):
-        self.log.insert(0, message)
-        if len(self.log) > self.max_log:
-            self.log.pop()
+        # Najnowszy wpis na początku; deque z maxlen sam odrzuca najstarszy
+        self.log.appendleft(message)
 
     def simulate_tick(self, delta_time):
         if not self.agent or not self.agent.alive:
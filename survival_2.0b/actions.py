@@ -0,0 +1,79 @@
+"""Rejestr typów akcji z numerami całkowitymi - wspólny dla decyzji agenta, tablicy Q i wykonania akcji.
+
+Numer akcji to indeks w ACTION_TYPES i jednocześnie kolumna w Q_ACTIONS, więc decyzja, klucz
+tablicy Q i wywołanie obsługi to zwykłe indeksowanie. Parametry (surowiec, przepis, struktura)
+są zapisane w typie akcji, a nie sklejane i rozcinane z napisów przy każdym ruchu.
+"""
+import numbers
+
+ACTIONS = ["eat", "drink", "rest", "deposit", "craft_stone_axe", "build_fire", "explore",
+           "find_resource_wood", "find_resource_stone", "find_resource_food",
+           "find_resource_water", "find_resource_fiber"]
+# Wszystkie klucze akcji, które mogą trafić do tablicy Q (ai_decide_action wybiera też powrót i naprawy)
+Q_ACTIONS = ACTIONS + ["move_to_camp", "repair_tool", "repair_structure"]
+
+
+class ActionType:
+    """Typ akcji: klucz w tablicy Q, nazwa metody Agent, która ją wykonuje, i jej parametr."""
+
+    __slots__ = ("id", "key", "handler", "param", "exp_key", "records_history", "logs_result")
+
+    def __init__(self, key, handler, param=None, exp_key=None, records_history=True, logs_result=True):
+        self.id = Q_ACTIONS.index(key)
+        self.key = key
+        self.handler = handler
+        self.param = param
+        # Nazwa akcji, pod którą liczone jest doświadczenie (gain_exp) i częstość
+        self.exp_key = exp_key or key
+        # Naprawy nie trafiają do historii akcji (i nie liczą się do wykrywania pętli)
+        self.records_history = records_history
+        # Wynik trafia do dziennika symulacji (ruch i eksploracja - nie)
+        self.logs_result = logs_result
+
+    def __repr__(self):
+        return f"ActionType({self.id}, {self.key!r})"
+
+
+def _action_type(key):
+    if key.startswith("find_resource_"):
+        resource = key[len("find_resource_"):]
+        return ActionType(key, "_act_find_resource", resource, exp_key=f"gather_{resource}")
+    if key.startswith("craft_"):
+        return ActionType(key, "_act_craft", key[len("craft_"):])
+    if key.startswith("build_"):
+        return ActionType(key, "_act_build", key[len("build_"):])
+    if key.startswith("repair_"):
+        return ActionType(key, "_act_" + key, records_history=False)
+    if key in ("move_to_camp", "explore"):
+        return ActionType(key, "_act_" + key, logs_result=False)
+    return ActionType(key, "_act_" + key)
+
+
+# Napisy są rozbierane raz, przy imporcie
+ACTION_TYPES = tuple(_action_type(key) for key in Q_ACTIONS)
+ACTION_IDS = {action_type.key: action_type.id for action_type in ACTION_TYPES}
+FIND_RESOURCE_IDS = {action_type.param: action_type.id for action_type in ACTION_TYPES
+                     if action_type.handler == "_act_find_resource"}
+
+EAT = ACTION_IDS["eat"]
+DRINK = ACTION_IDS["drink"]
+REST = ACTION_IDS["rest"]
+EXPLORE = ACTION_IDS["explore"]
+BUILD_FIRE = ACTION_IDS["build_fire"]
+MOVE_TO_CAMP = ACTION_IDS["move_to_camp"]
+REPAIR_TOOL = ACTION_IDS["repair_tool"]
+REPAIR_STRUCTURE = ACTION_IDS["repair_structure"]
+
+
+def action_id(action):
+    """Numer akcji dla numeru, klucza tablicy Q albo dawnej krotki ("find_resource", "wood").
+
+    None dla akcji spoza rejestru.
+    """
+    if isinstance(action, numbers.Integral):
+        return int(action)
+    if isinstance(action, tuple):
+        if action[0] == "move_to_camp":
+            return MOVE_TO_CAMP
+        return FIND_RESOURCE_IDS.get(action[1]) if action[0] == "find_resource" else None
+    return ACTION_IDS.get(action)
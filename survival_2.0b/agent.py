@@ -1,10 +1,22 @@
+import copy
 import random
 import math
 from datetime import datetime
+from actions import (ACTIONS, ACTION_IDS, ACTION_TYPES, BUILD_FIRE, DRINK, EAT, EXPLORE, FIND_RESOURCE_IDS,
+                     MOVE_TO_CAMP, Q_ACTIONS, REPAIR_STRUCTURE, REPAIR_TOOL, REST, action_id)
 from ai_system import QLearningSystem
-from world import CampStructure, CraftingSystem
+from behavior_stats import ActionWindow, DecayedCounters
+from derived_stats import compute_effective_stats
+from events import CRITICAL, DEBUG, INFO, WARNING, EdgeTrigger, EventLog, Message
+from exploration import ExplorationMap, sight_radius
+from recipe_planner import BUILD, RecipeMatrix, plan_gathering
+from resources import ResourceVector
+from world import HARVEST_MAX, HARVEST_MIN, CampStructure, CraftingSystem
 
 NIGHT_START = 0.6
+# Sloty ekwipunku, do których _act_craft zakłada skraftowany przedmiot
+CRAFT_SLOTS = ("tool", "weapon")
+
 
 class DevelopmentPath:
     def __init__(self, name, description, bonuses):
@@ -73,7 +85,24 @@ class SkillTree:
 
 
 class Agent:
-    def __init__(self, knowledge, world_map, add_log_func, pathfinder):
+    # Stałe pola zamiast __dict__ - mniej pamięci na agenta i szybszy dostęp do atrybutów
+    __slots__ = (
+        "action_frequency", "action_history", "actions", "add_log", "alive", "base_carry_capacity", "camp",
+        "caution_penalty_score", "chosen_path", "consecutive_camp_days", "crafting", "current_action",
+        "danger_signals",
+        "current_carry_capacity", "current_day", "daily_profile", "day_progress", "days_without_building",
+        "days_without_exploration", "death_cause", "development_paths", "dexterity", "discovered_tiles",
+        "equipment", "excessive_gathering_count", "exp", "exp_to_next", "hp", "hunger", "idle_timer",
+        "in_camp", "intelligence", "inventory", "is_night", "knowledge", "learned_skills", "level", "max_hp",
+        "max_stamina", "memory_context", "move_cooldown", "move_speed", "move_target", "path", "pathfinder",
+        "pending_skill_choice", "perception", "planner", "position_history", "q_learning", "recipe_matrix",
+        "reward_values", "skill_points", "skill_tree", "stamina", "stat_points", "strength", "thirst", "thoughts",
+        "vitality", "warmth", "x", "y", "_stats",
+    )
+
+    def __init__(self, knowledge, world_map, add_log_func, pathfinder, q_learning=None, headless=False):
+        # Pamięć podręczna EffectiveStats (derived_stats.py) - liczona przy pierwszym odczycie
+        self._stats = None
         self.pathfinder = pathfinder
         self.path = []
         self.strength = 5
@@ -88,7 +117,8 @@ class Agent:
         self.exp = 0
         self.exp_to_next = 100
         self.stat_points = 0
-        self.action_frequency = {}
+        # Częstość akcji dla malejących zysków EXP i wyboru ścieżki, wygasa z czasem gry
+        self.action_frequency = DecayedCounters(half_life=3.0)
 
         self.development_paths = {
             "Combat": DevelopmentPath("Combat", "Focus on fighting and defense.", {"damage_bonus": 0.15, "defense_bonus": 0.1}),
@@ -122,14 +152,7 @@ class Agent:
         self.base_carry_capacity = 10
         self.current_carry_capacity = self.base_carry_capacity + self.strength
 
-        self.inventory = {
-            "wood": 0,
-            "stone": 0,
-            "food": 0,
-            "water": 0,
-            "fiber": 0,
-            "metal": 0
-        }
+        self.inventory = ResourceVector.full()
 
         self.equipment = {
             "weapon": None,
@@ -140,7 +163,7 @@ class Agent:
 
         self.camp = {
             "level": 1,
-            "storage": {},
+            "storage": ResourceVector(),
             "structures": []
         }
 
@@ -148,6 +171,7 @@ class Agent:
 
         self.knowledge = knowledge
         self.crafting = CraftingSystem()
+        self.recipe_matrix = RecipeMatrix(self.crafting)
         self.current_day = 0
         self.day_progress = 0.0
         self.is_night = False
@@ -159,8 +183,12 @@ class Agent:
         # Movement target: if not None agent moves towards it in update()
         self.move_target = None
 
-        self.thoughts = []
-        self.action_history = []
+        # headless: myśli są tylko liczone, bez formatowania i przechowywania (trening wsadowy)
+        self.thoughts = EventLog(5, headless=headless)
+        # Ostrzeżenia o zagrożeniu raz na wejście w stan, najwyżej co pół doby
+        self.danger_signals = EdgeTrigger(cooldown=0.5)
+        # Okno ostatnich akcji do wykrywania pętli
+        self.action_history = ActionWindow(10)
         self.memory_context = {}
         self.position_history = []
 
@@ -170,10 +198,9 @@ class Agent:
         self.excessive_gathering_count = 0
         self.consecutive_camp_days = 0
 
-        self.discovered_tiles = set()
-        self.actions = ["eat", "drink", "rest", "deposit", "craft_stone_axe", "build_fire", "explore",
-                        "find_resource_wood", "find_resource_stone", "find_resource_food",
-                        "find_resource_water", "find_resource_fiber"]
+        # Siatka bitów odkrytych pól; krok odkrywa koło o promieniu wzroku z percepcji
+        self.discovered_tiles = ExplorationMap(world_map.width, world_map.height)
+        self.actions = list(ACTIONS)
         self.reward_values = {
             "gather_food": 5, "gather_water": 5, "gather_wood": 3, "gather_stone": 3, "gather_fiber": 3, "gather_metal": 4,
             "build_shelter": 15, "build_fire": 18, "build_workbench": 20, "build_storage": 22, "build_wall": 25,
@@ -184,32 +211,41 @@ class Agent:
             "night_outside_camp": -40, "death_hunger": -150, "death_thirst": -150, "death_cold": -120, "death_hp": -100,
             "inventory_full_waste": -8, "too_cautious": -15
         }
-        self.q_learning = QLearningSystem(self.actions)
-
-    def _update_action_frequency(self):
-        # "Forget" old actions by reducing their frequency count
-        for action in list(self.action_frequency.keys()):
-            self.action_frequency[action] -= 0.2
-            if self.action_frequency[action] <= 0:
-                del self.action_frequency[action]
+        self.q_learning = q_learning if q_learning is not None else QLearningSystem(self.actions)
+        # Np. MCTSPlanner z mcts.py - zastępuje wybór akcji z tablicy Q i profili dnia
+        self.planner = None
 
     def init_camp_structures(self):
         self.camp["structures"].append(
             CampStructure("Schronienie", "shelter", 2, 2, "BROWN", 100)
         )
+        self.invalidate_stats()
+
+    def effective_stats(self):
+        if self._stats is None:
+            self._stats = compute_effective_stats(self)
+        return self._stats
+
+    def invalidate_stats(self):
+        """Wołane po każdej zmianie atrybutów, umiejętności, ścieżki, ekwipunku lub struktur."""
+        self._stats = None
+
+    def equip(self, slot, item):
+        self.equipment[slot] = item
+        self.invalidate_stats()
 
     def build_structure(self, structure_type, camp_x, camp_y):
         recipe = self.crafting.structure_recipes.get(structure_type)
         if not recipe:
-            return False, "Nieznana struktura"
+            return False, Message("Nieznana struktura")
         if self.level < recipe["level_req"]:
-            return False, f"Wymaga poziomu {recipe['level_req']}"
+            return False, Message("Wymaga poziomu {}", recipe["level_req"])
         for res, amt in recipe["requirements"].items():
             if self.inventory.get(res, 0) < amt:
-                return False, f"Brak {res}"
+                return False, Message("Brak {}", res)
         for struct in self.camp["structures"]:
             if struct.x == camp_x and struct.y == camp_y:
-                return False, "Pole zajęte"
+                return False, Message("Pole zajęte")
         for res, amt in recipe["requirements"].items():
             self.inventory[res] -= amt
         new_struct = CampStructure(
@@ -222,17 +258,35 @@ class Agent:
         )
         self.camp["structures"].append(new_struct)
         self.camp["level"] += 1
-        return True, f"Zbudowano {recipe['name']}"
+        self.invalidate_stats()
+        return True, Message("Zbudowano {}", recipe["name"])
 
     def calculate_carry_capacity(self):
-        capacity = self.base_carry_capacity + self.strength
-        if self.equipment["backpack"]:
-            capacity += self.equipment["backpack"].stats_bonus.get("carry_capacity", 0)
-        self.current_carry_capacity = capacity
-        return capacity
+        self.current_carry_capacity = self.effective_stats().carry_capacity
+        return self.current_carry_capacity
+
+    def clone(self):
+        """Kopia agenta do symulacji w przód: własne liczniki, listy i magazyn.
+
+        Wiedza, tablica Q, pathfinder oraz obiekty struktur i narzędzi są współdzielone z oryginałem.
+        """
+        other = copy.copy(self)
+        other.inventory = self.inventory.copy()
+        other.camp = dict(self.camp, storage=self.camp["storage"].copy(), structures=list(self.camp["structures"]))
+        other.equipment = dict(self.equipment)
+        other.learned_skills = dict(self.learned_skills)
+        other.action_frequency = self.action_frequency.copy()
+        other.action_history = self.action_history.copy()
+        other.memory_context = dict(self.memory_context)
+        other.discovered_tiles = self.discovered_tiles.copy()
+        other.thoughts = self.thoughts.copy()
+        other.danger_signals = self.danger_signals.copy()
+        for name in ("path", "position_history"):
+            setattr(other, name, list(getattr(self, name)))
+        return other
 
     def get_total_inventory_size(self):
-        return sum(self.inventory.values())
+        return self.inventory.total
 
     def can_carry_more(self, amount=1):
         return self.get_total_inventory_size() + amount <= self.current_carry_capacity
@@ -242,12 +296,13 @@ class Agent:
         int_bonus = 1.0 + (self.intelligence * 0.02)
 
         # Dynamic EXP cost based on action frequency
-        frequency_penalty = self.action_frequency.get(action_type, 0)
+        now = self.elapsed_days()
+        frequency_penalty = self.action_frequency.get(action_type, now)
         exp_multiplier = max(0.1, 1.0 - (frequency_penalty * 0.1)) # Diminishing returns
 
         # Apply development path bonus
-        if self.chosen_path and "gather" in action_type:
-            exp_multiplier += self.chosen_path.get_bonus("gathering_bonus")
+        if "gather" in action_type:
+            exp_multiplier += self.effective_stats().gathering_exp_bonus
 
         total_exp = int(amount * day_bonus * int_bonus * exp_multiplier)
         self.exp += total_exp
@@ -257,7 +312,7 @@ class Agent:
             self.level_up()
 
         # Record this action for frequency tracking
-        self.action_frequency[action_type] = self.action_frequency.get(action_type, 0) + 1
+        self.action_frequency.add(action_type, now)
 
         self.knowledge.record_action(self.current_day, action_type, True, {"exp": total_exp})
         return total_exp
@@ -268,13 +323,13 @@ class Agent:
             self.daily_profile = "Emergency Day"
             return
 
-        death_history = [d['cause'] for d in self.knowledge.death_analysis[-3:]]
+        death_history = [d['cause'] for d in self.knowledge.recent_death_analyses(3)]
         if len(death_history) >= 2 and len(set(death_history)) == 1:
             # If last 2 deaths have the same cause, be defensive
             self.daily_profile = "Defensive Day"
             return
 
-        if sum(self.camp["storage"].values()) < 20:
+        if self.camp["storage"].total < 20:
             self.daily_profile = "Aggressive Day"
         elif any(s.durability < s.max_durability * 0.5 for s in self.camp["structures"]):
             self.daily_profile = "Maintenance Day"
@@ -286,7 +341,7 @@ class Agent:
     def _choose_development_path(self):
         if self.level >= 5 and not self.chosen_path:
             action_counts = {"Combat": 0, "Survival": 0, "Nomad": 0}
-            for action, freq in self.action_frequency.items():
+            for action, freq in self.action_frequency.items(self.elapsed_days()):
                 if "gather" in action or "craft" in action or "build" in action:
                     action_counts["Survival"] += freq
                 elif "explore" in action or "move" in action:
@@ -296,7 +351,8 @@ class Agent:
 
             chosen_path_name = max(action_counts, key=action_counts.get)
             self.chosen_path = self.development_paths[chosen_path_name]
-            self.add_log(f"Wybrano ścieżkę rozwoju: {self.chosen_path.name}!")
+            self.invalidate_stats()
+            self.add_log("Wybrano ścieżkę rozwoju: {}!", self.chosen_path.name)
 
     def level_up(self):
         self.level += 1
@@ -307,16 +363,16 @@ class Agent:
         if self.level % 6 == 0:
             self.skill_points += 1
             self.pending_skill_choice = True
-            self.add_log(f"Otrzymano 1 punkt umiejętności!")
+            self.add_log("Otrzymano 1 punkt umiejętności!")
         self.auto_distribute_stats()
         self.max_stamina = 100 + (self.vitality * 5)
         self.max_hp = self.vitality * 20
         self.hp = min(self.hp, self.max_hp)
-        self.add_log(f"AWANS! Poziom {self.level}! Otrzymano 5 pkt atrybutów.")
+        self.add_log("AWANS! Poziom {}! Otrzymano 5 pkt atrybutów.", self.level)
 
     def auto_distribute_stats(self):
         # Adaptive progression based on death history
-        death_history = [d['cause'] for d in self.knowledge.death_analysis[-3:]] # Last 3 deaths
+        death_history = [d['cause'] for d in self.knowledge.recent_death_analyses(3)] # Last 3 deaths
 
         while self.stat_points > 0:
             priorities = {
@@ -347,12 +403,11 @@ class Agent:
             stat = random.choice(choices)
             setattr(self, stat, getattr(self, stat) + 1)
             self.stat_points -= 1
+        self.invalidate_stats()
         self.calculate_carry_capacity()
 
-    def think(self, thought):
-        self.thoughts.append(thought)
-        if len(self.thoughts) > 5:
-            self.thoughts.pop(0)
+    def think(self, thought, *args, level=INFO):
+        self.thoughts.add(thought, *args, level=level)
 
     def reflect_on_day(self):
         if self.current_day == 1:
@@ -370,19 +425,25 @@ class Agent:
 
     def think_about_action(self, action):
         if "gather" in action:
-            self.think(f"🍎 Potrzebuję jedzenia. Idę zbierać.")
+            self.think("🍎 Potrzebuję jedzenia. Idę zbierać.")
         elif "rest" in action:
             self.think("😴 Jestem wykończony. Czas na odpoczynek.")
         elif "build" in action:
             self.think("🏗️ Buduję ognisko. Rozwój obozu to klucz.")
 
+    def elapsed_days(self):
+        """Czas gry w dniach (z ułamkiem bieżącego dnia) - znacznik dla liczników i wyzwalaczy."""
+        return self.current_day + self.day_progress
+
     def check_dangerous_situation(self):
-        if self.hunger < 15:
-            self.think("🚨 KRYTYCZNY GŁÓD! Natychmiastowe działanie!")
-        if self.thirst < 15:
-            self.think("💀 Woda TERAZ! To kwestia życia lub śmierci!")
-        if self.is_night and not self.in_camp:
-            self.think("⚠️ Ostatnim razem spędziłem noc na zewnątrz i... nie przeżyłem.")
+        signals = self.danger_signals
+        now = self.elapsed_days()
+        if signals.rising("hunger", self.hunger < 15, now):
+            self.think("🚨 KRYTYCZNY GŁÓD! Natychmiastowe działanie!", level=CRITICAL)
+        if signals.rising("thirst", self.thirst < 15, now):
+            self.think("💀 Woda TERAZ! To kwestia życia lub śmierci!", level=CRITICAL)
+        if signals.rising("night_out", self.is_night and not self.in_camp, now):
+            self.think("⚠️ Ostatnim razem spędziłem noc na zewnątrz i... nie przeżyłem.", level=WARNING)
 
     def apply_skill_effects(self):
         # Reset bonuses to base values before applying skill effects
@@ -396,8 +457,7 @@ class Agent:
             # For example, hunger/thirst reduction would be applied in the update method
 
     def update_discovered_tiles(self, x, y):
-        if (x, y) not in self.discovered_tiles:
-            self.discovered_tiles.add((x, y))
+        if self.discovered_tiles.reveal(x, y, sight_radius(self.perception)):
             self.days_without_exploration = 0
 
     def check_caution_penalties(self):
@@ -406,33 +466,33 @@ class Agent:
             self.hp -= 5
             self.stamina -= 10
             self.caution_penalty_score += 1
-            self.think("😰 Stagnacja! Muszę coś odkrywać!")
+            self.think("😰 Stagnacja! Muszę coś odkrywać!", level=WARNING)
 
         # Kara #2: Gromadzenie bez budowania
-        total_resources = sum(self.camp["storage"].values())
+        total_resources = self.camp["storage"].total
         if total_resources > 80 and len(self.camp["structures"]) < 4 and self.current_day < 20:
             self.hunger -= 10
             self.thirst -= 10
             self.caution_penalty_score += 1
-            self.think("🤔 Zbyt dużo gromadzę, a za mało buduję!")
+            self.think("🤔 Zbyt dużo gromadzę, a za mało buduję!", level=WARNING)
 
         # Kara #3: Zbyt długo w obozie
         if self.consecutive_camp_days >= 4 and self.current_day > 5:
             self.hp -= 8
             self.caution_penalty_score += 1
-            self.think("⚠️ Siedzenie w obozie mnie zabije! Muszę działać!")
+            self.think("⚠️ Siedzenie w obozie mnie zabije! Muszę działać!", level=WARNING)
 
         # Kara #4: Zbyt wolny rozwój
         if self.level < (self.current_day / 3) and self.current_day >= 10:
             self.max_hp -= 10
             self.caution_penalty_score += 1
-            self.think(f"📊 Powinienem być poziom {self.current_day // 3}, a jestem {self.level}!")
+            self.think("📊 Powinienem być poziom {}, a jestem {}!", self.current_day // 3, self.level, level=WARNING)
 
         # Kara #5: Mało odkrytych pól
         if len(self.discovered_tiles) < (self.current_day * 3) and self.current_day >= 5:
             self.stamina -= 15
             self.caution_penalty_score += 1
-            self.think(f"🗺️ Odkryłem tylko {len(self.discovered_tiles)} pól! Za mało!")
+            self.think("🗺️ Odkryłem tylko {} pól! Za mało!", len(self.discovered_tiles), level=WARNING)
 
     def auto_choose_skill(self):
         if self.skill_points > 0:
@@ -454,9 +514,10 @@ class Agent:
 
             if skill.upgrade():
                 self.learned_skills[skill.name] = skill
+                self.invalidate_stats()
                 self.skill_points -= 1
                 self.pending_skill_choice = False
-                self.add_log(f"Wybrano umiejętność: {skill.name} Lvl {skill.level}")
+                self.add_log("Wybrano umiejętność: {} Lvl {}", skill.name, skill.level)
                 self.apply_skill_effects()
 
     def start_move(self, target_x, target_y, world_map):
@@ -515,10 +576,7 @@ class Agent:
             self.position_history.pop(0)
         self.update_discovered_tiles(self.x, self.y)
         self.move_cooldown = self.move_speed
-        stamina_cost = 2
-        if self.chosen_path:
-            stamina_cost *= (1.0 - self.chosen_path.get_bonus("stamina_reduction"))
-        self.stamina = max(0, self.stamina - stamina_cost)
+        self.stamina = max(0, self.stamina - self.effective_stats().move_stamina_cost)
         self.idle_timer = 0
         self.in_camp = world_map.is_in_camp(self.x, self.y)
 
@@ -567,55 +625,64 @@ class Agent:
         if self.pending_skill_choice:
             self.auto_choose_skill()
             # Return a default safe action while choosing skill
-            return "rest"
+            return REST
 
         # Loop detection
-        if len(self.action_history) > 10:
-            last_10 = self.action_history[-10:]
-            if len(set(last_10)) <= 2: # Repetitive loop
-                state = self.q_learning.get_state(self, world_map)
-                for action in set(last_10):
-                    self.q_learning.update_q_table(state, action, -20, state) # Penalize
-                return "explore" # Break the loop
+        history = self.action_history
+        if self.planner is None and history.total > history.size and history.distinct <= 2: # Repetitive loop
+            state = self.q_learning.get_state(self, world_map)
+            for action in history.distinct_actions():
+                self.q_learning.remember(state, Q_ACTIONS[action], -20, state) # Penalize
+            return EXPLORE # Break the loop
 
         # Emergency overrides for Q-learning decisions
         if self.hunger < 15 and self.inventory["food"] > 0:
-            return "eat"
+            return EAT
         if self.thirst < 15 and self.inventory["water"] > 0:
-            return "drink"
+            return DRINK
         if self.hp < self.max_hp * 0.2 and self.in_camp:
-            return "rest"
+            return REST
         if self.day_progress > NIGHT_START and not self.in_camp:
-             return ("move_to_camp", world_map.camp_x, world_map.camp_y)
+             return MOVE_TO_CAMP
+
+        # Planer (np. MCTS) zastępuje profile dnia i tablicę Q, ale nie reguły awaryjne - dogrywki też je zakładają
+        if self.planner is not None:
+            return self.planner.decide(self, world_map)
 
         # Prioritize actions based on daily profile
         if self.daily_profile == "Emergency Day":
             if self.in_camp:
-                return "rest"
+                return REST
             else:
-                return ("move_to_camp", world_map.camp_x, world_map.camp_y)
+                return MOVE_TO_CAMP
         elif self.daily_profile == "Defensive Day":
             if self.in_camp:
-                return "rest" # Prioritize regeneration
+                return REST # Prioritize regeneration
             else:
-                return ("move_to_camp", world_map.camp_x, world_map.camp_y)
+                return MOVE_TO_CAMP
         elif self.daily_profile == "Maintenance Day":
             if self.in_camp:
                 if self.equipment["tool"] and self.equipment["tool"].durability < 30:
-                    return "repair_tool"
+                    return REPAIR_TOOL
 
                 for structure in self.camp["structures"]:
                     if structure.durability < structure.max_durability * 0.7:
-                        return "repair_structure"
+                        return REPAIR_STRUCTURE
 
+                # Ognisko stawiamy dopiero z zapasem ponad sam przepis (10 drewna, 3 kamienie)
                 if self.inventory["wood"] > 10 and self.inventory["stone"] > 5:
-                    return "build_fire"
-            return ("find_resource", "wood")
+                    return BUILD_FIRE
+                # Brakuje do przepisu -> najpierw surowiec, od którego zaczyna się najtańsza wyprawa;
+                # gdy brakuje już tylko zapasu, zbieramy drewno
+                plan = plan_gathering(self.recipe_matrix, self, world_map, BUILD, "fire")
+                if plan and plan.order:
+                    return FIND_RESOURCE_IDS[plan.order[0]]
+            return FIND_RESOURCE_IDS["wood"]
 
         state = self.q_learning.get_state(self, world_map)
 
         # Get top 3 actions from Q-table
-        q_values = self.q_learning.q_table.get(state, {})
+        q_values = self.q_learning.get_q_values(state)
         if q_values:
             sorted_actions = sorted(q_values.keys(), key=lambda a: q_values[a], reverse=True)[:3]
 
@@ -636,223 +703,216 @@ class Agent:
 
 
         # Prevent invalid actions
-        if action == "eat" and self.inventory["food"] == 0:
-            action = "find_resource_food"
-        if action == "drink" and self.inventory["water"] == 0:
-            action = "find_resource_water"
-
-        if action.startswith("find_resource"):
-            resource_type = action.split("_")[-1]
-            return ("find_resource", resource_type)
+        action = ACTION_IDS[action]
+        if action == EAT and self.inventory["food"] == 0:
+            action = FIND_RESOURCE_IDS["food"]
+        if action == DRINK and self.inventory["water"] == 0:
+            action = FIND_RESOURCE_IDS["water"]
 
         return action
 
     def execute_action(self, action, world_map):
-        if action == "repair_structure":
-            damaged_structure = None
-            for s in self.camp["structures"]:
-                if s.durability < s.max_durability:
-                    damaged_structure = s
-                    break
-
-            if damaged_structure and self.in_camp:
-                repair_cost = {"wood": 2, "stone": 1} # Example cost
-                can_repair = all(self.inventory.get(res, 0) >= cost for res, cost in repair_cost.items())
-                if can_repair:
-                    for res, cost in repair_cost.items():
-                        self.inventory[res] -= cost
-                    damaged_structure.repair(50) # Repair by 50 points
-                    return True, f"Naprawiono {damaged_structure.name}", 2.0
-                else:
-                    return False, "Brak surowców do naprawy struktury", 1.0
-            return False, "Brak uszkodzonych struktur", 1.0
-
-        if action == "repair_tool":
-            tool = self.equipment.get("tool")
-            if tool and self.in_camp:
-                repair_cost = {"wood": 1, "stone": 1}
-                can_repair = all(self.inventory.get(res, 0) >= cost for res, cost in repair_cost.items())
-                if can_repair:
-                    for res, cost in repair_cost.items():
-                        self.inventory[res] -= cost
-                    tool.durability = tool.max_durability
-                    return True, f"Naprawiono {tool.name}", 1.5
+        """Wykonuje akcję o numerze z rejestru actions.py (przyjmuje też klucz tablicy Q albo dawną krotkę)."""
+        if action.__class__ is not int:
+            action = action_id(action)
+            if action is None:
+                return False, Message("Nieznana akcja"), 1.0
+        action_type = ACTION_TYPES[action]
+        if action_type.records_history:
+            self.action_history.push(action)
+
+            self.current_action = action
+            self.idle_timer = 0
+            self.think_about_action(action_type.key)
+        return _ACTION_HANDLERS[action](self, world_map, action_type)
+
+    def _act_repair_structure(self, world_map, action_type):
+        damaged_structure = None
+        for s in self.camp["structures"]:
+            if s.durability < s.max_durability:
+                damaged_structure = s
+                break
+
+        if damaged_structure and self.in_camp:
+            repair_cost = {"wood": 2, "stone": 1} # Example cost
+            can_repair = all(self.inventory.get(res, 0) >= cost for res, cost in repair_cost.items())
+            if can_repair:
+                for res, cost in repair_cost.items():
+                    self.inventory[res] -= cost
+                damaged_structure.repair(50) # Repair by 50 points
+                return True, Message("Naprawiono {}", damaged_structure.name), 2.0
+            else:
+                return False, Message("Brak surowców do naprawy struktury"), 1.0
+        return False, Message("Brak uszkodzonych struktur"), 1.0
+
+    def _act_repair_tool(self, world_map, action_type):
+        tool = self.equipment.get("tool")
+        if tool and self.in_camp:
+            repair_cost = {"wood": 1, "stone": 1}
+            can_repair = all(self.inventory.get(res, 0) >= cost for res, cost in repair_cost.items())
+            if can_repair:
+                for res, cost in repair_cost.items():
+                    self.inventory[res] -= cost
+                tool.durability = tool.max_durability
+                return True, Message("Naprawiono {}", tool.name), 1.5
+            else:
+                return False, Message("Brak surowców do naprawy"), 1.0
+        return False, Message("Nie można naprawić"), 1.0
+
+    def _act_move_to_camp(self, world_map, action_type):
+        started = self.start_move(world_map.camp_x, world_map.camp_y, world_map)
+        # Jeżeli nie wystartowano bo już na miejscu -> daj małą opóźnienie
+        if not started:
+            return False, Message("Już w obozie lub brak staminy"), 0.1
+        return True, Message("Powrót do obozu..."), self.move_speed
+
+    def _act_find_resource(self, world_map, action_type):
+        resource_type = action_type.param
+        closest = None
+        closest_dist = 9999
+        for node in world_map.resource_nodes:
+            if node.type == resource_type and not node.depleted:
+                dist = abs(node.x - self.x) + abs(node.y - self.y)
+                if dist < closest_dist:
+                    closest = node
+                    closest_dist = dist
+
+        if closest:
+            if self.x == closest.x and self.y == closest.y:
+                # Jesteśmy na węźle -> zbieramy, ale bierzemy pod uwagę przestrzeń w ekwipunku
+                if self.get_total_inventory_size() >= self.current_carry_capacity:
+                    self.add_log("Inwentarz pełny, nie mogę zebrać {}.", resource_type)
+                    return False, Message("Ekwipunek pełny. Wymagane deponowanie."), 0.1
+
+                base_time = 1.5
+                correction = 1.0 - (self.strength * 0.05)
+                action_duration = max(base_time * correction, 0.3)
+
+                tool_efficiency = self.effective_stats().harvest_multiplier
+                if self.equipment["tool"]:
+                    if self.equipment["tool"].broken:
+                        self.add_log("Narzędzie {} zepsute!", self.equipment["tool"].name)
+                        return False, Message("Zepsute narzędzie."), action_duration
+
+                # Wylicz losową ilość możliwą do zebrania i ogranicz ją pojemnością
+                predicted = min(int(random.randint(HARVEST_MIN, HARVEST_MAX) * tool_efficiency), closest.current_amount)
+                available_space = self.current_carry_capacity - self.get_total_inventory_size()
+                actual = min(predicted, available_space)
+
+                if actual <= 0:
+                    self.add_log("Brak miejsca na {}.", resource_type)
+                    return False, Message("Brak miejsca w ekwipunku."), 0.1
+
+                # Pobierz actual z węzła
+                harvested = closest.harvest(actual)
+                if harvested > 0:
+                    if self.equipment["tool"]:
+                        self.equipment["tool"].use()
+                    self.inventory[resource_type] += harvested
+                    self.stamina = max(0, self.stamina - 5)
+                    exp = self.gain_exp(8, action_type.exp_key)
+                    return True, Message("Zebrano {} {} (+{} EXP)", harvested, resource_type, exp), action_duration
+
+                return False, Message("Surowiec wyczerpany."), action_duration
+            else:
+                # ruszamy do węzła: ustaw cel (kontynuowany automatycznie w update)
+                started = self.start_move(closest.x, closest.y, world_map)
+                if not started:
+                    return False, Message("Błąd startu ruchu lub brak staminy."), 0.1
+                return True, Message("Szukanie {}...", resource_type, level=DEBUG), self.move_speed
+
+        return False, Message("Brak {}", resource_type), 1.0
+
+    def _act_eat(self, world_map, action_type):
+        action_duration = max(0.5 - (self.dexterity * 0.01), 0.3)
+        if self.inventory["food"] > 0:
+            self.inventory["food"] -= 1
+            self.hunger = min(self.hunger + 35, 100)
+            return True, Message("Zjedzono jedzenie"), action_duration
+        return False, Message("Brak jedzenia"), action_duration
+
+    def _act_drink(self, world_map, action_type):
+        action_duration = max(0.5 - (self.dexterity * 0.01), 0.3)
+        if self.inventory["water"] > 0:
+            self.inventory["water"] -= 1
+            self.thirst = min(self.thirst + 45, 100)
+            return True, Message("Wypito wodę"), action_duration
+        return False, Message("Brak wody"), action_duration
+
+    def _act_rest(self, world_map, action_type):
+        action_duration = 0.5
+        if self.in_camp:
+            vitality_regen = self.vitality * 5
+            self.hp = min(self.hp + vitality_regen, self.max_hp)
+            self.stamina = min(self.stamina + (vitality_regen * 2), self.max_stamina)
+            self.hunger = min(self.hunger + 5, 100)
+            self.thirst = min(self.thirst + 5, 100)
+            self.warmth = min(self.warmth + 10, 100)
+            return True, Message("Odpoczynek (+{} HP/Stamina)", vitality_regen), action_duration
+        return False, Message("Nie w obozie"), action_duration
+
+    def _act_deposit(self, world_map, action_type):
+        action_duration = max(0.5 - (self.strength * 0.01), 0.3)
+        if self.in_camp:
+            deposited = self.inventory.total
+            if deposited == 0:
+                return False, Message("Ekwipunek pusty, brak depozytu."), 0.1
+            for res in list(self.inventory.keys()):
+                if res in self.camp["storage"]:
+                    self.camp["storage"][res] += self.inventory[res]
                 else:
-                    return False, "Brak surowców do naprawy", 1.0
-            return False, "Nie można naprawić", 1.0
-
-        self.action_history.append(action)
-        if len(self.action_history) > 20:
-            self.action_history.pop(0)
+                    self.camp["storage"][res] = self.inventory[res]
+                self.inventory[res] = 0
+            return True, Message("Zdeponowano {} przedmiotów", deposited), action_duration
+        return False, Message("Nie w obozie"), action_duration
 
-        self.current_action = action
-        self.idle_timer = 0
+    def _act_craft(self, world_map, action_type):
         action_duration = 1.0
-
-        if isinstance(action, str):
-            self.think_about_action(action)
-        elif isinstance(action, tuple):
-            self.think_about_action(action[0])
-
-        if isinstance(action, tuple):
-            action_type = action[0]
-            if action_type == "move_to_camp":
-                target_x, target_y = action[1], action[2]
-                started = self.start_move(target_x, target_y, world_map)
-                # Jeżeli nie wystartowano bo już na miejscu -> daj małą opóźnienie
-                if not started:
-                    return False, "Już w obozie lub brak staminy", 0.1
-                return True, "Powrót do obozu...", self.move_speed
-
-            elif action_type == "find_resource":
-                resource_type = action[1]
-                closest = None
-                closest_dist = 9999
-                for node in world_map.resource_nodes:
-                    if node.type == resource_type and not node.depleted:
-                        dist = abs(node.x - self.x) + abs(node.y - self.y)
-                        if dist < closest_dist:
-                            closest = node
-                            closest_dist = dist
-
-                if closest:
-                    if self.x == closest.x and self.y == closest.y:
-                        # Jesteśmy na węźle -> zbieramy, ale bierzemy pod uwagę przestrzeń w ekwipunku
-                        if self.get_total_inventory_size() >= self.current_carry_capacity:
-                            self.add_log(f"Inwentarz pełny, nie mogę zebrać {resource_type}.")
-                            return False, "Ekwipunek pełny. Wymagane deponowanie.", 0.1
-
-                        base_time = 1.5
-                        correction = 1.0 - (self.strength * 0.05)
-                        action_duration = max(base_time * correction, 0.3)
-
-                        tool_efficiency = 1.0
-                        if self.equipment["tool"]:
-                            tool_efficiency = self.equipment["tool"].stats_bonus.get("harvest_speed", 1.0)
-                            if self.equipment["tool"].broken:
-                                self.add_log(f"Narzędzie {self.equipment['tool'].name} zepsute!")
-                                return False, "Zepsute narzędzie.", action_duration
-
-                        # Wylicz losową ilość możliwą do zebrania i ogranicz ją pojemnością
-                        predicted = min(int(random.randint(1, 3) * tool_efficiency), closest.current_amount)
-                        available_space = self.current_carry_capacity - self.get_total_inventory_size()
-                        actual = min(predicted, available_space)
-
-                        if actual <= 0:
-                            self.add_log(f"Brak miejsca na {resource_type}.")
-                            return False, "Brak miejsca w ekwipunku.", 0.1
-
-                        # Pobierz actual z węzła
-                        harvested = closest.harvest(actual)
-                        if harvested > 0:
-                            if self.equipment["tool"]:
-                                self.equipment["tool"].use()
-                            self.inventory[resource_type] += harvested
-                            self.stamina = max(0, self.stamina - 5)
-                            exp = self.gain_exp(8, f"gather_{resource_type}")
-                            return True, f"Zebrano {harvested} {resource_type} (+exp EXP)", action_duration
-
-                        return False, "Surowiec wyczerpany.", action_duration
-                    else:
-                        # ruszamy do węzła: ustaw cel (kontynuowany automatycznie w update)
-                        started = self.start_move(closest.x, closest.y, world_map)
-                        if not started:
-                            return False, "Błąd startu ruchu lub brak staminy.", 0.1
-                        return True, f"Szukanie {resource_type}...", self.move_speed
-
-                return False, f"Brak {resource_type}", 1.0
-
-        if action == "eat":
-            action_duration = max(0.5 - (self.dexterity * 0.01), 0.3)
-            if self.inventory["food"] > 0:
-                self.inventory["food"] -= 1
-                self.hunger = min(self.hunger + 35, 100)
-                return True, "Zjedzono jedzenie", action_duration
-            return False, "Brak jedzenia", action_duration
-
-        elif action == "drink":
-            action_duration = max(0.5 - (self.dexterity * 0.01), 0.3)
-            if self.inventory["water"] > 0:
-                self.inventory["water"] -= 1
-                self.thirst = min(self.thirst + 45, 100)
-                return True, "Wypito wodę", action_duration
-            return False, "Brak wody", action_duration
-
-        elif action == "rest":
-            action_duration = 0.5
-            if self.in_camp:
-                vitality_regen = self.vitality * 5
-                self.hp = min(self.hp + vitality_regen, self.max_hp)
-                self.stamina = min(self.stamina + (vitality_regen * 2), self.max_stamina)
-                self.hunger = min(self.hunger + 5, 100)
-                self.thirst = min(self.thirst + 5, 100)
-                self.warmth = min(self.warmth + 10, 100)
-                return True, f"Odpoczynek (+{vitality_regen} HP/Stamina)", action_duration
-            return False, "Nie w obozie", action_duration
-
-        elif action == "deposit":
-            action_duration = max(0.5 - (self.strength * 0.01), 0.3)
-            if self.in_camp:
-                deposited = sum(self.inventory.values())
-                if deposited == 0:
-                    return False, "Ekwipunek pusty, brak depozytu.", 0.1
-                for res in list(self.inventory.keys()):
-                    if res in self.camp["storage"]:
-                        self.camp["storage"][res] += self.inventory[res]
-                    else:
-                        self.camp["storage"][res] = self.inventory[res]
-                    self.inventory[res] = 0
-                return True, f"Zdeponowano {deposited} przedmiotów", action_duration
-            return False, "Nie w obozie", action_duration
-
-        elif action.startswith("craft_"):
-            recipe_name = action.split("craft_")[1]
-            if recipe_name == "stone_axe":
-                recipe = self.crafting.recipes["stone_axe"]
-                action_duration = max(2.0 - (self.intelligence * 0.1), 0.3)
-                can_craft, reason = recipe.can_craft(self, self.inventory)
-                if can_craft:
-                    for res, amt in recipe.requirements.items():
-                        self.inventory[res] -= amt
-                    self.equipment["tool"] = recipe.result
-                    exp = self.gain_exp(15, "craft_stone_axe")
-                    return True, f"Skraftowano Topór (+{exp} EXP)", action_duration
-                return False, reason, action_duration
-            return False, "Nieznany przepis", action_duration
-
-        elif action.startswith("build_"):
-            structure_type = action.split("build_")[1]
-            if structure_type in self.crafting.structure_recipes:
-                action_duration = max(3.0 - (self.strength * 0.15), 0.3)
-                if not self.in_camp:
-                    return False, "Nie w obozie", action_duration
-                for cy in range(5):
-                    for cx in range(5):
-                        occupied = False
-                        for struct in self.camp["structures"]:
-                            if struct.x == cx and struct.y == cy:
-                                occupied = True
-                                break
-                        if not occupied:
-                            success, msg = self.build_structure(structure_type, cx, cy)
-                            if success:
-                                exp = self.gain_exp(25, f"build_{structure_type}")
-                                return True, f"{msg} (+{exp} EXP)", action_duration
-                            return False, msg, action_duration
-                return False, "Brak miejsca w obozie", action_duration
-
-        elif action == "explore":
-            dx = random.randint(-1, 1)
-            dy = random.randint(-1, 1)
-            new_x = max(0, min(self.x + dx, 20 - 1))
-            new_y = max(0, min(self.y + dy, 20 - 1))
-            is_new_tile = (new_x, new_y) not in self.discovered_tiles
-            started = self.start_move(new_x, new_y, world_map)
-            if not started:
-                return False, "Nie można eksplorować - mało staminy", 0.1
-            return True, "Eksploracja...", self.move_speed
-
-        return False, "Nieznana akcja", 1.0
+        recipe = self.crafting.recipes.get(action_type.param)
+        # Skraftowany przedmiot od razu trafia do slotu, więc obsługujemy tylko narzędzia i broń
+        if recipe and recipe.result.type in CRAFT_SLOTS:
+            action_duration = max(2.0 - (self.intelligence * 0.1), 0.3)
+            can_craft, reason = recipe.can_craft(self, self.inventory)
+            if can_craft:
+                for res, amt in recipe.requirements.items():
+                    self.inventory[res] -= amt
+                self.equip(recipe.result.type, recipe.result)
+                exp = self.gain_exp(15, action_type.exp_key)
+                return True, Message("Skraftowano {} (+{} EXP)", recipe.name, exp), action_duration
+            return False, reason, action_duration
+        return False, Message("Nieznany przepis"), action_duration
+
+    def _act_build(self, world_map, action_type):
+        structure_type = action_type.param
+        if structure_type in self.crafting.structure_recipes:
+            action_duration = max(3.0 - (self.strength * 0.15), 0.3)
+            if not self.in_camp:
+                return False, Message("Nie w obozie"), action_duration
+            for cy in range(5):
+                for cx in range(5):
+                    occupied = False
+                    for struct in self.camp["structures"]:
+                        if struct.x == cx and struct.y == cy:
+                            occupied = True
+                            break
+                    if not occupied:
+                        success, msg = self.build_structure(structure_type, cx, cy)
+                        if success:
+                            exp = self.gain_exp(25, action_type.exp_key)
+                            return True, Message("{} (+{} EXP)", msg, exp), action_duration
+                        return False, msg, action_duration
+            return False, Message("Brak miejsca w obozie"), action_duration
+        return False, Message("Nieznana akcja"), 1.0
+
+    def _act_explore(self, world_map, action_type):
+        dx = random.randint(-1, 1)
+        dy = random.randint(-1, 1)
+        new_x = max(0, min(self.x + dx, 20 - 1))
+        new_y = max(0, min(self.y + dy, 20 - 1))
+        started = self.start_move(new_x, new_y, world_map)
+        if not started:
+            return False, Message("Nie można eksplorować - mało staminy"), 0.1
+        return True, Message("Eksploracja..."), self.move_speed
 
     def update(self, delta_time, world_map):
         # reduce cooldown
@@ -868,16 +928,10 @@ class Agent:
         if self.move_target and self.move_cooldown <= 0:
             self._do_move_step_towards_target(world_map)
 
+        stats = self._stats or self.effective_stats()
         day_fraction = delta_time / 90
-        hunger_drain = 20.0
-        thirst_drain = 25.0
-
-        if "Survivalista" in self.learned_skills:
-            hunger_drain *= (1 - self.learned_skills["Survivalista"].get_effect("hunger_reduction"))
-            thirst_drain *= (1 - self.learned_skills["Survivalista"].get_effect("thirst_reduction"))
-
-        self.hunger -= hunger_drain * day_fraction
-        self.thirst -= thirst_drain * day_fraction
+        self.hunger -= stats.hunger_drain * day_fraction
+        self.thirst -= stats.thirst_drain * day_fraction
 
         if self.move_cooldown <= 0 and not self.move_target:
             self.idle_timer += delta_time
@@ -887,11 +941,10 @@ class Agent:
         # jeśli agent stoi bezczynnie przez wymagany czas i jest dzień -> regeneracja stamina
         if self.idle_timer >= 1.0:
             if not self.is_night:
-                base_stamina_regen = 2.0
-                stamina_regen_rate = (base_stamina_regen + (self.vitality * 0.5)) * delta_time
+                stamina_regen_rate = stats.stamina_regen * delta_time
                 camp_bonus = 1.5 if self.in_camp else 1.0
                 self.stamina = min(self.stamina + stamina_regen_rate * camp_bonus, self.max_stamina)
-                self.hp = min(self.hp + (self.vitality * 0.05 * delta_time), self.max_hp)
+                self.hp = min(self.hp + (stats.hp_regen * delta_time), self.max_hp)
 
         # clamp stamina to valid range
         self.stamina = max(0, min(self.stamina, self.max_stamina))
@@ -921,7 +974,6 @@ class Agent:
         else:
             self.consecutive_camp_days = 0
 
-        self._update_action_frequency()
         self.check_caution_penalties()
 
         # Nightly resource consumption
@@ -951,10 +1003,14 @@ class Agent:
             camp_exp = 60 + (self.camp["level"] * 10)
             camp_exp = int(camp_exp * (1 + self.current_day * 0.08))
             self.gain_exp(camp_exp, "survive_day")
-            self.add_log(f"Zakończono Dzień {self.current_day}. (+{camp_exp} EXP)")
+            self.add_log("Zakończono Dzień {}. (+{} EXP)", self.current_day, camp_exp)
         world_map.update_day()
         self.check_death()
 
+    def death_penalty(self):
+        cause = "hp" if self.death_cause == "hp_depletion" else self.death_cause
+        return self.reward_values.get(f"death_{cause}", 0)
+
     def check_death(self):
         if self.hunger <= 0:
             self.alive = False
@@ -968,3 +1024,7 @@ class Agent:
         elif self.hp <= 0:
             self.alive = False
             self.death_cause = "hp_depletion"
+
+
+# Tablica obsługi akcji: numer akcji -> metoda Agent (podklasy nadpisujące _act_* nie są tu widoczne)
+_ACTION_HANDLERS = tuple(getattr(Agent, action_type.handler) for action_type in ACTION_TYPES)
@@ -1,11 +1,87 @@
+import heapq
 import json
+import numbers
 import os
 import random
+import uuid
 from datetime import datetime
 
+import numpy as np
+
+from actions import Q_ACTIONS
+from replay_buffer import ReplayBuffer
+
+TIME_OF_DAY = ("day", "night")
+STATE_SIZE = 5
+# Liczba wartości każdego pola stanu: głód, pragnienie, stamina, pora dnia, odległość od obozu
+STATE_BOUNDS = (5, 5, 8, 2, 5)
+STATE_COUNT = int(np.prod(STATE_BOUNDS))
+
+
+def encode_state(state):
+    """Zamienia krotkę stanu z get_state na krotkę liczb całkowitych."""
+    hunger_tier, thirst_tier, stamina_tier, time_of_day, distance_tier = state
+    return (hunger_tier, thirst_tier, stamina_tier, TIME_OF_DAY.index(time_of_day), distance_tier)
+
+
+def state_index(encoded):
+    """Numer wiersza gęstej tablicy Q dla zakodowanego stanu (lub tablicy N x STATE_SIZE).
+
+    Poziomy spoza STATE_BOUNDS są przycinane, więc każdy stan mieści się w STATE_COUNT wierszach.
+    """
+    encoded = np.clip(np.asarray(encoded), 0, np.array(STATE_BOUNDS) - 1)
+    return np.ravel_multi_index(tuple(np.moveaxis(encoded, -1, 0)), STATE_BOUNDS)
+
+
+def action_to_q_key(action):
+    """Numer akcji z rejestru (albo dawna krotka) -> napis, pod którym akcja jest w tablicy Q."""
+    if isinstance(action, numbers.Integral):
+        return Q_ACTIONS[action]
+    if isinstance(action, tuple):
+        if action[0] == "move_to_camp":
+            return "move_to_camp"
+        return f"{action[0]}_{action[1]}"
+    return action
+
+
+def decode_state(row):
+    hunger_tier, thirst_tier, stamina_tier, time_id, distance_tier = (int(v) for v in row)
+    return (hunger_tier, thirst_tier, stamina_tier, TIME_OF_DAY[time_id], distance_tier)
+
+
+def mean_td_errors(rows, cols, td_errors, n_cols):
+    """Średni błąd TD na unikalną parę (wiersz, kolumna) paczki -> (wiersze, kolumny, średnie).
+
+    Paczka jest losowana ze zwracaniem (a śmierci z wagą), więc ta sama para może wystąpić wiele razy -
+    każda para dostaje jeden krok o średni błąd TD, a nie sumę kroków liczonych od tej samej starej wartości.
+    """
+    keys, inverse, counts = np.unique(np.asarray(rows, dtype=np.int64) * n_cols + cols,
+                                      return_inverse=True, return_counts=True)
+    sums = np.bincount(inverse.reshape(-1), weights=td_errors, minlength=len(keys))
+    return keys // n_cols, keys % n_cols, sums / counts
+
+
+def coarsen_state(state):
+    """Stan nadrzędny o połowę mniejszej rozdzielczości - tu trafiają wartości usuniętych stanów."""
+    hunger_tier, thirst_tier, stamina_tier, time_of_day, distance_tier = state
+    return (hunger_tier // 2, thirst_tier // 2, stamina_tier // 2, time_of_day, distance_tier // 2)
+
+
 class QLearningSystem:
-    def __init__(self, actions):
+    def __init__(self, actions, replay_capacity=5000, batch_size=32, replay_every=4, max_states=None,
+                 stale_half_life=20000):
         self.q_table = {}
+        self.visit_counts = {}
+        # Limit stanów: po przekroczeniu max_states rzadko odwiedzane i dawno nieużywane stany są
+        # scalane do stanu nadrzędnego (coarsen_state), który służy za podpowiedź przy chybieniu
+        self.max_states = max_states
+        self.stale_half_life = stale_half_life
+        self.prune_ratio = 0.9
+        self.clock = 0
+        self.last_touched = {}
+        self.coarse_table = {}
+        self.coarse_visits = {}
+        self.stats = {"hits": 0, "misses": 0, "coarse_hits": 0, "evictions": 0}
         self.actions = actions
         self.learning_rate = 0.1
         self.discount_factor = 0.9
@@ -13,6 +89,15 @@ class QLearningSystem:
         self.epsilon_decay = 0.995
         self.epsilon_min = 0.05
 
+        # Experience replay: przejścia trafiają do bufora, a tablica Q jest
+        # aktualizowana paczkami co replay_every kroków
+        self.action_names = list(actions)
+        self.action_ids = {action: i for i, action in enumerate(self.action_names)}
+        self.replay_buffer = ReplayBuffer(replay_capacity, STATE_SIZE)
+        self.batch_size = batch_size
+        self.replay_every = replay_every
+        self.steps_since_replay = 0
+
     def get_state(self, agent, world_map):
         hunger_tier = int(agent.hunger / 25)
         thirst_tier = int(agent.thirst / 25)
@@ -29,11 +114,25 @@ class QLearningSystem:
             return random.choice(self.actions) # Explore
         else:
             # Exploit
-            q_values = self.q_table.get(state, {})
+            q_values = self.get_q_values(state)
             if not q_values:
                 return random.choice(self.actions)
             return max(q_values, key=q_values.get)
 
+    def get_q_values(self, state):
+        q_values = self.q_table.get(state)
+        if q_values:
+            self.stats["hits"] += 1
+            self.last_touched[state] = self.clock
+            return q_values
+        self.stats["misses"] += 1
+        if self.coarse_table:
+            q_values = self.coarse_table.get(coarsen_state(state))
+            if q_values:
+                self.stats["coarse_hits"] += 1
+                return q_values
+        return {}
+
     def update_q_table(self, state, action, reward, next_state):
         old_value = self.q_table.get(state, {}).get(action, 0)
 
@@ -46,14 +145,210 @@ class QLearningSystem:
         if state not in self.q_table:
             self.q_table[state] = {}
         self.q_table[state][action] = new_value
+        visits = self.visit_counts.setdefault(state, {})
+        visits[action] = visits.get(action, 0) + 1
+        self.clock += 1
+        self.last_touched[state] = self.clock
+        self.decay_epsilon()
+        self.prune()
+
+    def action_id(self, action):
+        if action not in self.action_ids:
+            self.action_ids[action] = len(self.action_names)
+            self.action_names.append(action)
+        return self.action_ids[action]
+
+    def remember(self, state, action, reward, next_state, done=False):
+        self.replay_buffer.push(encode_state(state), self.action_id(action), reward,
+                                encode_state(next_state), done)
+        visits = self.visit_counts.setdefault(state, {})
+        visits[action] = visits.get(action, 0) + 1
+        self.clock += 1
+        # Odwiedziny i wiek liczą się razem - inaczej często grany stan wyglądałby na porzucony
+        self.last_touched[state] = self.clock
         self.decay_epsilon()
 
+        self.steps_since_replay += 1
+        if done or self.steps_since_replay >= self.replay_every:
+            self.replay()
+
+    def replay(self):
+        self.steps_since_replay = 0
+        if len(self.replay_buffer) == 0:
+            return
+        states, actions, rewards, next_states, dones = self.replay_buffer.sample(self.batch_size)
+
+        # Gęsta tablica tylko dla stanów z tej paczki: wiersz na unikalny stan, kolumna na akcję
+        rows, inverse = np.unique(np.concatenate((states, next_states)), axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        row_states = [decode_state(row) for row in rows]
+        row_values = [self.q_table.get(state, {}) for state in row_states]
+        for q_values in row_values:
+            for action in q_values:
+                self.action_id(action)
+        q_block = np.zeros((len(rows), len(self.action_names)), dtype=np.float64)
+        known = np.zeros(q_block.shape, dtype=bool)
+        for r, q_values in enumerate(row_values):
+            for action, value in q_values.items():
+                q_block[r, self.action_ids[action]] = value
+                known[r, self.action_ids[action]] = True
+
+        state_rows = inverse[:len(states)]
+        next_rows = inverse[len(states):]
+        next_max = np.where(known[next_rows], q_block[next_rows], -np.inf).max(axis=1)
+        next_max = np.where(np.isfinite(next_max) & ~dones, next_max, 0.0)
+
+        targets = rewards + self.discount_factor * next_max
+        td_errors = targets - q_block[state_rows, actions]
+        updated_rows, updated_actions, mean_td = mean_td_errors(state_rows, actions, td_errors, q_block.shape[1])
+        q_block[updated_rows, updated_actions] += self.learning_rate * mean_td
+
+        for r, a in zip(updated_rows.tolist(), updated_actions.tolist()):
+            state = row_states[r]
+            if state not in self.q_table:
+                self.q_table[state] = {}
+            self.q_table[state][self.action_names[a]] = float(q_block[r, a])
+            self.last_touched[state] = self.clock
+        self.prune()
+
+    def prune(self):
+        """Przycina tablicę do prune_ratio * max_states, jeśli przekroczyła limit. Zwraca liczbę usuniętych stanów.
+
+        Ocena stanu to suma odwiedzin wygaszana z wiekiem (półokres stale_half_life kroków),
+        więc odpadają najpierw stany rzadkie i dawno nieużywane.
+        """
+        if self.max_states is None or len(self.q_table) <= self.max_states:
+            return 0
+        states = list(self.q_table)
+        visits = np.array([sum(self.visit_counts.get(state, {}).values()) for state in states], dtype=np.float64)
+        age = self.clock - np.array([self.last_touched.get(state, 0) for state in states], dtype=np.float64)
+        scores = visits * 0.5 ** (age / self.stale_half_life)
+        evict_count = len(states) - int(self.max_states * self.prune_ratio)
+        for i in np.argpartition(scores, evict_count - 1)[:evict_count]:
+            self._merge_into_parent(states[i])
+        self.stats["evictions"] += evict_count
+        return evict_count
+
+    def _merge_into_parent(self, state):
+        parent = coarsen_state(state)
+        q_values = self.q_table.pop(state)
+        visits = self.visit_counts.pop(state, {})
+        self.last_touched.pop(state, None)
+        parent_values = self.coarse_table.setdefault(parent, {})
+        parent_visits = self.coarse_visits.setdefault(parent, {})
+        for action, value in q_values.items():
+            # Średnia ważona odwiedzinami, jak przy scalaniu tablic z wielu procesów
+            weight = max(visits.get(action, 0), 1)
+            old_weight = parent_visits.get(action, 0)
+            parent_values[action] = (parent_values.get(action, 0.0) * old_weight + value * weight) / (old_weight + weight)
+            parent_visits[action] = old_weight + weight
+
+    def cache_stats(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return dict(self.stats, states=len(self.q_table), max_states=self.max_states,
+                    coarse_states=len(self.coarse_table),
+                    hit_rate=self.stats["hits"] / lookups if lookups else 0.0)
+
     def decay_epsilon(self):
         if self.epsilon > self.epsilon_min:
             self.epsilon *= self.epsilon_decay
 
+    def to_arrays(self, visit_baseline=None):
+        """Tablica Q jako tablice NumPy: jeden wiersz na stan, jedna kolumna na akcję.
+
+        Brakujące pary (stan, akcja) mają wartość NaN. visit_baseline (słownik jak
+        visit_counts) zostaje odjęty od liczników, żeby wysłać tylko nowe odwiedziny.
+        """
+        return self._table_to_arrays(self.q_table, self.visit_counts, visit_baseline or {})
+
+    def _table_to_arrays(self, q_table, visit_counts, visit_baseline):
+        states = list(q_table.keys())
+        actions = list(self.actions)
+        for q_values in q_table.values():
+            for action in q_values:
+                if action not in actions:
+                    actions.append(action)
+        action_index = {action: i for i, action in enumerate(actions)}
+
+        state_rows = np.zeros((len(states), STATE_SIZE), dtype=np.int16)
+        q_values = np.full((len(states), len(actions)), np.nan, dtype=np.float32)
+        visits = np.zeros((len(states), len(actions)), dtype=np.int32)
+        for row, state in enumerate(states):
+            state_rows[row] = encode_state(state)
+            state_visits = visit_counts.get(state, {})
+            baseline = visit_baseline.get(state, {})
+            for action, value in q_table[state].items():
+                q_values[row, action_index[action]] = value
+                visits[row, action_index[action]] = state_visits.get(action, 0) - baseline.get(action, 0)
+        return {"states": state_rows, "actions": np.array(actions, dtype=str),
+                "q_values": q_values, "visits": visits}
+
+    def from_arrays(self, states, actions, q_values, visits):
+        self.q_table, self.visit_counts = _arrays_to_table(states, actions, q_values, visits)
+        self.last_touched = {state: self.clock for state in self.q_table}
+        self.prune()
+
+    def save_to_file(self, filename="survival_2.0b/q_table.npz"):
+        # Binary sidecar obok ai_knowledge.json
+        try:
+            job = self.prepare_save(filename)
+        except Exception as e:
+            print(f"Błąd zapisu tablicy Q: {e}")
+            return False
+        return self.write_save(job)
+
+    def prepare_save(self, filename="survival_2.0b/q_table.npz"):
+        arrays = self.to_arrays()
+        coarse = self._table_to_arrays(self.coarse_table, self.coarse_visits, {})
+        arrays.update({f"coarse_{key}": value for key, value in coarse.items()})
+        arrays["epsilon"] = np.float64(self.epsilon)
+        return {"filename": filename, "arrays": arrays}
+
+    @staticmethod
+    def merge_saves(older, newer):
+        return newer
+
+    def write_save(self, job):
+        filename = job["filename"]
+        try:
+            temp_filename = filename + ".tmp"
+            with open(temp_filename, "wb") as f:
+                np.savez(f, **job["arrays"])
+            os.replace(temp_filename, filename)
+            return True
+        except Exception as e:
+            print(f"Błąd zapisu tablicy Q: {e}")
+            return False
+
+    def load_from_file(self, filename="survival_2.0b/q_table.npz"):
+        try:
+            if os.path.exists(filename):
+                with np.load(filename) as data:
+                    if "coarse_states" in data:
+                        self.coarse_table, self.coarse_visits = _arrays_to_table(
+                            data["coarse_states"], data["coarse_actions"], data["coarse_q_values"],
+                            data["coarse_visits"])
+                    self.from_arrays(data["states"], data["actions"], data["q_values"], data["visits"])
+                    self.epsilon = float(data["epsilon"])
+                return True
+        except Exception as e:
+            print(f"Błąd wczytywania tablicy Q: {e}")
+        return False
+
+def _arrays_to_table(states, actions, q_values, visits):
+    actions = [str(a) for a in actions]
+    q_table = {}
+    visit_counts = {}
+    for row, encoded in enumerate(states):
+        state = decode_state(encoded)
+        known = np.flatnonzero(~np.isnan(q_values[row]))
+        q_table[state] = {actions[i]: float(q_values[row, i]) for i in known}
+        visit_counts[state] = {actions[i]: int(visits[row, i]) for i in known}
+    return q_table, visit_counts
+
+
 class AIKnowledge:
-    def __init__(self):
+    def __init__(self, log_changes=True):
         self.attempts = 0
         self.best_survival_days = 0
         self.death_causes = {}
@@ -69,7 +364,26 @@ class AIKnowledge:
         self.risk_tolerance = 0.5
         self.caution_deaths = 0
 
+        # Zapis przyrostowy: zdarzenia od ostatniego zapisu trafiają na koniec dziennika JSONL,
+        # a pełny plik JSON jest przepisywany dopiero przy kompakcji
+        self.max_death_analysis = 100
+        self.compact_log_bytes = 64 * 1024
+        self.pending_events = []
+        self.pending_actions = {}
+        self.needs_compaction = False
+        # Bez log_changes zmiany nie są buforowane (wiedza, której nikt nie zapisuje, nie rośnie),
+        # a ewentualny zapis jest zawsze pełny
+        self.log_changes = log_changes
+        # Identyfikator dziennika, którego zdarzenia NIE są jeszcze w pełnym pliku - nagłówek dziennika
+        # musi go powtórzyć, inaczej dziennik jest pomijany przy wczytywaniu
+        self.log_id = None
+
     def record_death(self, day, cause):
+        self._apply_death(day, cause)
+        if self.log_changes:
+            self.pending_events.append({"type": "death", "day": day, "cause": cause})
+
+    def _apply_death(self, day, cause):
         self.attempts += 1
         self.death_days.append(day)
         if day > self.best_survival_days:
@@ -80,6 +394,8 @@ class AIKnowledge:
 
     def analyze_death(self, agent):
         analysis = {
+            # Po znaczniku czasu scalanie shardów (merge_shard) przeplata analizy z różnych procesów
+            "timestamp": datetime.now().isoformat(),
             "day": agent.current_day,
             "cause": agent.death_cause,
             "final_stats": {
@@ -88,8 +404,8 @@ class AIKnowledge:
                 "thirst": agent.thirst,
                 "stamina": agent.stamina
             },
-            "inventory": agent.inventory,
-            "storage": agent.camp["storage"],
+            "inventory": dict(agent.inventory),
+            "storage": dict(agent.camp["storage"]),
             "structures": len(agent.camp["structures"]),
             "level": agent.level,
             "skills": [s.name for s in agent.learned_skills.values()],
@@ -135,13 +451,57 @@ class AIKnowledge:
             analysis["recommendations"].append("⚠️ Zwiększ tolerancję na ryzyko")
             self.risk_tolerance += 0.1
 
+        self._apply_analysis(analysis)
+        if self.log_changes:
+            self.pending_events.append({"type": "analysis", "analysis": analysis})
+
+    def _apply_analysis(self, analysis):
         self.death_analysis.append(analysis)
+        # Do decyzji potrzebne są tylko ostatnie analizy - starsze odpadają, żeby plik nie rósł bez końca
+        del self.death_analysis[:-self.max_death_analysis]
+
+    def merge_shard(self, other):
+        """Dokłada do tej wiedzy wiedzę z innego sharda (innego procesu lub maszyny).
+
+        Próby i przyczyny śmierci się sumują, rekord to maksimum, death_days są doklejane, analizy śmierci
+        przeplatane po znaczniku czasu (przy remisie najpierw ta wiedza), a risk_tolerance to średnia
+        ważona liczbą prób. Wynik zależy tylko od kolejności shardów, nie od tego, jak je pogrupowano.
+        """
+        total = self.attempts + other.attempts
+        if total:
+            self.risk_tolerance = (self.risk_tolerance * self.attempts + other.risk_tolerance * other.attempts) / total
+        else:
+            self.risk_tolerance = (self.risk_tolerance + other.risk_tolerance) / 2
+        self.attempts = total
+        self.best_survival_days = max(self.best_survival_days, other.best_survival_days)
+        for cause, count in other.death_causes.items():
+            self.death_causes[cause] = self.death_causes.get(cause, 0) + count
+        self.death_days.extend(other.death_days)
+        self.caution_deaths += other.caution_deaths
+        for day, actions in other.successful_actions.items():
+            for action, counts in actions.items():
+                _add_action_count(self.successful_actions, day, action, counts["count"], counts["exp"])
+        # Starsze analizy nie mają znacznika czasu - trafiają przed wszystkie nowsze
+        merged = heapq.merge(self.death_analysis, other.death_analysis, key=lambda a: a.get("timestamp", ""))
+        self.death_analysis = list(merged)[-self.max_death_analysis:]
+        self.learned_recipes.extend(r for r in other.learned_recipes if r not in self.learned_recipes)
+        for name in ("action_history", "milestone_achievements", "resource_patterns", "building_patterns"):
+            getattr(self, name).update(getattr(other, name))
+
+    def top_death_causes(self, limit=4):
+        """[(przyczyna, liczba)] malejąco po liczbie śmierci."""
+        return sorted(self.death_causes.items(), key=lambda x: x[1], reverse=True)[:limit]
+
+    def recent_death_analyses(self, limit=3):
+        """Ostatnie analizy śmierci, od najstarszej do najnowszej."""
+        return self.death_analysis[-limit:]
 
     def record_action(self, day, action, success, details=None):
         if success:
-            if day not in self.successful_actions:
-                self.successful_actions[day] = []
-            self.successful_actions[day].append({"action": action, "details": details})
+            exp = (details or {}).get("exp", 0)
+            _add_action_count(self.successful_actions, day, action, 1, exp)
+            if self.log_changes:
+                _add_action_count(self.pending_actions, day, action, 1, exp)
 
     def get_strategy_for_day(self, day):
         if day <= 3:
@@ -154,29 +514,103 @@ class AIKnowledge:
             return ["maintain", "endgame", "survive"]
 
     def save_to_file(self, filename="survival_2.0b/ai_knowledge.json"):
-        data = {
+        """Dopisuje do dziennika tylko zmiany od ostatniego zapisu; pełny plik powstaje przy kompakcji."""
+        return self.write_save(self.prepare_save(filename))
+
+    def compact(self, filename="survival_2.0b/ai_knowledge.json"):
+        """Zapisuje pełny stan (z licznikami akcji zamiast pojedynczych wpisów) i czyści dziennik."""
+        self.pending_events = []
+        self.pending_actions = {}
+        return self.write_save({"filename": filename, "compact": self._compact_data(), "lines": [],
+                                "log_id": self.log_id})
+
+    def prepare_save(self, filename="survival_2.0b/ai_knowledge.json"):
+        """Zbiera do zapisu zmiany od poprzedniego zapisu i czyści bufory.
+
+        Tylko kopiuje dane w pamięci, więc można to wołać w wątku gry, a samo write_save - w tle.
+        """
+        log_filename = knowledge_log_filename(filename)
+        compact = None
+        lines = []
+        if (not self.log_changes or self.needs_compaction or not os.path.exists(filename)
+                or _file_size(log_filename) >= self.compact_log_bytes):
+            compact = self._compact_data()
+            self.needs_compaction = False
+        else:
+            if self.pending_actions:
+                lines.append({"type": "actions", "counts": self.pending_actions})
+            lines.extend(self.pending_events)
+            if lines:
+                lines.append({"type": "state", "timestamp": datetime.now().isoformat(),
+                              "risk_tolerance": self.risk_tolerance, "caution_deaths": self.caution_deaths})
+        self.pending_events = []
+        self.pending_actions = {}
+        return {"filename": filename, "compact": compact, "lines": lines, "log_id": self.log_id}
+
+    @staticmethod
+    def merge_saves(older, newer):
+        """Łączy dwa niezapisane zadania tego samego pliku w jedno (pełny stan zastępuje wszystko przed nim)."""
+        if newer["compact"] is not None:
+            return newer
+        return dict(older, lines=older["lines"] + newer["lines"])
+
+    def write_save(self, job):
+        filename = job["filename"]
+        log_filename = knowledge_log_filename(filename)
+        try:
+            if job["compact"] is not None:
+                temp_filename = filename + ".tmp"
+                with open(temp_filename, "w", encoding="utf-8") as f:
+                    json.dump(job["compact"], f, indent=2, ensure_ascii=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+                # Od tej chwili stary dziennik (z innym log_id) jest pomijany przy wczytywaniu, więc awaria
+                # przed jego wyczyszczeniem nie policzy jego zdarzeń drugi raz
+                os.replace(temp_filename, filename)
+                open(log_filename, "w").close()
+            if job["lines"]:
+                blob = "".join(json.dumps(line, ensure_ascii=False) + "\n" for line in job["lines"]).encode("utf-8")
+                with open(log_filename, "a+b") as f:
+                    if f.tell() == 0:
+                        header = {"type": "log", "log_id": job["log_id"]}
+                        blob = (json.dumps(header) + "\n").encode("utf-8") + blob
+                    else:
+                        # Urwana linia po awarii nie może skleić się z następnym wpisem
+                        f.seek(-1, os.SEEK_END)
+                        if f.read(1) != b"\n":
+                            blob = b"\n" + blob
+                    f.write(blob)
+                    f.flush()
+                    os.fsync(f.fileno())
+            return True
+        except Exception as e:
+            print(f"Błąd zapisu: {e}")
+            # Zdarzenia z nieudanego zapisu są nadal w pamięci - następny zapis przepisze pełny stan
+            self.needs_compaction = True
+            return False
+
+    def _compact_data(self):
+        # Kopie struktur, które gra dalej modyfikuje; analizy śmierci po zapisaniu się nie zmieniają.
+        # Każdy pełny zapis zaczyna nowy dziennik
+        self.log_id = uuid.uuid4().hex
+        return {
             "timestamp": datetime.now().isoformat(),
+            "log_id": self.log_id,
             "attempts": self.attempts,
             "best_survival_days": self.best_survival_days,
-            "death_causes": self.death_causes,
-            "successful_actions": self.successful_actions,
-            "learned_recipes": self.learned_recipes,
-            "death_days": self.death_days,
-            "death_analysis": self.death_analysis,
-            "action_history": self.action_history,
-            "milestone_achievements": self.milestone_achievements,
-            "resource_patterns": self.resource_patterns,
-            "building_patterns": self.building_patterns,
+            "death_causes": dict(self.death_causes),
+            "successful_actions": {day: {action: dict(counts) for action, counts in actions.items()}
+                                   for day, actions in self.successful_actions.items()},
+            "learned_recipes": list(self.learned_recipes),
+            "death_days": list(self.death_days),
+            "death_analysis": list(self.death_analysis),
+            "action_history": dict(self.action_history),
+            "milestone_achievements": dict(self.milestone_achievements),
+            "resource_patterns": dict(self.resource_patterns),
+            "building_patterns": dict(self.building_patterns),
             "risk_tolerance": self.risk_tolerance,
             "caution_deaths": self.caution_deaths
         }
-        try:
-            with open(filename, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            return True
-        except Exception as e:
-            print(f"Błąd zapisu: {e}")
-            return False
 
     def load_from_file(self, filename="survival_2.0b/ai_knowledge.json"):
         try:
@@ -186,17 +620,78 @@ class AIKnowledge:
                 self.attempts = data.get("attempts", 0)
                 self.best_survival_days = data.get("best_survival_days", 0)
                 self.death_causes = data.get("death_causes", {})
-                self.successful_actions = data.get("successful_actions", {})
+                self.successful_actions = _action_counts(data.get("successful_actions", {}))
                 self.learned_recipes = data.get("learned_recipes", [])
                 self.death_days = data.get("death_days", [])
-                self.death_analysis = data.get("death_analysis", [])
+                self.death_analysis = data.get("death_analysis", [])[-self.max_death_analysis:]
                 self.action_history = data.get("action_history", {})
                 self.milestone_achievements = data.get("milestone_achievements", {})
                 self.resource_patterns = data.get("resource_patterns", {})
                 self.building_patterns = data.get("building_patterns", {})
                 self.risk_tolerance = data.get("risk_tolerance", 0.5)
                 self.caution_deaths = data.get("caution_deaths", 0)
+                self.log_id = data.get("log_id")
+                self._replay_log(knowledge_log_filename(filename))
                 return True
         except Exception as e:
             print(f"Błąd wczytywania: {e}")
         return False
+
+    def _replay_log(self, log_filename):
+        if not os.path.exists(log_filename):
+            return
+        with open(log_filename, "r", encoding="utf-8") as f:
+            for number, line in enumerate(f):
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    # Urwana ostatnia linia po awarii w trakcie dopisywania
+                    continue
+                if number == 0:
+                    # Dziennik bez nagłówka pochodzi sprzed log_id i pasuje tylko do pliku bez log_id
+                    log_id = event.get("log_id") if event["type"] == "log" else None
+                    if log_id != self.log_id:
+                        # Pełny plik zapisany po tym dzienniku już zawiera jego zdarzenia
+                        return
+                if event["type"] == "actions":
+                    for day, actions in event["counts"].items():
+                        for action, counts in actions.items():
+                            _add_action_count(self.successful_actions, int(day), action,
+                                              counts["count"], counts["exp"])
+                elif event["type"] == "death":
+                    self._apply_death(event["day"], event["cause"])
+                elif event["type"] == "analysis":
+                    self._apply_analysis(event["analysis"])
+                elif event["type"] == "state":
+                    self.risk_tolerance = event["risk_tolerance"]
+                    self.caution_deaths = event["caution_deaths"]
+
+
+def knowledge_log_filename(filename):
+    return os.path.splitext(filename)[0] + ".log.jsonl"
+
+
+def _file_size(filename):
+    return os.path.getsize(filename) if os.path.exists(filename) else 0
+
+
+def _add_action_count(counts, day, action, count, exp):
+    entry = counts.setdefault(day, {}).setdefault(action, {"count": 0, "exp": 0})
+    entry["count"] += count
+    entry["exp"] += exp
+
+
+def _action_counts(successful_actions):
+    """successful_actions z pliku -> liczniki {dzień: {akcja: {"count", "exp"}}}.
+
+    Starsze pliki trzymają listę wpisów {"action", "details"} na dzień - zamieniamy je na liczniki.
+    """
+    counts = {}
+    for day, entries in successful_actions.items():
+        if isinstance(entries, dict):
+            for action, entry in entries.items():
+                _add_action_count(counts, int(day), action, entry["count"], entry["exp"])
+        else:
+            for entry in entries:
+                _add_action_count(counts, int(day), entry["action"], 1, (entry.get("details") or {}).get("exp", 0))
+    return counts
@@ -0,0 +1,234 @@
+"""Historia wyników prób w kolumnach NumPy mapowanych z dysku, z analizami przeżycia.
+
+Każda kolumna (COLUMNS) to osobny plik .npy w katalogu historii, otwierany przez np.memmap,
+a meta.json trzyma liczbę zapisanych prób i słownik przyczyn śmierci. Analizy (krzywa
+Kaplana–Meiera, częstość przyczyn w przedziałach dni, okno kroczące rekordu i mediany) liczą
+się paczkami wierszy, więc miliony prób z treningu wsadowego nie trafiają do obiektów Pythona.
+Próba, która dotrwała do końca, ma przyczynę SURVIVED i jest w krzywej przeżycia obserwacją uciętą.
+
+Uruchomienie z katalogu repozytorium:
+    python survival_2.0b/attempt_history.py --simulate 50 --bucket 10 --window 20
+    python survival_2.0b/attempt_history.py --dir survival_2.0b/attempt_history
+"""
+import argparse
+import json
+import os
+import random
+
+import numpy as np
+from numpy.lib.format import open_memmap
+from numpy.lib.stride_tricks import sliding_window_view
+
+from agent import ACTIONS
+from ai_system import AIKnowledge, QLearningSystem
+from simulation import Simulation
+
+COLUMNS = (
+    ("day", np.int16),
+    ("cause", np.uint8),
+    ("level", np.int16),
+    ("structures", np.int16),
+    ("storage_total", np.int32),
+    ("risk_tolerance", np.float32),
+)
+SURVIVED = "survived"
+CHUNK_ROWS = 1 << 20
+
+
+class AttemptHistory:
+    def __init__(self, directory="survival_2.0b/attempt_history", initial_capacity=1024):
+        self.directory = directory
+        self.initial_capacity = initial_capacity
+        self.count = 0
+        # Kod przyczyny = indeks na liście; 0 zawsze oznacza przeżycie
+        self.causes = [SURVIVED]
+        self.columns = {}
+        self._open()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name + ".npy")
+
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        meta_path = os.path.join(self.directory, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            self.count = meta["count"]
+            self.causes = meta["causes"]
+        for name, dtype in COLUMNS:
+            path = self._path(name)
+            if os.path.exists(path):
+                self.columns[name] = open_memmap(path, mode="r+")
+            else:
+                self.columns[name] = open_memmap(path, mode="w+", dtype=dtype,
+                                                 shape=(max(self.initial_capacity, self.count),))
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def capacity(self):
+        return len(self.columns["day"])
+
+    def column(self, name):
+        """Widok kolumny na zapisane próby (bez kopiowania)."""
+        return self.columns[name][:self.count]
+
+    def cause_code(self, cause):
+        cause = cause or SURVIVED
+        if cause not in self.causes:
+            if len(self.causes) > np.iinfo(np.uint8).max:
+                raise ValueError("Za dużo różnych przyczyn śmierci dla kolumny uint8")
+            self.causes.append(cause)
+        return self.causes.index(cause)
+
+    def _reserve(self, rows):
+        needed = self.count + rows
+        if needed <= self.capacity:
+            return
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        for name, dtype in COLUMNS:
+            # Nowy plik z podwójną pojemnością, kopiowany paczkami, potem podmiana
+            path = self._path(name)
+            temp_path = path + ".tmp.npy"
+            grown = open_memmap(temp_path, mode="w+", dtype=dtype, shape=(capacity,))
+            old = self.columns[name]
+            for rows in _chunks(self.count):
+                grown[rows] = old[rows]
+            grown.flush()
+            del old
+            self.columns[name] = None
+            os.replace(temp_path, path)
+            self.columns[name] = open_memmap(path, mode="r+")
+            del grown
+
+    def append(self, day, cause, level=0, structures=0, storage_total=0, risk_tolerance=0.5):
+        self.append_many({"day": [day], "cause": [self.cause_code(cause)], "level": [level],
+                          "structures": [structures], "storage_total": [storage_total],
+                          "risk_tolerance": [risk_tolerance]})
+
+    def append_agent(self, agent, knowledge):
+        """Wynik próby agenta (po record_death i analyze_death, jeśli zginął)."""
+        cause = agent.death_cause if not agent.alive else None
+        self.append(agent.current_day, cause, agent.level, len(agent.camp["structures"]),
+                    sum(agent.camp["storage"].values()), knowledge.risk_tolerance)
+
+    def append_many(self, values):
+        """Dopisuje paczkę prób: {kolumna: sekwencja}; "cause" w postaci kodów (cause_code)."""
+        rows = len(values["day"])
+        self._reserve(rows)
+        for name, dtype in COLUMNS:
+            self.columns[name][self.count:self.count + rows] = np.asarray(values.get(name, 0), dtype=dtype)
+        self.count += rows
+        self.flush()
+
+    def flush(self):
+        for column in self.columns.values():
+            column.flush()
+        meta_path = os.path.join(self.directory, "meta.json")
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"count": self.count, "causes": self.causes}, f, ensure_ascii=False)
+        # Licznik zapisywany po danych - po awarii najwyżej zgubimy ostatnie próby, nie dostaniemy śmieci
+        os.replace(meta_path + ".tmp", meta_path)
+
+
+def _chunks(count):
+    for start in range(0, count, CHUNK_ROWS):
+        yield slice(start, min(start + CHUNK_ROWS, count))
+
+
+def kaplan_meier(days, causes, max_day=180):
+    """Estymator Kaplana–Meiera: S[t] = P(przeżycie więcej niż t dni), t = 0..max_day.
+
+    Próby z przyczyną 0 (SURVIVED) są ucięte - wypadają z grupy ryzyka bez śmierci.
+    """
+    deaths = np.zeros(max_day + 1, dtype=np.int64)
+    exits = np.zeros(max_day + 1, dtype=np.int64)
+    for rows in _chunks(len(days)):
+        chunk_days = np.clip(days[rows], 0, max_day)
+        exits += np.bincount(chunk_days, minlength=max_day + 1)
+        deaths += np.bincount(chunk_days[causes[rows] != 0], minlength=max_day + 1)
+    at_risk = len(days) - np.concatenate(([0], np.cumsum(exits)[:-1]))
+    hazard = np.divide(deaths, at_risk, out=np.zeros(max_day + 1), where=at_risk > 0)
+    return np.cumprod(1 - hazard)
+
+
+def cause_rates(days, causes, n_causes, bucket=10, max_day=180):
+    """Częstość śmierci z każdej przyczyny w przedziałach dni.
+
+    Zwraca (początki przedziałów, tablica przedziały x przyczyny): liczba śmierci w przedziale
+    podzielona przez liczbę prób, które do początku przedziału dotrwały.
+    """
+    n_buckets = max_day // bucket + 1
+    counts = np.zeros(n_buckets * n_causes, dtype=np.int64)
+    reached = np.zeros(n_buckets, dtype=np.int64)
+    for rows in _chunks(len(days)):
+        chunk_buckets = np.clip(days[rows], 0, max_day).astype(np.int64) // bucket
+        chunk_causes = causes[rows].astype(np.int64)
+        died = chunk_causes != 0
+        counts += np.bincount(chunk_buckets[died] * n_causes + chunk_causes[died], minlength=n_buckets * n_causes)
+        reached += np.bincount(chunk_buckets, minlength=n_buckets)
+    at_risk = len(days) - np.concatenate(([0], np.cumsum(reached)[:-1]))
+    counts = counts.reshape(n_buckets, n_causes)
+    rates = np.divide(counts, at_risk[:, None], out=np.zeros(counts.shape), where=at_risk[:, None] > 0)
+    return np.arange(n_buckets) * bucket, rates
+
+
+def moving_window(days, window=100, step=1):
+    """Rekord i mediana przeżytych dni w oknie kroczącym - (indeks końca okna, rekord, mediana)."""
+    if len(days) < window:
+        return np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0)
+    views = sliding_window_view(days, window)[::step]
+    best = np.empty(len(views))
+    median = np.empty(len(views))
+    # Mediana kopiuje okna - liczymy ją paczkami, żeby kopia nie miała rozmiaru całej historii
+    rows_per_chunk = max(1, CHUNK_ROWS // window)
+    for start in range(0, len(views), rows_per_chunk):
+        chunk = views[start:start + rows_per_chunk]
+        best[start:start + len(chunk)] = chunk.max(axis=1)
+        median[start:start + len(chunk)] = np.median(chunk, axis=1)
+    ends = np.arange(len(views)) * step + window - 1
+    return ends, best, median
+
+
+def report(history, bucket=10, window=100, max_day=180):
+    days = history.column("day")
+    causes = history.column("cause")
+    print(f"Prób: {len(history)}, przyczyny: {', '.join(history.causes[1:]) or '-'}")
+    if not len(history):
+        return
+    survival = kaplan_meier(days, causes, max_day)
+    marks = [d for d in (1, 3, 5, 10, 30, 90, 180) if d <= max_day]
+    print("Krzywa przeżycia (Kaplan–Meier): " + ", ".join(f"S({d})={survival[d]:.3f}" for d in marks))
+    starts, rates = cause_rates(days, causes, len(history.causes), bucket, max_day)
+    print(f"\nŚmierci na próbę w przedziałach po {bucket} dni:")
+    for start, row in zip(starts, rates):
+        if row.any():
+            print(f"  dni {start:>3}-{start + bucket - 1:<3} " + ", ".join(
+                f"{history.causes[c]} {row[c]:.3f}" for c in np.flatnonzero(row)))
+    ends, best, median = moving_window(days, min(window, len(days)), max(1, min(window, len(days)) // 4))
+    print(f"\nOkno kroczące ({min(window, len(days))} prób):")
+    for end, b, m in zip(ends[-5:], best[-5:], median[-5:]):
+        print(f"  do próby {end + 1}: rekord {b:.0f}, mediana {m:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kolumnowa historia prób i analizy przeżycia")
+    parser.add_argument("--dir", default="survival_2.0b/attempt_history")
+    parser.add_argument("--simulate", type=int, default=0, help="rozegraj najpierw tyle prób bez renderowania")
+    parser.add_argument("--bucket", type=int, default=10, help="szerokość przedziału dni")
+    parser.add_argument("--window", type=int, default=100, help="szerokość okna kroczącego w próbach")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    history = AttemptHistory(args.dir)
+    if args.simulate:
+        random.seed(args.seed)
+        simulation = Simulation(AIKnowledge(), q_learning=QLearningSystem(list(ACTIONS)), save_files=False,
+                                history=history, headless=True)
+        for _ in range(args.simulate):
+            simulation.run_attempt()
+    report(history, args.bucket, args.window)
@@ -0,0 +1,82 @@
+"""Zapis wiedzy i tablicy Q w wątku w tle, żeby koniec próby nie zatrzymywał klatki.
+
+save() robi na wątku gry tylko migawkę stanu (prepare_save obiektu), a zapis na dysk (write_save:
+plik tymczasowy + os.replace albo transakcja SQLite) wykonuje wątek zapisu. Jeśli dla tego samego
+pliku czeka już niezapisana migawka, nowa jest z nią łączona (merge_saves) zamiast ustawiać się w kolejce.
+Przed wyjściem trzeba wywołać flush() albo close().
+"""
+import threading
+import time
+
+
+class BackgroundSaver:
+    def __init__(self):
+        self._condition = threading.Condition()
+        # Kolejka zadań jako lista kluczy w kolejności zgłoszeń + migawki po kluczu
+        self._order = []
+        self._jobs = {}
+        self._busy = False
+        self._closed = False
+        self.stats = {"requests": 0, "writes": 0, "coalesced": 0, "failures": 0, "write_seconds": 0.0}
+        self._thread = threading.Thread(target=self._run, name="background-saver", daemon=True)
+        self._thread.start()
+
+    def save(self, target, filename=None):
+        """Zleca zapis target (AIKnowledge, QLearningSystem...). Zwraca od razu."""
+        job = target.prepare_save() if filename is None else target.prepare_save(filename)
+        key = (id(target), job["filename"])
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("BackgroundSaver jest zamknięty")
+            self.stats["requests"] += 1
+            if key in self._jobs:
+                _, older = self._jobs[key]
+                self._jobs[key] = (target, target.merge_saves(older, job))
+                self.stats["coalesced"] += 1
+            else:
+                self._jobs[key] = (target, job)
+                self._order.append(key)
+            self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        """Czeka, aż wszystkie zlecone zapisy trafią na dysk. Zwraca False po przekroczeniu timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._order or self._busy:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def close(self, timeout=None):
+        flushed = self.flush(timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        return flushed
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._order and not self._closed:
+                    self._condition.wait()
+                if not self._order:
+                    return
+                key = self._order.pop(0)
+                target, job = self._jobs.pop(key)
+                self._busy = True
+            start = time.perf_counter()
+            try:
+                ok = target.write_save(job)
+            except Exception as e:
+                print(f"Błąd zapisu w tle: {e}")
+                ok = False
+            with self._condition:
+                self.stats["writes"] += 1
+                self.stats["write_seconds"] += time.perf_counter() - start
+                if ok is False:
+                    self.stats["failures"] += 1
+                self._busy = False
+                self._condition.notify_all()
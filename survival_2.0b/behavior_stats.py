@@ -0,0 +1,96 @@
+"""Statystyki zachowania agenta o stałym koszcie i stałej pamięci.
+
+ActionWindow to bufor pierścieniowy ostatnich akcji z histogramem i liczbą różnych akcji
+aktualizowanymi przy każdym wpisie w O(1) - wykrywanie pętli nie kopiuje historii ani nie buduje zbioru.
+DecayedCounters to liczniki wygaszane wykładniczo z czasem gry: wartość jest przeliczana
+dopiero przy odczycie lub dopisaniu według znacznika czasu, więc koniec dnia nie przegląda kluczy.
+"""
+from array import array
+
+from actions import Q_ACTIONS
+
+
+class ActionWindow:
+    """Ostatnie size numerów akcji (rejestr actions.py)."""
+
+    __slots__ = ("size", "buffer", "head", "count", "total", "histogram", "distinct")
+
+    def __init__(self, size=10, n_actions=len(Q_ACTIONS)):
+        self.size = size
+        self.buffer = array("b", [-1] * size)
+        self.head = 0
+        self.count = 0
+        # Wszystkie wpisy od początku próby (także te, które już wypadły z okna)
+        self.total = 0
+        self.histogram = array("i", [0] * n_actions)
+        self.distinct = 0
+
+    def push(self, action):
+        if self.count == self.size:
+            old = self.buffer[self.head]
+            self.histogram[old] -= 1
+            if not self.histogram[old]:
+                self.distinct -= 1
+        else:
+            self.count += 1
+        self.buffer[self.head] = action
+        if not self.histogram[action]:
+            self.distinct += 1
+        self.histogram[action] += 1
+        self.head = (self.head + 1) % self.size
+        self.total += 1
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        """Akcje w oknie od najstarszej."""
+        start = (self.head - self.count) % self.size
+        return (self.buffer[(start + i) % self.size] for i in range(self.count))
+
+    def distinct_actions(self):
+        return [action for action, count in enumerate(self.histogram) if count]
+
+    def copy(self):
+        other = ActionWindow.__new__(ActionWindow)
+        other.size = self.size
+        other.buffer = array("b", self.buffer)
+        other.head = self.head
+        other.count = self.count
+        other.total = self.total
+        other.histogram = array("i", self.histogram)
+        other.distinct = self.distinct
+        return other
+
+
+class DecayedCounters:
+    """Liczniki z wykładniczym zanikiem: po half_life dniach gry wartość spada o połowę."""
+
+    __slots__ = ("half_life", "values", "stamps")
+
+    def __init__(self, half_life=3.0):
+        self.half_life = half_life
+        self.values = {}
+        self.stamps = {}
+
+    def get(self, key, now):
+        value = self.values.get(key)
+        if value is None:
+            return 0.0
+        return value * 0.5 ** ((now - self.stamps[key]) / self.half_life)
+
+    def add(self, key, now, amount=1.0):
+        self.values[key] = self.get(key, now) + amount
+        self.stamps[key] = now
+
+    def items(self, now):
+        return [(key, self.get(key, now)) for key in self.values]
+
+    def __len__(self):
+        return len(self.values)
+
+    def copy(self):
+        other = DecayedCounters(self.half_life)
+        other.values = dict(self.values)
+        other.stamps = dict(self.stamps)
+        return other
@@ -0,0 +1,74 @@
+"""Pochodne statystyki agenta liczone raz, a nie w każdej klatce.
+
+compute_effective_stats przepuszcza agenta przez kolejne modyfikatory (atrybuty, umiejętności,
+ścieżka rozwoju, ekwipunek, struktury obozu) i zwraca niezmienny rekord EffectiveStats.
+Agent trzyma go w pamięci podręcznej i unieważnia przy awansie, wyborze umiejętności,
+zmianie ekwipunku i budowie struktury (Agent.invalidate_stats) - update() tylko mnoży przez gotowe wartości.
+"""
+from collections import namedtuple
+
+EffectiveStats = namedtuple("EffectiveStats", (
+    "hunger_drain",         # spadek głodu na dobę
+    "thirst_drain",         # spadek pragnienia na dobę
+    "hunger_reduction",     # ułamek, o który umiejętności zmniejszają spadek głodu
+    "thirst_reduction",
+    "stamina_regen",        # regeneracja staminy na sekundę bezczynności (bez bonusu obozu)
+    "hp_regen",             # regeneracja HP na sekundę bezczynności
+    "carry_capacity",
+    "harvest_multiplier",   # mnożnik zbieranej ilości z narzędzia
+    "move_stamina_cost",    # stamina za krok
+    "gathering_exp_bonus",  # dodatek do mnożnika EXP za zbieranie
+    "has_fire",
+    "has_shelter",
+))
+
+
+def _base_stats(agent, stats):
+    stats["hunger_drain"] = 20.0
+    stats["thirst_drain"] = 25.0
+    stats["hunger_reduction"] = 0
+    stats["thirst_reduction"] = 0
+    stats["stamina_regen"] = 2.0 + (agent.vitality * 0.5)
+    stats["hp_regen"] = agent.vitality * 0.05
+    stats["carry_capacity"] = agent.base_carry_capacity + agent.strength
+    stats["harvest_multiplier"] = 1.0
+    stats["move_stamina_cost"] = 2
+    stats["gathering_exp_bonus"] = 0
+
+
+def _skill_modifiers(agent, stats):
+    if "Survivalista" in agent.learned_skills:
+        skill = agent.learned_skills["Survivalista"]
+        stats["hunger_reduction"] = skill.get_effect("hunger_reduction")
+        stats["thirst_reduction"] = skill.get_effect("thirst_reduction")
+        stats["hunger_drain"] *= (1 - stats["hunger_reduction"])
+        stats["thirst_drain"] *= (1 - stats["thirst_reduction"])
+
+
+def _path_modifiers(agent, stats):
+    if agent.chosen_path:
+        stats["move_stamina_cost"] *= (1.0 - agent.chosen_path.get_bonus("stamina_reduction"))
+        stats["gathering_exp_bonus"] = agent.chosen_path.get_bonus("gathering_bonus")
+
+
+def _equipment_modifiers(agent, stats):
+    if agent.equipment["backpack"]:
+        stats["carry_capacity"] += agent.equipment["backpack"].stats_bonus.get("carry_capacity", 0)
+    if agent.equipment["tool"]:
+        stats["harvest_multiplier"] = agent.equipment["tool"].stats_bonus.get("harvest_speed", 1.0)
+
+
+def _structure_modifiers(agent, stats):
+    types = {structure.type for structure in agent.camp["structures"]}
+    stats["has_fire"] = "fire" in types
+    stats["has_shelter"] = "shelter" in types
+
+
+STAT_MODIFIERS = (_base_stats, _skill_modifiers, _path_modifiers, _equipment_modifiers, _structure_modifiers)
+
+
+def compute_effective_stats(agent, modifiers=STAT_MODIFIERS):
+    stats = {}
+    for modifier in modifiers:
+        modifier(agent, stats)
+    return EffectiveStats(**stats)
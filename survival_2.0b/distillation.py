@@ -0,0 +1,260 @@
+"""Destylacja tablicy Q do małej sieci MLP w NumPy (stała pamięć niezależnie od liczby stanów).
+
+Stany z bufora replay wchodzą do zbioru uczącego tyle razy, ile razy wystąpiły, więc częste stany
+ważą więcej. Plik tablicy Q nie zawiera bufora - --collect najpierw rozgrywa podaną liczbę prób
+zamrożoną tablicą (bez uczenia), żeby zebrać odwiedzane stany.
+
+Uruchomienie z katalogu repozytorium:
+    python survival_2.0b/distillation.py --input survival_2.0b/q_table.npz --collect 5 --attempts 5
+"""
+import argparse
+import random
+
+import numpy as np
+
+from agent import ACTIONS, Q_ACTIONS
+from ai_system import AIKnowledge, QLearningSystem, STATE_BOUNDS, STATE_SIZE, decode_state, encode_state
+from replay_buffer import ReplayBuffer
+from simulation import Simulation
+
+FEATURE_SCALE = np.array(STATE_BOUNDS, dtype=np.float32) - 1
+
+
+def state_features(encoded_states):
+    """Zakodowane stany (N x STATE_SIZE) -> cechy w zakresie [0, 1]."""
+    encoded = np.clip(np.asarray(encoded_states, dtype=np.float32), 0, FEATURE_SCALE)
+    return encoded / FEATURE_SCALE
+
+
+class TinyMLP:
+    """Sieć z dwiema warstwami ukrytymi ReLU, trenowana Adamem na maskowanym MSE."""
+
+    def __init__(self, input_size, output_size, hidden_size=32, seed=0):
+        rng = np.random.default_rng(seed)
+        sizes = [input_size, hidden_size, hidden_size, output_size]
+        self.weights = [rng.normal(0, np.sqrt(2 / n_in), (n_in, n_out)).astype(np.float32)
+                        for n_in, n_out in zip(sizes[:-1], sizes[1:])]
+        self.biases = [np.zeros(n_out, dtype=np.float32) for n_out in sizes[1:]]
+        # Wartości Q mają rząd setek - sieć uczy się ich w skali ~1
+        self.output_scale = 1.0
+        # Akcje, które miały cel w zbiorze uczącym - wyjścia pozostałych nic nie znaczą
+        self.trained_actions = np.ones(output_size, dtype=bool)
+
+    def predict(self, x):
+        h = np.asarray(x, dtype=np.float32)
+        for w, b in zip(self.weights[:-1], self.biases[:-1]):
+            h = np.maximum(h @ w + b, 0)
+        return (h @ self.weights[-1] + self.biases[-1]) * self.output_scale
+
+    def fit(self, x, y, mask, epochs=300, batch_size=64, learning_rate=0.01, seed=0):
+        self.output_scale = float(np.abs(y[mask > 0]).max(initial=0.0)) or 1.0
+        self.trained_actions = (mask > 0).any(axis=0)
+        y = y / self.output_scale
+        rng = np.random.default_rng(seed)
+        params = self.weights + self.biases
+        m = [np.zeros_like(p) for p in params]
+        v = [np.zeros_like(p) for p in params]
+        beta1, beta2, step = 0.9, 0.999, 0
+        for _ in range(epochs):
+            order = rng.permutation(len(x))
+            for start in range(0, len(x), batch_size):
+                batch = order[start:start + batch_size]
+                grads = self._gradients(x[batch], y[batch], mask[batch])
+                step += 1
+                for i, (p, g) in enumerate(zip(params, grads)):
+                    m[i] = beta1 * m[i] + (1 - beta1) * g
+                    v[i] = beta2 * v[i] + (1 - beta2) * g * g
+                    m_hat = m[i] / (1 - beta1 ** step)
+                    v_hat = v[i] / (1 - beta2 ** step)
+                    p -= learning_rate * m_hat / (np.sqrt(v_hat) + 1e-8)
+        return self.loss(x, y * self.output_scale, mask)
+
+    def loss(self, x, y, mask):
+        error = (self.predict(x) - y) * mask
+        return float((error ** 2).sum() / max(mask.sum(), 1))
+
+    def _gradients(self, x, y, mask):
+        activations = [x]
+        h = x
+        for w, b in zip(self.weights[:-1], self.biases[:-1]):
+            h = np.maximum(h @ w + b, 0)
+            activations.append(h)
+        out = h @ self.weights[-1] + self.biases[-1]
+        # y jest tu już przeskalowane przez output_scale
+        delta = 2 * (out - y) * mask / max(mask.sum(), 1)
+        weight_grads = [None] * len(self.weights)
+        bias_grads = [None] * len(self.biases)
+        for layer in reversed(range(len(self.weights))):
+            weight_grads[layer] = activations[layer].T @ delta
+            bias_grads[layer] = delta.sum(axis=0)
+            if layer > 0:
+                delta = (delta @ self.weights[layer].T) * (activations[layer] > 0)
+        return weight_grads + bias_grads
+
+    def parameter_bytes(self):
+        return sum(p.nbytes for p in self.weights + self.biases)
+
+
+class QuantizedMLP:
+    """Wagi int8 (symetrycznie, skala per neuron wyjściowy), biasy float32."""
+
+    def __init__(self, mlp):
+        self.scales = []
+        self.weights = []
+        for w in mlp.weights:
+            scale = np.abs(w).max(axis=0) / 127
+            scale = np.where(scale > 0, scale, 1.0).astype(np.float32)
+            self.scales.append(scale)
+            self.weights.append(np.clip(np.round(w / scale), -127, 127).astype(np.int8))
+        self.biases = [b.copy() for b in mlp.biases]
+        self.output_scale = mlp.output_scale
+        self.trained_actions = mlp.trained_actions.copy()
+
+    def predict(self, x):
+        h = np.asarray(x, dtype=np.float32)
+        for i, (w, scale, b) in enumerate(zip(self.weights, self.scales, self.biases)):
+            h = (h @ w.astype(np.float32)) * scale + b
+            if i < len(self.weights) - 1:
+                h = np.maximum(h, 0)
+        return h * self.output_scale
+
+    def parameter_bytes(self):
+        return sum(w.nbytes for w in self.weights) + sum(s.nbytes + b.nbytes for s, b in zip(self.scales, self.biases))
+
+    def save(self, filename):
+        arrays = {}
+        for i, (w, scale, b) in enumerate(zip(self.weights, self.scales, self.biases)):
+            arrays[f"w{i}"] = w
+            arrays[f"scale{i}"] = scale
+            arrays[f"b{i}"] = b
+        np.savez(filename, actions=np.array(Q_ACTIONS, dtype=str), output_scale=np.float32(self.output_scale),
+                 trained_actions=self.trained_actions, **arrays)
+
+
+def distillation_dataset(q_learning, actions=Q_ACTIONS, buffer=None):
+    """Wiersze tablicy Q oraz stany z bufora replay (z ich częstością) -> (cechy, cele, maska).
+
+    buffer domyślnie to bufor q_learning; po wczytaniu tablicy z pliku jest pusty - zob. collect_replay.
+    """
+    action_ids = {action: i for i, action in enumerate(actions)}
+    states = [s for s, q_values in q_learning.q_table.items() if q_values]
+    if buffer is None:
+        buffer = q_learning.replay_buffer
+    replay_states = (decode_state(row) for row in buffer.states[:len(buffer)])
+    states += [s for s in replay_states if q_learning.q_table.get(s)]
+
+    targets = np.zeros((len(states), len(actions)), dtype=np.float32)
+    mask = np.zeros((len(states), len(actions)), dtype=np.float32)
+    for i, state in enumerate(states):
+        for action, value in q_learning.get_q_values(state).items():
+            if action in action_ids:
+                targets[i, action_ids[action]] = value
+                mask[i, action_ids[action]] = 1
+    features = state_features([encode_state(s) for s in states]).reshape(-1, len(STATE_BOUNDS))
+    return features, targets, mask
+
+
+class FrozenQLearningSystem(QLearningSystem):
+    """Zamrożona polityka: zawsze exploit, bez uczenia - do porównań w symulacji."""
+
+    def __init__(self, actions, q_table=None):
+        super().__init__(actions, replay_capacity=1)
+        self.q_table = q_table if q_table is not None else {}
+        self.epsilon = 0.0
+
+    def remember(self, state, action, reward, next_state, done=False):
+        pass
+
+
+class ReplayCollector(FrozenQLearningSystem):
+    """Zamrożona tablica, która tylko zapisuje odwiedzane przejścia do bufora replay."""
+
+    def __init__(self, q_learning, capacity=5000):
+        super().__init__(list(ACTIONS), q_learning.q_table)
+        self.coarse_table = q_learning.coarse_table
+        self.replay_buffer = ReplayBuffer(capacity, STATE_SIZE)
+
+    def remember(self, state, action, reward, next_state, done=False):
+        self.replay_buffer.push(encode_state(state), self.action_id(action), reward, encode_state(next_state), done)
+
+
+def collect_replay(q_learning, attempts, seed=0, capacity=5000):
+    """Bufor replay z attempts prób zachłanną polityką tablicy (tablica się nie zmienia)."""
+    collector = ReplayCollector(q_learning, capacity)
+    survival_days(collector, attempts, seed)
+    return collector.replay_buffer
+
+
+class MLPQLearningSystem(FrozenQLearningSystem):
+    def __init__(self, actions, model):
+        super().__init__(actions)
+        self.model = model
+        self.trained_ids = np.flatnonzero(model.trained_actions)
+
+    def get_q_values(self, state):
+        # Tylko akcje, które sieć widziała w uczeniu - tak jak tablica zna tylko wypróbowane akcje
+        q_values = self.model.predict(state_features([encode_state(state)]))[0]
+        return {Q_ACTIONS[i]: float(q_values[i]) for i in self.trained_ids}
+
+    def act(self, observations):
+        """Wsadowe decyzje dla obserwacji z SurvivalVecEnv - zwraca identyfikatory akcji Q_ACTIONS."""
+        q_values = self.model.predict(state_features(observations))
+        return np.where(self.model.trained_actions, q_values, -np.inf).argmax(axis=1)
+
+
+def survival_days(policy, attempts, seed):
+    random.seed(seed)
+    simulation = Simulation(AIKnowledge(), q_learning=policy, save_files=False, headless=True)
+    return [simulation.run_attempt() for _ in range(attempts)]
+
+
+def distill(q_learning, hidden_size=32, epochs=300, attempts=5, seed=0, buffer=None):
+    features, targets, mask = distillation_dataset(q_learning, buffer=buffer)
+    if len(features) == 0:
+        raise ValueError("Tablica Q jest pusta - nie ma czego destylować")
+    mlp = TinyMLP(features.shape[1], len(Q_ACTIONS), hidden_size, seed)
+    loss = mlp.fit(features, targets, mask, epochs=epochs, seed=seed)
+    quantized = QuantizedMLP(mlp)
+
+    # Zgodność liczona wśród akcji, które tablica zna (jak max w choose_action)
+    table_greedy = np.where(mask > 0, targets, -np.inf).argmax(axis=1)
+
+    def agreement(model):
+        predicted = np.where(mask > 0, model.predict(features), -np.inf).argmax(axis=1)
+        return float((predicted == table_greedy).mean())
+
+    report = {
+        "samples": len(features),
+        "loss": loss,
+        "agreement": agreement(mlp),
+        "agreement_int8": agreement(quantized),
+        "float_bytes": mlp.parameter_bytes(),
+        "int8_bytes": quantized.parameter_bytes(),
+    }
+    if attempts:
+        table_policy = FrozenQLearningSystem(list(ACTIONS), q_learning.q_table)
+        report["table_days"] = float(np.mean(survival_days(table_policy, attempts, seed)))
+        report["mlp_days"] = float(np.mean(survival_days(MLPQLearningSystem(list(ACTIONS), mlp), attempts, seed)))
+        report["mlp_int8_days"] = float(np.mean(
+            survival_days(MLPQLearningSystem(list(ACTIONS), quantized), attempts, seed)))
+    return mlp, quantized, report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Destylacja tablicy Q do sieci MLP z wagami int8")
+    parser.add_argument("--input", default="survival_2.0b/q_table.npz")
+    parser.add_argument("--output", default="survival_2.0b/mlp_policy.npz")
+    parser.add_argument("--hidden", type=int, default=32)
+    parser.add_argument("--epochs", type=int, default=300)
+    parser.add_argument("--attempts", type=int, default=5, help="próby do porównania przeżytych dni")
+    parser.add_argument("--collect", type=int, default=5, help="próby zbierające stany do bufora replay (0 = bez)")
+    args = parser.parse_args()
+
+    q_learning = QLearningSystem(list(ACTIONS))
+    if not q_learning.load_from_file(args.input):
+        raise SystemExit(f"Brak tablicy Q: {args.input}")
+    buffer = collect_replay(q_learning, args.collect) if args.collect else None
+    _, quantized, report = distill(q_learning, args.hidden, args.epochs, args.attempts, buffer=buffer)
+    quantized.save(args.output)
+    for key, value in report.items():
+        print(f"{key}: {value:.4f}" if isinstance(value, float) else f"{key}: {value}")
@@ -0,0 +1,112 @@
+"""Dziennik zdarzeń i myśli agenta: bufor pierścieniowy, poziomy ważności, leniwe formatowanie.
+
+Wpis to (poziom, szablon, argumenty) - napis powstaje dopiero przy odczycie (UI), a w trybie
+headless nie powstaje wcale: zostają tylko liczniki wpisów na szablon i na poziom.
+Message to wynik akcji w tej samej postaci (szablon + argumenty), więc akcje też nie składają napisów.
+EdgeTrigger zgłasza warunek raz na zmianę stanu (fałsz -> prawda) i najwyżej raz na zadany
+odstęp czasu, zamiast w każdej klatce, w której warunek trwa.
+"""
+from collections import Counter, deque
+
+DEBUG, INFO, WARNING, CRITICAL = range(4)
+LEVEL_NAMES = ("DEBUG", "INFO", "WARNING", "CRITICAL")
+
+
+class EventLog:
+    """Ostatnie capacity wpisów; obiekt jest wywoływalny, więc może służyć jako add_log agenta."""
+
+    def __init__(self, capacity=8, headless=False, min_level=DEBUG):
+        self.entries = deque(maxlen=capacity)
+        self.headless = headless
+        # Wpisy poniżej min_level są tylko liczone
+        self.min_level = min_level
+        self.counts = Counter()
+        self.level_counts = [0] * len(LEVEL_NAMES)
+
+    def add(self, template, *args, level=INFO):
+        """Szablon w stylu str.format, formatowany dopiero przy odczycie."""
+        self.counts[template] += 1
+        self.level_counts[level] += 1
+        if self.headless or level < self.min_level:
+            return
+        self.entries.append((level, template, args))
+
+    __call__ = add
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        """Sformatowane wpisy od najstarszego."""
+        return (_format(template, args) for _, template, args in self.entries)
+
+    def latest(self):
+        if not self.entries:
+            return None
+        _, template, args = self.entries[-1]
+        return _format(template, args)
+
+    def messages(self, min_level=DEBUG):
+        return [_format(template, args) for level, template, args in self.entries if level >= min_level]
+
+    def clear(self):
+        """Czyści bufor; liczniki zostają (sumują się przez wszystkie próby)."""
+        self.entries.clear()
+
+    def copy(self):
+        other = EventLog(self.entries.maxlen, self.headless, self.min_level)
+        other.entries.extend(self.entries)
+        other.counts = self.counts.copy()
+        other.level_counts = list(self.level_counts)
+        return other
+
+    def summary(self):
+        return {name: count for name, count in zip(LEVEL_NAMES, self.level_counts) if count}
+
+
+class Message:
+    """Szablon str.format z argumentami; napis powstaje dopiero przy str() - np. gdy EventLog formatuje wpis."""
+
+    __slots__ = ("template", "args", "level")
+
+    def __init__(self, template, *args, level=INFO):
+        self.template = template
+        self.args = args
+        self.level = level
+
+    def __str__(self):
+        return _format(self.template, self.args)
+
+    def __repr__(self):
+        return f"Message({str(self)!r})"
+
+
+def _format(template, args):
+    return template.format(*args) if args else template
+
+
+class EdgeTrigger:
+    """Nazwane warunki wykrywane zboczem narastającym, z minimalnym odstępem między zgłoszeniami."""
+
+    def __init__(self, cooldown=0.0):
+        self.cooldown = cooldown
+        self.active = {}
+        self.last_fired = {}
+
+    def rising(self, key, condition, now=0.0):
+        """True tylko gdy warunek właśnie stał się prawdziwy i od ostatniego zgłoszenia minął cooldown."""
+        was_active = self.active.get(key, False)
+        self.active[key] = condition
+        if not condition or was_active:
+            return False
+        last = self.last_fired.get(key)
+        if last is not None and now - last < self.cooldown:
+            return False
+        self.last_fired[key] = now
+        return True
+
+    def copy(self):
+        other = EdgeTrigger(self.cooldown)
+        other.active = dict(self.active)
+        other.last_fired = dict(self.last_fired)
+        return other
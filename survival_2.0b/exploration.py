@@ -0,0 +1,98 @@
+"""Mapa odkrytych pól jako siatka bitów z bieżącą liczbą odkrytych pól.
+
+Każdy wiersz mapy to jedna liczba całkowita, której bit x oznacza odkryte pole (x, y) -
+około 1 bit na pole zamiast krotki w zbiorze. Agent odkrywa od razu całe koło o promieniu
+wzroku (sight_radius z percepcji ponad startową; na starcie promień 0, czyli jedno pole):
+maski wierszy koła są liczone raz na promień, a krok to kilka przesunięć i OR na wierszach,
+z liczeniem nowych bitów przez bit_count.
+"""
+import numpy as np
+
+# Percepcja na starcie gry - przy niej agent odkrywa tylko pole, na którym stoi (jak przed mapą bitową),
+# więc progi eksploracji (kara za ostrożność, analiza śmierci) liczą pola tak samo jak wcześniej
+BASE_PERCEPTION = 5
+# Punkty percepcji ponad startową na jedno pole promienia wzroku
+PERCEPTION_PER_RADIUS = 5
+
+_DISC_MASKS = {}
+
+
+def sight_radius(perception):
+    return max(0, perception - BASE_PERCEPTION) // PERCEPTION_PER_RADIUS
+
+
+def disc_masks(radius):
+    """[(dy, maska)] koła o danym promieniu; bit radius + dx maski to pole przesunięte o dx."""
+    masks = _DISC_MASKS.get(radius)
+    if masks is None:
+        masks = []
+        for dy in range(-radius, radius + 1):
+            mask = 0
+            for dx in range(-radius, radius + 1):
+                if dx * dx + dy * dy <= radius * radius:
+                    mask |= 1 << (radius + dx)
+            masks.append((dy, mask))
+        _DISC_MASKS[radius] = masks
+    return masks
+
+
+class ExplorationMap:
+    """Odkryte pola; len() i "(x, y) in" działają jak dla dawnego zbioru krotek."""
+
+    __slots__ = ("width", "height", "rows", "count", "row_mask")
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.rows = [0] * height
+        self.count = 0
+        self.row_mask = (1 << width) - 1
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, position):
+        x, y = position
+        return self.is_discovered(x, y)
+
+    def is_discovered(self, x, y):
+        return 0 <= y < self.height and 0 <= x < self.width and bool(self.rows[y] >> x & 1)
+
+    def reveal(self, x, y, radius=0):
+        """Odkrywa koło wokół (x, y). Zwraca liczbę nowo odkrytych pól."""
+        rows = self.rows
+        added = 0
+        for dy, mask in disc_masks(radius):
+            row_y = y + dy
+            if not 0 <= row_y < self.height:
+                continue
+            shift = x - radius
+            shifted = (mask << shift if shift >= 0 else mask >> -shift) & self.row_mask
+            new_bits = shifted & ~rows[row_y]
+            if new_bits:
+                rows[row_y] |= new_bits
+                added += new_bits.bit_count()
+        self.count += added
+        return added
+
+    def reveal_all(self):
+        self.rows = [self.row_mask] * self.height
+        self.count = self.width * self.height
+
+    def as_array(self):
+        """Siatka bool [y, x] - np. do rysowania mgły wojny."""
+        grid = np.zeros((self.height, self.width), dtype=bool)
+        for y, row in enumerate(self.rows):
+            if row:
+                bits = np.frombuffer(row.to_bytes((self.width + 7) // 8, "little"), dtype=np.uint8)
+                grid[y] = np.unpackbits(bits, bitorder="little")[:self.width].astype(bool)
+        return grid
+
+    def copy(self):
+        other = ExplorationMap.__new__(ExplorationMap)
+        other.width = self.width
+        other.height = self.height
+        other.rows = list(self.rows)
+        other.count = self.count
+        other.row_mask = self.row_mask
+        return other
@@ -0,0 +1,228 @@
+"""Symulacja w arytmetyce stałoprzecinkowej - tak, jak będzie liczona na mikrokontrolerze.
+
+Parametry życiowe agenta (hp, głód, pragnienie, stamina, ciepło i ich maksima) są liczbami całkowitymi
+w skali 1/VITAL_SCALE (Q8, int32), a zegary (postęp dnia, cooldown ruchu, bezczynność) liczą się
+w tickach TICK_HZ. Spadki i regeneracja to stałe całkowite tempo rozkładane na ticki akumulatorem
+z resztą (jak w algorytmie Bresenhama), więc przez dobę agent traci dokładnie tyle, ile w silniku
+zmiennoprzecinkowym, bez ułamków. Silnik float (Agent.update) jest punktem odniesienia.
+
+Uruchomienie z katalogu repozytorium:
+    python survival_2.0b/fixed_point.py --seed 0 --max-days 30
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from agent import ACTIONS, Agent
+from ai_system import AIKnowledge, QLearningSystem
+from simulation import Simulation
+
+VITAL_SCALE = 256
+VITAL_DTYPE = np.int32
+TICK_HZ = 60
+DAY_TICKS = 90 * TICK_HZ
+NIGHT_START_TICKS = DAY_TICKS * 6 // 10
+VITALS = ("hp", "hunger", "thirst", "stamina", "warmth")
+
+
+def to_fixed(value):
+    return int(round(value * VITAL_SCALE))
+
+
+def _fixed_property(name):
+    attr = "_fx_" + name
+
+    def getter(self):
+        return getattr(self, attr) / VITAL_SCALE
+
+    def setter(self, value):
+        setattr(self, attr, to_fixed(value))
+
+    return property(getter, setter)
+
+
+def _tick_property(name):
+    attr = "_ticks_" + name
+    scale = DAY_TICKS if name == "day_progress" else TICK_HZ
+
+    def getter(self):
+        return getattr(self, attr) / scale
+
+    def setter(self, value):
+        setattr(self, attr, int(round(value * scale)))
+
+    return property(getter, setter)
+
+
+class FixedPointAgent(Agent):
+    """Agent, którego parametry życiowe i zegary są liczbami całkowitymi.
+
+    Reszta kodu (akcje, AI, UI) widzi te same atrybuty co w Agent - właściwości przeliczają je
+    na float przy odczycie i zaokrąglają do skali przy zapisie. update() liczy wyłącznie na liczbach całkowitych.
+    """
+
+    hp = _fixed_property("hp")
+    max_hp = _fixed_property("max_hp")
+    hunger = _fixed_property("hunger")
+    thirst = _fixed_property("thirst")
+    stamina = _fixed_property("stamina")
+    max_stamina = _fixed_property("max_stamina")
+    warmth = _fixed_property("warmth")
+    day_progress = _tick_property("day_progress")
+    move_cooldown = _tick_property("move_cooldown")
+    idle_timer = _tick_property("idle_timer")
+
+    def __init__(self, *args, **kwargs):
+        # Akumulatory reszt dla tempa zmian; start od połowy mianownika daje zaokrąglanie do najbliższej
+        self._acc_hunger = DAY_TICKS // 2
+        self._acc_thirst = DAY_TICKS // 2
+        self._acc_stamina = 2 * TICK_HZ
+        self._acc_hp_regen = 10 * TICK_HZ
+        self._acc_hp_night = 25 * TICK_HZ
+        self._acc_warmth = 5 * TICK_HZ
+        super().__init__(*args, **kwargs)
+
+    def vitals(self):
+        """Surowe wartości stałoprzecinkowe w kolejności VITALS."""
+        return self._fx_hp, self._fx_hunger, self._fx_thirst, self._fx_stamina, self._fx_warmth
+
+    def update(self, delta_time, world_map):
+        for _ in range(max(1, int(round(delta_time * TICK_HZ)))):
+            self.tick(world_map)
+
+    def tick(self, world_map):
+        self._ticks_move_cooldown = max(0, self._ticks_move_cooldown - 1)
+
+        if self._fx_stamina <= 2 * VITAL_SCALE and self.move_target is not None:
+            self.move_target = None
+            self.add_log("Krytyczna stamina — przerwanie ruchu. Odpoczynek...")
+
+        if self.move_target and self._ticks_move_cooldown <= 0:
+            self._do_move_step_towards_target(world_map)
+
+        # Spadek na dobę (w jednostkach skali) rozłożony równo na DAY_TICKS ticków
+        stats = self._stats or self.effective_stats()
+        hunger_per_day = 20 * VITAL_SCALE * (100 - round(100 * stats.hunger_reduction)) // 100
+        thirst_per_day = 25 * VITAL_SCALE * (100 - round(100 * stats.thirst_reduction)) // 100
+        self._acc_hunger += hunger_per_day
+        self._fx_hunger -= self._acc_hunger // DAY_TICKS
+        self._acc_hunger %= DAY_TICKS
+        self._acc_thirst += thirst_per_day
+        self._fx_thirst -= self._acc_thirst // DAY_TICKS
+        self._acc_thirst %= DAY_TICKS
+
+        if self._ticks_move_cooldown <= 0 and not self.move_target:
+            self._ticks_idle_timer += 1
+        else:
+            self._ticks_idle_timer = 0
+
+        if self._ticks_idle_timer >= TICK_HZ and self._ticks_day_progress < NIGHT_START_TICKS:
+            # (2 + 0.5 * witalność) na sekundę, x1.5 w obozie -> licznik w ćwiartkach jednostki na sekundę
+            self._acc_stamina += (4 + self.vitality) * VITAL_SCALE * (3 if self.in_camp else 2)
+            self._fx_stamina = min(self._fx_stamina + self._acc_stamina // (4 * TICK_HZ), self._fx_max_stamina)
+            self._acc_stamina %= 4 * TICK_HZ
+            # 0.05 * witalność HP na sekundę
+            self._acc_hp_regen += self.vitality * VITAL_SCALE
+            self._fx_hp = min(self._fx_hp + self._acc_hp_regen // (20 * TICK_HZ), self._fx_max_hp)
+            self._acc_hp_regen %= 20 * TICK_HZ
+
+        self._fx_stamina = max(0, min(self._fx_stamina, self._fx_max_stamina))
+
+        self._ticks_day_progress += 1
+        self.is_night = self._ticks_day_progress >= NIGHT_START_TICKS
+
+        if self.is_night and not self.in_camp:
+            # 0.02 HP i 0.1 ciepła na sekundę
+            self._acc_hp_night += VITAL_SCALE
+            self._fx_hp -= self._acc_hp_night // (50 * TICK_HZ)
+            self._acc_hp_night %= 50 * TICK_HZ
+            self._acc_warmth += VITAL_SCALE
+            self._fx_warmth -= self._acc_warmth // (10 * TICK_HZ)
+            self._acc_warmth %= 10 * TICK_HZ
+
+        if self._ticks_day_progress >= DAY_TICKS:
+            self.end_day(world_map)
+
+        self.check_dangerous_situation()
+        self.check_death()
+
+
+def pack_vitals(agents):
+    """Parametry życiowe wielu agentów stałoprzecinkowych jako tablica N x len(VITALS) - do symulacji wsadowych."""
+    return np.array([agent.vitals() for agent in agents], dtype=VITAL_DTYPE).reshape(-1, len(VITALS))
+
+
+def run_trace(fixed_point, seed=0, max_days=30, delta_time=1 / TICK_HZ):
+    """Jedna próba z zapisem parametrów życiowych i decyzji po każdym ticku."""
+    random.seed(seed)
+    q_learning = QLearningSystem(list(ACTIONS))
+    q_learning.replay_buffer.rng = np.random.default_rng(seed)
+    simulation = Simulation(AIKnowledge(), q_learning=q_learning, save_files=False,
+                            agent_class=FixedPointAgent if fixed_point else Agent, headless=True)
+    simulation.start_new_attempt()
+
+    vitals = []
+    decisions = []
+    day_ends = []
+    start = time.perf_counter()
+    while simulation.simulation_active and simulation.agent.current_day < max_days:
+        simulation.simulate_tick(delta_time)
+        agent = simulation.agent
+        vitals.append([getattr(agent, name) for name in VITALS])
+        decisions.append(simulation.last_q_step)
+        if agent.current_day > len(day_ends):
+            day_ends.append(len(vitals))
+    elapsed = time.perf_counter() - start
+    agent = simulation.agent
+    return {
+        "vitals": np.array(vitals, dtype=np.float64).reshape(-1, len(VITALS)),
+        "decisions": decisions,
+        "day_ends": day_ends,
+        "days": agent.current_day,
+        "death_cause": agent.death_cause,
+        "ticks_per_second": len(vitals) / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def divergence_report(seed=0, max_days=30):
+    """Porównanie silnika stałoprzecinkowego z silnikiem float przy tym samym ziarnie."""
+    reference = run_trace(False, seed, max_days)
+    fixed = run_trace(True, seed, max_days)
+
+    first_divergence = next((i for i, (a, b) in enumerate(zip(reference["decisions"], fixed["decisions"]))
+                             if a != b), None)
+    # Różnice parametrów liczymy do pierwszej rozbieżnej decyzji - dalej trajektorie nie są porównywalne
+    common = min(len(reference["vitals"]), len(fixed["vitals"]))
+    if first_divergence is not None:
+        common = min(common, first_divergence)
+    error = np.abs(reference["vitals"][:common] - fixed["vitals"][:common])
+
+    report = {
+        "ticks_float": len(reference["vitals"]),
+        "ticks_fixed": len(fixed["vitals"]),
+        "first_decision_divergence_tick": first_divergence,
+        "days_float": reference["days"],
+        "days_fixed": fixed["days"],
+        "death_float": reference["death_cause"],
+        "death_fixed": fixed["death_cause"],
+        "ticks_per_second_float": reference["ticks_per_second"],
+        "ticks_per_second_fixed": fixed["ticks_per_second"],
+    }
+    # Float gromadzi błąd w day_progress, więc koniec dnia (i nocne zużycie zapasów) może wypaść tick później
+    offsets = [abs(a - b) for a, b in zip(reference["day_ends"], fixed["day_ends"])]
+    report["day_end_offset_ticks"] = max(offsets, default=0)
+    for i, name in enumerate(VITALS):
+        report[f"max_error_{name}"] = float(error[:, i].max()) if common else 0.0
+        report[f"mean_error_{name}"] = float(error[:, i].mean()) if common else 0.0
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rozbieżność symulacji stałoprzecinkowej względem float")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-days", type=int, default=30)
+    args = parser.parse_args()
+    for key, value in divergence_report(args.seed, args.max_days).items():
+        print(f"{key}: {value:.4f}" if isinstance(value, float) else f"{key}: {value}")
@@ -0,0 +1,272 @@
+"""Trening w stylu Hogwild: gęsta tablica Q leży w multiprocessing.shared_memory,
+a wszystkie procesy czytają i zapisują ją jednocześnie, bez blokad i bez kopiowania.
+
+Uruchomienie z katalogu repozytorium:
+    python survival_2.0b/hogwild_training.py --workers 4 --attempts 20
+    python survival_2.0b/hogwild_training.py --benchmark --duration 5
+    python survival_2.0b/hogwild_training.py --compare --attempts 40
+"""
+import argparse
+import itertools
+import multiprocessing as mp
+import random
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from agent import ACTIONS, Q_ACTIONS
+from ai_system import (AIKnowledge, QLearningSystem, STATE_BOUNDS, STATE_COUNT,
+                       decode_state, encode_state, mean_td_errors, state_index)
+from simulation import Simulation
+
+Q_ACTION_IDS = {action: i for i, action in enumerate(Q_ACTIONS)}
+
+
+class SharedQTable:
+    """Tablice Q i liczników odwiedzin (STATE_COUNT x len(Q_ACTIONS)) w jednym segmencie pamięci współdzielonej.
+
+    Na końcu segmentu są liczniki aktualizacji - po jednym na proces, każdy pisze tylko do swojego.
+    Procesy dołączają się po nazwie segmentu, więc sama tablica nigdy nie jest serializowana.
+    """
+
+    def __init__(self, name=None, max_workers=64):
+        shape = (STATE_COUNT, len(Q_ACTIONS))
+        q_bytes = STATE_COUNT * len(Q_ACTIONS) * 8
+        visit_bytes = STATE_COUNT * len(Q_ACTIONS) * 4
+        size = q_bytes + visit_bytes + max_workers * 8
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.shm.buf[:size] = bytes(size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+        self.q_values = np.ndarray(shape, dtype=np.float64, buffer=self.shm.buf)
+        self.visits = np.ndarray(shape, dtype=np.int32, buffer=self.shm.buf, offset=q_bytes)
+        self.update_counts = np.ndarray((max_workers,), dtype=np.int64, buffer=self.shm.buf,
+                                        offset=q_bytes + visit_bytes)
+
+    def close(self):
+        # Widoki NumPy trzymają bufor - trzeba je zwolnić przed zamknięciem segmentu
+        del self.q_values, self.visits, self.update_counts
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def load_from(self, q_learning):
+        for state, q_values in q_learning.q_table.items():
+            row = state_index(encode_state(state))
+            visits = q_learning.visit_counts.get(state, {})
+            for action, value in q_values.items():
+                if action in Q_ACTION_IDS:
+                    col = Q_ACTION_IDS[action]
+                    self.q_values[row, col] = value
+                    self.visits[row, col] = max(visits.get(action, 0), 1)
+
+    def to_q_learning(self):
+        # Z powrotem do rzadkiej tablicy QLearningSystem - tylko odwiedzone pary (stan, akcja)
+        q_learning = QLearningSystem(list(ACTIONS))
+        q_learning.epsilon = q_learning.epsilon_min
+        all_states = np.stack(np.unravel_index(np.arange(STATE_COUNT), STATE_BOUNDS), axis=1)
+        rows, cols = np.nonzero(self.visits)
+        for row, col in zip(rows.tolist(), cols.tolist()):
+            state = decode_state(all_states[row])
+            q_learning.q_table.setdefault(state, {})[Q_ACTIONS[col]] = float(self.q_values[row, col])
+            q_learning.visit_counts.setdefault(state, {})[Q_ACTIONS[col]] = int(self.visits[row, col])
+        return q_learning
+
+
+class SharedQLearningSystem(QLearningSystem):
+    """QLearningSystem czytający i zapisujący wspólną gęstą tablicę zamiast własnego słownika."""
+
+    def __init__(self, actions, table, worker_id=0, epsilon_min=0.05, seed=None):
+        super().__init__(actions)
+        self.table = table
+        self.worker_id = worker_id
+        self.epsilon_min = epsilon_min
+        self.replay_buffer.rng = np.random.default_rng(seed)
+        # Liczba zapamiętanych przejść (kroków gry) tego procesu
+        self.transitions = 0
+
+    def action_id(self, action):
+        return Q_ACTION_IDS[action]
+
+    def get_q_values(self, state):
+        row = state_index(encode_state(state))
+        known = np.flatnonzero(self.table.visits[row] > 0)
+        return {Q_ACTIONS[col]: float(self.table.q_values[row, col]) for col in known}
+
+    def update_q_table(self, state, action, reward, next_state):
+        row = state_index(encode_state(state))
+        next_row = state_index(encode_state(next_state))
+        col = Q_ACTION_IDS[action]
+        self._apply(np.array([row]), np.array([col]), np.array([reward]), np.array([next_row]),
+                    np.array([False]))
+        self.table.visits[row, col] += 1
+        self.decay_epsilon()
+
+    def remember(self, state, action, reward, next_state, done=False):
+        encoded = encode_state(state)
+        col = Q_ACTION_IDS[action]
+        self.replay_buffer.push(encoded, col, reward, encode_state(next_state), done)
+        self.table.visits[state_index(encoded), col] += 1
+        self.transitions += 1
+        self.decay_epsilon()
+
+        self.steps_since_replay += 1
+        if done or self.steps_since_replay >= self.replay_every:
+            self.replay()
+
+    def replay(self):
+        self.steps_since_replay = 0
+        if len(self.replay_buffer) == 0:
+            return
+        states, actions, rewards, next_states, dones = self.replay_buffer.sample(self.batch_size)
+        self._apply(state_index(states), actions, rewards, state_index(next_states), dones)
+
+    def _apply(self, rows, cols, rewards, next_rows, dones):
+        # Bez blokad: równoległy zapis innego procesu może nadpisać część aktualizacji - to jest założenie Hogwild
+        q_values = self.table.q_values
+        known = self.table.visits[next_rows] > 0
+        next_max = np.where(known, q_values[next_rows], -np.inf).max(axis=1)
+        next_max = np.where(np.isfinite(next_max) & ~dones, next_max, 0.0)
+        td_errors = rewards + self.discount_factor * next_max - q_values[rows, cols]
+        # Ta sama reguła co QLearningSystem.replay: jeden krok o średni błąd TD na parę (stan, akcja)
+        rows, cols, mean_td = mean_td_errors(rows, cols, td_errors, q_values.shape[1])
+        q_values[rows, cols] += self.learning_rate * mean_td
+        self.table.update_counts[self.worker_id] += len(rows)
+
+
+def worker_epsilon_min(worker_id, workers):
+    # Każdy proces eksploruje inaczej (harmonogram jak w Ape-X): od 0.4 do 0.4^8
+    if workers == 1:
+        return 0.05
+    return 0.4 ** (1 + 7 * worker_id / (workers - 1))
+
+
+def worker_loop(worker_id, workers, table_name, seed, attempts, duration, results, barrier):
+    random.seed(seed)
+    table = SharedQTable(table_name)
+    q_learning = SharedQLearningSystem(list(ACTIONS), table, worker_id,
+                                       worker_epsilon_min(worker_id, workers), seed)
+    simulation = Simulation(AIKnowledge(), q_learning=q_learning, save_files=False, headless=True)
+
+    # Pomiar zaczyna się, gdy wszystkie procesy są gotowe - bez startu procesów i dołączania do pamięci
+    barrier.wait()
+    # time.monotonic to zegar wspólny dla procesów, więc początki i końce da się porównać
+    start = time.monotonic()
+    days = []
+    deadline = start + duration if duration else None
+    while (attempts is None or len(days) < attempts) and (deadline is None or time.monotonic() < deadline):
+        days.append(simulation.run_attempt())
+    results.put((worker_id, days, q_learning.transitions, start, time.monotonic()))
+    del q_learning, simulation
+    table.close()
+
+
+def run_workers(table, workers, seed, attempts=None, duration=None):
+    """Zwraca (przeżyte dni wszystkich prób, statystyki przepustowości liczone od bariery w procesach)."""
+    results = mp.Queue()
+    barrier = mp.Barrier(workers)
+    processes = [
+        mp.Process(target=worker_loop, args=(i, workers, table.name, seed + i, attempts, duration, results, barrier))
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    finished = sorted(results.get() for _ in range(workers))
+    for process in processes:
+        process.join()
+    # Przeplatamy wyniki procesów, żeby kolejność odpowiadała upływowi treningu
+    rounds = itertools.zip_longest(*(worker_days for _, worker_days, _, _, _ in finished))
+    days = [d for round_days in rounds for d in round_days if d is not None]
+    elapsed = max(end for *_, end in finished) - min(start for _, _, _, start, _ in finished)
+    stats = {"attempts": len(days), "transitions": sum(t for _, _, t, _, _ in finished),
+             "updates": int(table.update_counts.sum()), "elapsed": elapsed}
+    return days, stats
+
+
+def _rates(stats):
+    elapsed = max(stats["elapsed"], 1e-9)
+    return stats["transitions"] / elapsed, stats["attempts"] / elapsed
+
+
+def train(workers=4, attempts=20, seed=0, filename="survival_2.0b/q_table.npz"):
+    initial = QLearningSystem(list(ACTIONS))
+    initial.load_from_file(filename)
+    table = SharedQTable()
+    try:
+        table.load_from(initial)
+        days, stats = run_workers(table, workers, seed, attempts=attempts)
+        print(f"Prób: {len(days)}, średnio {np.mean(days):.1f} dni, rekord {max(days)}, "
+              f"przejść: {stats['transitions']}, aktualizacji Q: {stats['updates']}")
+        q_learning = table.to_q_learning()
+    finally:
+        table.close()
+    q_learning.save_to_file(filename)
+    return q_learning
+
+
+def benchmark(worker_counts=(1, 2, 4), duration=5.0, seed=0):
+    """Przepustowość treningu (przejścia i próby na sekundę) w zależności od liczby procesów.
+
+    Czas liczony jest w procesach od wspólnej bariery, więc nie obejmuje startu procesów
+    ani tworzenia pamięci współdzielonej.
+    """
+    base_rate = None
+    for workers in worker_counts:
+        table = SharedQTable()
+        try:
+            _, stats = run_workers(table, workers, seed, duration=duration)
+        finally:
+            table.close()
+        rate, attempt_rate = _rates(stats)
+        base_rate = base_rate or rate
+        print(f"procesy={workers}: {rate:,.0f} przejść/s (x{rate / base_rate:.2f}), {attempt_rate:.2f} prób/s, "
+              f"{stats['updates'] / max(stats['elapsed'], 1e-9):,.0f} aktualizacji Q/s")
+
+
+def compare(attempts=40, workers=4, seed=0):
+    """Zbieżność: jeden proces ze zwykłym QLearningSystem vs Hogwild przy tej samej liczbie prób."""
+    random.seed(seed)
+    q_learning = QLearningSystem(list(ACTIONS))
+    q_learning.replay_buffer.rng = np.random.default_rng(seed)
+    simulation = Simulation(AIKnowledge(), q_learning=q_learning, save_files=False, headless=True)
+    start = time.monotonic()
+    single_days = [simulation.run_attempt() for _ in range(attempts)]
+    # clock rośnie o jeden przy każdym zapamiętanym przejściu
+    single_stats = {"attempts": attempts, "transitions": q_learning.clock, "elapsed": time.monotonic() - start}
+
+    table = SharedQTable()
+    try:
+        hogwild_days, hogwild_stats = run_workers(table, workers, seed, attempts=max(1, attempts // workers))
+    finally:
+        table.close()
+
+    for name, days, stats in (("1 proces", single_days, single_stats),
+                              (f"Hogwild x{workers}", hogwild_days, hogwild_stats)):
+        half = len(days) // 2
+        rate, attempt_rate = _rates(stats)
+        print(f"{name}: prób {len(days)}, czas {stats['elapsed']:.1f}s, {rate:,.0f} przejść/s, "
+              f"{attempt_rate:.2f} prób/s, średnio pierwsza połowa {np.mean(days[:half] or days):.1f} / druga {np.mean(days[half:]):.1f} dni, "
+              f"rekord {max(days)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Trening Hogwild na tablicy Q w pamięci współdzielonej")
+    parser.add_argument("--workers", type=int, default=mp.cpu_count())
+    parser.add_argument("--attempts", type=int, default=20, help="liczba prób na proces")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="survival_2.0b/q_table.npz")
+    parser.add_argument("--benchmark", action="store_true")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--compare", action="store_true")
+    args = parser.parse_args()
+    if args.benchmark:
+        counts = sorted({1, 2, 4, args.workers})
+        benchmark(counts, args.duration, args.seed)
+    elif args.compare:
+        compare(args.attempts, args.workers, args.seed)
+    else:
+        train(args.workers, args.attempts, args.seed, args.output)
@@ -0,0 +1,214 @@
+"""Wiedza AI w bazie SQLite (tryb WAL) zamiast pliku JSON.
+
+Śmierci, analizy, liczniki akcji i kamienie milowe są w tabelach z indeksami po przyczynie i dniu,
+więc menu i wybór profilu dnia pytają bazę zamiast trzymać całą historię w pamięci. Zdarzenia próby
+są buforowane w pamięci (jak w AIKnowledge) i zapisywane jedną transakcją w save_to_file.
+Kilka procesów (np. trening równoległy) może pisać do tej samej bazy naraz: każdy ma własne
+połączenie, transakcje zapisu zaczynają się od BEGIN IMMEDIATE, a liczniki akcji są sumowane przez UPSERT.
+
+Uruchomienie gry z tym magazynem:
+    python survival_2.0b/main.py --sqlite
+"""
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from ai_system import AIKnowledge
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    day INTEGER NOT NULL,
+    cause TEXT,
+    recorded_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS attempts_cause ON attempts (cause);
+CREATE INDEX IF NOT EXISTS attempts_day ON attempts (day);
+
+CREATE TABLE IF NOT EXISTS deaths (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    attempt_id INTEGER REFERENCES attempts (id),
+    day INTEGER NOT NULL,
+    cause TEXT,
+    analysis TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS deaths_cause ON deaths (cause);
+CREATE INDEX IF NOT EXISTS deaths_day ON deaths (day);
+
+CREATE TABLE IF NOT EXISTS action_counts (
+    day INTEGER NOT NULL,
+    action TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    exp INTEGER NOT NULL,
+    PRIMARY KEY (day, action)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS milestones (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+
+class SQLiteKnowledge(AIKnowledge):
+    def __init__(self, filename="survival_2.0b/ai_knowledge.db"):
+        super().__init__()
+        self.filename = filename
+        self._local = threading.local()
+        # Zadanie, którego zapis się nie udał - trafia do następnego zapisu (write_save może działać w tle,
+        # więc nie dotyka buforów gry; scala je dopiero prepare_save w wątku gry)
+        self.failed_job = None
+        self._failed_lock = threading.Lock()
+
+    def connection(self):
+        # Połączenia SQLite nie wolno przenosić między procesami ani wątkami (zapis w tle ma własne)
+        local = self._local
+        if getattr(local, "connection", None) is None or local.pid != os.getpid():
+            connection = sqlite3.connect(self.filename, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            local.connection = connection
+            local.pid = os.getpid()
+        return local.connection
+
+    def close(self):
+        local = self._local
+        if getattr(local, "connection", None) is not None and local.pid == os.getpid():
+            local.connection.close()
+        local.connection = None
+
+    def _apply_death(self, day, cause):
+        self.attempts += 1
+        self.death_days.append(day)
+        if day > self.best_survival_days:
+            self.best_survival_days = day
+        self.death_causes[cause] = self.death_causes.get(cause, 0) + 1
+
+    def _apply_analysis(self, analysis):
+        pass
+
+    def top_death_causes(self, limit=4):
+        counts = dict(self.connection().execute(
+            "SELECT cause, COUNT(*) FROM attempts GROUP BY cause").fetchall())
+        for event in self._unsaved_events():
+            if event["type"] == "death":
+                counts[event["cause"]] = counts.get(event["cause"], 0) + 1
+        return sorted(counts.items(), key=lambda x: x[1], reverse=True)[:limit]
+
+    def recent_death_analyses(self, limit=3):
+        pending = [event["analysis"] for event in self._unsaved_events() if event["type"] == "analysis"]
+        stored = []
+        if len(pending) < limit:
+            rows = self.connection().execute(
+                "SELECT analysis FROM deaths ORDER BY id DESC LIMIT ?", (limit - len(pending),)).fetchall()
+            stored = [json.loads(analysis) for (analysis,) in reversed(rows)]
+        return (stored + pending)[-limit:]
+
+    def save_to_file(self, filename=None):
+        """Zapisuje zdarzenia od ostatniego zapisu jedną transakcją. filename jest ignorowany - baza jest jedna."""
+        return self.write_save(self.prepare_save())
+
+    def prepare_save(self, filename=None):
+        job = {"filename": self.filename, "events": self.pending_events, "actions": self.pending_actions,
+               "milestones": dict(self.milestone_achievements),
+               "meta": {"risk_tolerance": self.risk_tolerance, "caution_deaths": self.caution_deaths}}
+        self.pending_events = []
+        self.pending_actions = {}
+        self.successful_actions = {}
+        with self._failed_lock:
+            failed, self.failed_job = self.failed_job, None
+        if failed is not None:
+            job = self.merge_saves(failed, job)
+        return job
+
+    def _unsaved_events(self):
+        failed = self.failed_job
+        return (failed["events"] if failed is not None else []) + self.pending_events
+
+    @staticmethod
+    def merge_saves(older, newer):
+        actions = {day: {action: dict(counts) for action, counts in day_actions.items()}
+                   for day, day_actions in older["actions"].items()}
+        for day, day_actions in newer["actions"].items():
+            for action, counts in day_actions.items():
+                entry = actions.setdefault(day, {}).setdefault(action, {"count": 0, "exp": 0})
+                entry["count"] += counts["count"]
+                entry["exp"] += counts["exp"]
+        return dict(newer, events=older["events"] + newer["events"], actions=actions)
+
+    def write_save(self, job):
+        connection = self.connection()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            attempt_id = None
+            for event in job["events"]:
+                if event["type"] == "death":
+                    cursor = connection.execute(
+                        "INSERT INTO attempts (day, cause, recorded_at) VALUES (?, ?, ?)",
+                        (event["day"], event["cause"], datetime.now().isoformat()))
+                    attempt_id = cursor.lastrowid
+                elif event["type"] == "analysis":
+                    analysis = event["analysis"]
+                    connection.execute(
+                        "INSERT INTO deaths (attempt_id, day, cause, analysis) VALUES (?, ?, ?, ?)",
+                        (attempt_id, analysis["day"], analysis["cause"], json.dumps(analysis, ensure_ascii=False)))
+            connection.executemany(
+                "INSERT INTO action_counts (day, action, count, exp) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (day, action) DO UPDATE SET count = count + excluded.count, exp = exp + excluded.exp",
+                [(day, action, counts["count"], counts["exp"])
+                 for day, actions in job["actions"].items() for action, counts in actions.items()])
+            connection.executemany(
+                "INSERT OR REPLACE INTO milestones (name, value) VALUES (?, ?)",
+                [(name, json.dumps(value, ensure_ascii=False)) for name, value in job["milestones"].items()])
+            connection.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", job["meta"].items())
+            connection.execute("COMMIT")
+            return True
+        except Exception as e:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            print(f"Błąd zapisu bazy wiedzy: {e}")
+            # Transakcja wycofana - zdarzenia i liczniki czekają na następny zapis
+            with self._failed_lock:
+                failed = self.failed_job
+                self.failed_job = job if failed is None else self.merge_saves(failed, job)
+            return False
+
+    def compact(self, filename=None):
+        return self.save_to_file()
+
+    def load_from_file(self, filename=None):
+        """Wczytuje tylko podsumowania - historia zostaje w bazie i jest czytana zapytaniami."""
+        try:
+            connection = self.connection()
+            self.attempts, best = connection.execute("SELECT COUNT(*), MAX(day) FROM attempts").fetchone()
+            self.best_survival_days = best or 0
+            self.death_causes = dict(connection.execute(
+                "SELECT cause, COUNT(*) FROM attempts GROUP BY cause").fetchall())
+            self.death_days = [day for (day,) in connection.execute("SELECT day FROM attempts ORDER BY id")]
+            meta = dict(connection.execute("SELECT key, value FROM meta").fetchall())
+            self.risk_tolerance = meta.get("risk_tolerance", 0.5)
+            self.caution_deaths = int(meta.get("caution_deaths", 0))
+            self.milestone_achievements = {name: json.loads(value) for name, value in
+                                           connection.execute("SELECT name, value FROM milestones")}
+            return True
+        except sqlite3.Error as e:
+            print(f"Błąd wczytywania bazy wiedzy: {e}")
+        return False
+
+    def action_counts(self, day=None):
+        """Liczniki udanych akcji {akcja: (liczba, exp)} dla dnia (albo wszystkich dni)."""
+        if day is None:
+            rows = self.connection().execute(
+                "SELECT action, SUM(count), SUM(exp) FROM action_counts GROUP BY action")
+        else:
+            rows = self.connection().execute(
+                "SELECT action, count, exp FROM action_counts WHERE day = ?", (day,))
+        return {action: (count, exp) for action, count, exp in rows}
@@ -0,0 +1,64 @@
+"""Scalanie shardów wiedzy AI z wielu procesów lub maszyn w jeden plik.
+
+Każdy proces treningu zapisuje własny shard (shard_filename), a ten skrypt składa je po kolei:
+w pamięci jest naraz tylko wynik i jeden wczytywany shard. Shardy są brane w kolejności nazw,
+więc to samo wywołanie zawsze daje ten sam plik. Dzienniki .log.jsonl shardów są uwzględniane.
+
+Uruchomienie z katalogu repozytorium:
+    python survival_2.0b/knowledge_merge.py --output survival_2.0b/ai_knowledge.json survival_2.0b/shards/*.json
+    python survival_2.0b/knowledge_merge.py --include-output --output survival_2.0b/ai_knowledge.json shard_a.json shard_b.json
+"""
+import argparse
+import glob
+import os
+
+from ai_system import AIKnowledge
+
+
+def shard_filename(filename, shard):
+    """ai_knowledge.json, 3 -> ai_knowledge.shard-3.json"""
+    base, extension = os.path.splitext(filename)
+    return f"{base}.shard-{shard}{extension}"
+
+
+def iter_shards(filenames):
+    for filename in filenames:
+        shard = AIKnowledge()
+        if not shard.load_from_file(filename):
+            print(f"Pomijam shard {filename} - brak pliku albo błąd odczytu")
+            continue
+        yield filename, shard
+
+
+def merge_files(filenames, output=None):
+    """Składa shardy w kolejności filenames. Zwraca scaloną wiedzę (i zapisuje ją, jeśli podano output)."""
+    merged = None
+    for filename, shard in iter_shards(filenames):
+        if merged is None:
+            merged = shard
+        else:
+            merged.merge_shard(shard)
+        print(f"{filename}: prób {shard.attempts}, rekord {shard.best_survival_days} dni")
+    if merged is None:
+        merged = AIKnowledge()
+    if output is not None:
+        # Pełny zapis - przy okazji czyści dziennik pliku wynikowego, który mógł być jednym ze shardów
+        merged.compact(output)
+    return merged
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scalanie shardów wiedzy AI w jeden plik")
+    parser.add_argument("shards", nargs="+", help="pliki shardów (można podać wzorzec glob)")
+    parser.add_argument("--output", default="survival_2.0b/ai_knowledge.json")
+    parser.add_argument("--include-output", action="store_true",
+                        help="dołącz istniejącą wiedzę z pliku wynikowego jako pierwszy shard")
+    args = parser.parse_args()
+
+    filenames = sorted({name for pattern in args.shards for name in (glob.glob(pattern) or [pattern])})
+    filenames = [name for name in filenames if os.path.abspath(name) != os.path.abspath(args.output)]
+    if args.include_output:
+        filenames.insert(0, args.output)
+    merged = merge_files(filenames, args.output)
+    print(f"Scalono {len(filenames)} shardów: prób {merged.attempts}, rekord {merged.best_survival_days} dni, "
+          f"risk_tolerance {merged.risk_tolerance:.3f} -> {args.output}")
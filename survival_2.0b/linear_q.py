@@ -0,0 +1,211 @@
+"""Funkcja Q jako liniowa kombinacja haszowanych kafelków (tile coding) - stała pamięć przy bogatym stanie.
+
+Stan z get_state ma tu zamiast 5 progów 25-punktowych pełny zestaw cech: parametry życiowe, dzień,
+ekwipunek, magazyn, struktury, poziom, odległości do najbliższych zasobów i wroga. Każda cecha
+(i wybrane pary cech) jest dzielona na kafelki w kilku przesuniętych siatkach, a numer kafelka
+trafia przez hasz do jednej z n_weights komórek tablicy wag. Q(s, a) to suma wag aktywnych
+kafelków, więc decyzja to jedno zebranie wierszy i suma, a pamięć nie rośnie z liczbą stanów.
+
+Uruchomienie z katalogu repozytorium (porównanie z tablicą Q):
+    python survival_2.0b/linear_q.py --attempts 20 --weights 4096
+"""
+import argparse
+import os
+import random
+
+import numpy as np
+
+from agent import ACTIONS, Q_ACTIONS
+from ai_system import AIKnowledge, QLearningSystem
+from replay_buffer import ReplayBuffer
+from simulation import Simulation
+
+RESOURCES = ("wood", "stone", "food", "water", "fiber", "metal")
+STORAGE = ("food", "water", "wood", "stone")
+NEAREST = ("wood", "stone", "food", "water", "fiber")
+# Nazwa cechy -> szerokość kafelka w jednostkach cechy
+FEATURES = (
+    ("hunger", 10), ("thirst", 10), ("stamina", 10), ("hp", 10), ("warmth", 20), ("night", 1),
+    ("day", 5), ("distance", 3), ("level", 2), ("structures", 1),
+) + tuple((f"inventory_{r}", 3) for r in RESOURCES) \
+  + tuple((f"storage_{r}", 5) for r in STORAGE) \
+  + tuple((f"nearest_{r}", 3) for r in NEAREST) \
+  + (("enemy", 3),)
+FEATURE_NAMES = tuple(name for name, _ in FEATURES)
+FEATURE_WIDTHS = np.array([width for _, width in FEATURES], dtype=np.int64)
+# Koniunkcje cech, których pojedyncze kafelki nie wyrażą (np. głód liczy się inaczej, gdy jest jedzenie)
+PAIRS = (("hunger", "inventory_food"), ("thirst", "inventory_water"), ("hunger", "thirst"),
+         ("distance", "night"), ("stamina", "distance"), ("night", "structures"),
+         ("storage_wood", "night"), ("nearest_water", "thirst"), ("nearest_food", "hunger"))
+PAIR_INDEX = np.array([(FEATURE_NAMES.index(a), FEATURE_NAMES.index(b)) for a, b in PAIRS], dtype=np.int64)
+MAX_DISTANCE = 40
+Q_ACTION_IDS = {action: i for i, action in enumerate(Q_ACTIONS)}
+
+_HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+_PRIME = np.uint64(1000003)
+
+
+def _hash(tiling, feature, bin_a, bin_b, n_weights):
+    # Mnożenie modulo 2^64 (przepełnienie uint64 jest zamierzone) i górne bity - ten sam wzór zadziała w C
+    key = ((tiling * np.uint64(64) + feature) * _PRIME + bin_a) * _PRIME + bin_b
+    return ((key * _HASH_MULTIPLIER) >> np.uint64(32)) % np.uint64(n_weights)
+
+
+def active_tiles(states, n_weights, tilings=2):
+    """Stany (N x len(FEATURES)) -> indeksy aktywnych wag (N x liczba kafelków), razem z wagą biasu 0."""
+    with np.errstate(over="ignore"):
+        states = np.asarray(states, dtype=np.int64).reshape(-1, len(FEATURES))
+        columns = [np.zeros(len(states), dtype=np.uint64)]
+        for t in range(tilings):
+            # Każda siatka jest przesunięta o ułamek szerokości kafelka
+            bins = ((states * tilings + t * FEATURE_WIDTHS) // (FEATURE_WIDTHS * tilings)).astype(np.uint64)
+            zero = np.zeros(len(states), dtype=np.uint64)
+            for f in range(len(FEATURES)):
+                columns.append(_hash(np.uint64(t), np.uint64(f), bins[:, f], zero, n_weights))
+            for p, (a, b) in enumerate(PAIR_INDEX):
+                columns.append(_hash(np.uint64(t), np.uint64(len(FEATURES) + p), bins[:, a], bins[:, b], n_weights))
+        indices = np.stack(columns, axis=1)
+    # Indeks 0 zostaje dla biasu; kolizje z nim są nieszkodliwe
+    return indices.astype(np.int64)
+
+
+class HashedLinearQLearningSystem(QLearningSystem):
+    """QLearningSystem z liniową funkcją Q na haszowanych kafelkach zamiast słownika stanów."""
+
+    def __init__(self, actions, n_weights=4096, tilings=2, replay_capacity=5000, batch_size=32, replay_every=4):
+        super().__init__(actions, replay_capacity, batch_size, replay_every)
+        self.n_weights = n_weights
+        self.tilings = tilings
+        self.learning_rate = 0.5
+        self.weights = np.zeros((n_weights, len(Q_ACTIONS)), dtype=np.float32)
+        # Które akcje były uczone na danym kafelku - odpowiednik "znanych" akcji w słowniku Q
+        self.touched = np.zeros((n_weights, len(Q_ACTIONS)), dtype=bool)
+        self.replay_buffer = ReplayBuffer(replay_capacity, len(FEATURES))
+
+    def get_state(self, agent, world_map):
+        storage = agent.camp["storage"]
+        nearest = {r: MAX_DISTANCE for r in NEAREST}
+        for node in world_map.resource_nodes:
+            if node.type in nearest and not node.depleted:
+                distance = abs(node.x - agent.x) + abs(node.y - agent.y)
+                nearest[node.type] = min(nearest[node.type], distance)
+        enemy = min((abs(e.x - agent.x) + abs(e.y - agent.y) for e in getattr(world_map, "enemies", ())),
+                    default=MAX_DISTANCE)
+        values = (
+            agent.hunger, agent.thirst, agent.stamina, agent.hp, agent.warmth, agent.is_night,
+            agent.current_day, abs(agent.x - world_map.camp_x) + abs(agent.y - world_map.camp_y),
+            agent.level, len(agent.camp["structures"]),
+        ) + tuple(agent.inventory.get(r, 0) for r in RESOURCES) \
+          + tuple(storage.get(r, 0) for r in STORAGE) \
+          + tuple(nearest[r] for r in NEAREST) + (enemy,)
+        return tuple(min(max(int(v), 0), 32767) for v in values)
+
+    def action_id(self, action):
+        return Q_ACTION_IDS[action]
+
+    def _q_rows(self, tiles):
+        return self.weights[tiles].sum(axis=-2)
+
+    def get_q_values(self, state):
+        tiles = active_tiles([state], self.n_weights, self.tilings)[0]
+        q_values = self._q_rows(tiles)
+        known = np.flatnonzero(self.touched[tiles].any(axis=0))
+        return {Q_ACTIONS[a]: float(q_values[a]) for a in known}
+
+    def update_q_table(self, state, action, reward, next_state):
+        self._apply(np.array([state]), np.array([Q_ACTION_IDS[action]]), np.array([reward], dtype=np.float32),
+                    np.array([next_state]), np.array([False]))
+        self.decay_epsilon()
+
+    def remember(self, state, action, reward, next_state, done=False):
+        self.replay_buffer.push(state, Q_ACTION_IDS[action], reward, next_state, done)
+        self.decay_epsilon()
+        self.steps_since_replay += 1
+        if done or self.steps_since_replay >= self.replay_every:
+            self.replay()
+
+    def replay(self):
+        self.steps_since_replay = 0
+        if len(self.replay_buffer) == 0:
+            return
+        self._apply(*self.replay_buffer.sample(self.batch_size))
+
+    def _apply(self, states, actions, rewards, next_states, dones):
+        tiles = active_tiles(states, self.n_weights, self.tilings)
+        next_tiles = active_tiles(next_states, self.n_weights, self.tilings)
+        known = self.touched[next_tiles].any(axis=1)
+        next_max = np.where(known, self._q_rows(next_tiles), -np.inf).max(axis=1)
+        next_max = np.where(np.isfinite(next_max) & ~dones, next_max, 0.0)
+        current = self.weights[tiles, actions[:, None]].sum(axis=1)
+        td_errors = rewards + self.discount_factor * next_max - current
+        # Krok dzielony przez liczbę aktywnych kafelków i wielkość paczki - próbki dzielą kafelki
+        # (choćby bias), więc suma ich kroków bez tego przestrzeliłaby cel i wagi by się rozbiegły
+        step = (self.learning_rate / (tiles.shape[1] * len(tiles))) * td_errors
+        cols = np.broadcast_to(actions[:, None], tiles.shape)
+        np.add.at(self.weights, (tiles, cols), np.repeat(step[:, None], tiles.shape[1], axis=1))
+        self.touched[tiles, cols] = True
+
+    def parameter_bytes(self):
+        return self.weights.nbytes + self.touched.nbytes
+
+    def to_arrays(self, visit_baseline=None):
+        """Funkcja Q jako tablice NumPy: wagi kafelków i maska uczonych akcji (kopie).
+
+        Liniowa funkcja nie ma wierszy stanów ani liczników odwiedzin, więc visit_baseline nic tu nie zmienia.
+        """
+        return {"weights": self.weights.copy(), "touched": self.touched.copy(), "tilings": np.int32(self.tilings),
+                "actions": np.array(Q_ACTIONS, dtype=str)}
+
+    def from_arrays(self, weights, touched, tilings=None, actions=None):
+        if weights.shape != self.weights.shape or (tilings is not None and int(tilings) != self.tilings):
+            raise ValueError("Tablice funkcji Q mają inny rozmiar")
+        self.weights = weights.astype(np.float32)
+        self.touched = touched.astype(bool)
+
+    def save_to_file(self, filename="survival_2.0b/q_linear.npz"):
+        return super().save_to_file(filename)
+
+    def prepare_save(self, filename="survival_2.0b/q_linear.npz"):
+        arrays = self.to_arrays()
+        arrays["epsilon"] = np.float64(self.epsilon)
+        return {"filename": filename, "arrays": arrays}
+
+    def load_from_file(self, filename="survival_2.0b/q_linear.npz"):
+        try:
+            if os.path.exists(filename):
+                with np.load(filename) as data:
+                    if data["weights"].shape != self.weights.shape or int(data["tilings"]) != self.tilings:
+                        print("Plik funkcji Q ma inny rozmiar - pomijam")
+                        return False
+                    self.from_arrays(data["weights"], data["touched"])
+                    self.epsilon = float(data["epsilon"])
+                return True
+        except Exception as e:
+            print(f"Błąd wczytywania funkcji Q: {e}")
+        return False
+
+
+def compare(attempts=20, n_weights=4096, seed=0):
+    """Przeżyte dni: słownikowa tablica Q vs liniowa funkcja Q przy tej samej liczbie prób."""
+    results = {}
+    for name, q_learning in (("tablica", QLearningSystem(list(ACTIONS))),
+                             ("liniowa", HashedLinearQLearningSystem(list(ACTIONS), n_weights))):
+        random.seed(seed)
+        q_learning.replay_buffer.rng = np.random.default_rng(seed)
+        simulation = Simulation(AIKnowledge(), q_learning=q_learning, save_files=False, headless=True)
+        days = [simulation.run_attempt() for _ in range(attempts)]
+        results[name] = days
+        half = len(days) // 2
+        print(f"{name}: średnio {np.mean(days):.1f} dni (druga połowa {np.mean(days[half:]):.1f}), rekord {max(days)}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Liniowa funkcja Q na haszowanych kafelkach")
+    parser.add_argument("--attempts", type=int, default=20)
+    parser.add_argument("--weights", type=int, default=4096, help="liczba wierszy tablicy wag")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    compare(args.attempts, args.weights, args.seed)
+    size = HashedLinearQLearningSystem(list(ACTIONS), args.weights).parameter_bytes()
+    print(f"Pamięć funkcji liniowej: {size / 1024:.1f} KB (stała)")
@@ -0,0 +1,316 @@
+"""Wybór akcji przeszukiwaniem drzewa Monte Carlo (MCTS) zamiast tablicy Q.
+
+MCTSPlanner.decide rozgrywa w przód prawdziwy silnik gry: każda symulacja zaczyna od migawki
+bieżącego stanu (snapshot.py), schodzi po drzewie akcji według UCB1, dokłada jeden nowy węzeł
+i dogrywa resztę horyzontu prostą polityką losową z regułami awaryjnymi. Drzewo jest "open-loop"
+(węzeł = ciąg akcji), więc po wykonaniu wybranej akcji jej poddrzewo staje się korzeniem następnej
+decyzji. Budżet decyzji to liczba symulacji, czas zegarowy albo oba (co pierwsze się skończy).
+Z workers > 0 symulacje idą równolegle w procesach (root-parallel): każdy proces dostaje kopię
+stanu, buduje własne drzewo, a liczby odwiedzin akcji korzenia są sumowane - bez ponownego
+użycia drzewa.
+
+Simulation(planner=MCTSPlanner(...)) przełącza agenta na ten tryb; tablica Q nadal uczy się z
+wykonanych akcji. Generator random po decyzji wraca do stanu sprzed przeszukiwania.
+
+Uruchomienie z katalogu repozytorium (porównanie z Q-learningiem przy tym samym czasie obliczeń):
+    python survival_2.0b/mcts.py --attempts 1 --rollouts 8 --depth 4
+    python survival_2.0b/mcts.py --attempts 1 --time-budget 0.02 --workers 4
+"""
+import argparse
+import math
+import pickle
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from actions import ACTION_IDS, ACTIONS, DRINK, EAT, MOVE_TO_CAMP
+from agent import NIGHT_START
+from ai_system import AIKnowledge, QLearningSystem
+from simulation import Simulation
+from snapshot import restore, snapshot
+
+# Najdłuższe czekanie na następną decyzję w symulacji (agent bez staminy czeka nawet do rana)
+MAX_WAIT = 90.0
+
+
+class FrozenKnowledge:
+    """Wiedza widziana przez agenta podczas symulacji w przód: odczyty z chwili decyzji, zapisy pomijane."""
+
+    def __init__(self, knowledge):
+        self.best_survival_days = knowledge.best_survival_days
+        self.death_causes = dict(knowledge.death_causes)
+        self.death_analysis = list(knowledge.recent_death_analyses(3))
+
+    def recent_death_analyses(self, limit=3):
+        return self.death_analysis[-limit:]
+
+    def record_action(self, day, action, success, details=None):
+        pass
+
+
+class _RolloutHost:
+    """Pola Simulation, których potrzebują snapshot i restore."""
+
+    def __init__(self, agent, world_map):
+        self.agent = agent
+        self.world_map = world_map
+        self.simulation_active = True
+        self.action_cooldown = 0
+        self.last_q_step = None
+
+
+class Node:
+    __slots__ = ("visits", "value", "children")
+
+    def __init__(self):
+        self.visits = 0
+        self.value = 0.0
+        self.children = {}
+
+
+def _discard_log(message, *args, **kwargs):
+    pass
+
+
+def rollout_policy(agent, actions, rng):
+    """Losowa akcja, z tymi samymi regułami awaryjnymi co ai_decide_action."""
+    if agent.hunger < 15 and agent.inventory["food"] > 0:
+        return EAT
+    if agent.thirst < 15 and agent.inventory["water"] > 0:
+        return DRINK
+    if agent.day_progress > NIGHT_START and not agent.in_camp:
+        return MOVE_TO_CAMP
+    return rng.choice(actions)
+
+
+def advance(agent, world_map, action, delta_time):
+    """Wykonuje akcję i przesuwa świat do następnej decyzji, tak jak Simulation.simulate_tick."""
+    success, result, cooldown = agent.execute_action(action, world_map)
+    if cooldown is None or cooldown <= 0:
+        cooldown = 0.1
+    waited = 0.0
+    while agent.alive and waited < MAX_WAIT:
+        agent.update(delta_time, world_map)
+        waited += delta_time
+        cooldown -= delta_time
+        if cooldown <= 0 and agent.stamina > 5:
+            break
+
+
+def evaluate(agent, steps, depth):
+    """Wartość w [0, 1]: śmierć daje najwyżej 0.5 (im później, tym więcej), przeżycie 0.5 + najsłabszy parametr."""
+    if not agent.alive:
+        return 0.5 * steps / depth
+    weakest = min(agent.hunger, agent.thirst, agent.warmth, 100 * agent.hp / max(agent.max_hp, 1))
+    return 0.5 + 0.5 * max(0.0, min(weakest, 100)) / 100
+
+
+def _select(node, exploration):
+    log_visits = math.log(node.visits)
+    return max(node.children, key=lambda action: (node.children[action].value / node.children[action].visits
+                                                  + exploration * math.sqrt(log_visits / node.children[action].visits)))
+
+
+def _simulate(agent, world_map, root, actions, rng, depth, exploration, delta_time):
+    node = root
+    path = [root]
+    steps = 0
+    while steps < depth and agent.alive:
+        untried = [action for action in actions if action not in node.children]
+        if untried:
+            action = rng.choice(untried)
+            child = Node()
+            node.children[action] = child
+            node = child
+            path.append(node)
+            advance(agent, world_map, action, delta_time)
+            steps += 1
+            while steps < depth and agent.alive:
+                advance(agent, world_map, rollout_policy(agent, actions, rng), delta_time)
+                steps += 1
+            break
+        action = _select(node, exploration)
+        node = node.children[action]
+        path.append(node)
+        advance(agent, world_map, action, delta_time)
+        steps += 1
+    value = evaluate(agent, steps, depth)
+    for visited in path:
+        visited.visits += 1
+        visited.value += value
+
+
+def search(agent, world_map, root, actions, rng, rollouts=None, time_budget=None, depth=8, exploration=1.4,
+           delta_time=0.25, start=None):
+    """Rozbudowuje drzewo root symulacjami ze stanu agenta. Zwraca liczbę symulacji; stan agenta i mapy wraca."""
+    host = _RolloutHost(agent, world_map)
+    knowledge, add_log = agent.knowledge, agent.add_log
+    agent.knowledge = FrozenKnowledge(knowledge)
+    agent.add_log = _discard_log
+    root_snapshot = snapshot(host)
+    deadline = None if time_budget is None else (start or time.perf_counter()) + time_budget
+    done = 0
+    try:
+        while not done or ((rollouts is None or done < rollouts)
+                           and (deadline is None or time.perf_counter() < deadline)):
+            restore(host, root_snapshot)
+            # Każda symulacja z innym losowaniem świata; po przeszukiwaniu restore cofa random
+            random.seed(rng.getrandbits(32))
+            _simulate(agent, world_map, root, actions, rng, depth, exploration, delta_time)
+            done += 1
+    finally:
+        restore(host, root_snapshot)
+        agent.knowledge, agent.add_log = knowledge, add_log
+    return done
+
+
+def _search_worker(payload, actions, seed, rollouts, time_budget, depth, exploration, delta_time):
+    start = time.perf_counter()
+    agent, world_map = pickle.loads(payload)
+    root = Node()
+    search(agent, world_map, root, actions, random.Random(seed), rollouts, time_budget, depth, exploration,
+           delta_time, start)
+    return {action: (child.visits, child.value) for action, child in root.children.items()}
+
+
+class MCTSPlanner:
+    def __init__(self, rollouts=None, time_budget=None, depth=8, exploration=1.4, delta_time=0.25, actions=None,
+                 workers=0, seed=None):
+        if depth < 1:
+            raise ValueError("depth musi wynosić co najmniej 1")
+        if rollouts is None and time_budget is None:
+            rollouts = 64
+        self.rollouts = rollouts
+        # Sekundy zegara na decyzję
+        self.time_budget = time_budget
+        # Horyzont w decyzjach (drzewo + dogrywka)
+        self.depth = depth
+        self.exploration = exploration
+        # Krok symulacji w przód - większy niż w grze, żeby dogrywki były tanie
+        self.delta_time = delta_time
+        # Numery akcji do rozważenia; domyślnie Agent.actions
+        self.actions = actions
+        self.workers = workers
+        self.rng = random.Random(seed)
+        self.pool = None
+        self.root = None
+        self.root_agent = None
+        self.last_action = None
+        self.stats = {"decisions": 0, "rollouts": 0, "reused_trees": 0, "search_time": 0.0}
+
+    def reset(self):
+        self.root = None
+        self.root_agent = None
+        self.last_action = None
+
+    def decide(self, agent, world_map):
+        start = time.perf_counter()
+        actions = self.actions or [ACTION_IDS[key] for key in agent.actions]
+        if self.workers:
+            action = self._decide_parallel(agent, world_map, actions, start)
+        else:
+            action = self._decide_serial(agent, world_map, actions, start)
+        self.stats["decisions"] += 1
+        self.stats["search_time"] += time.perf_counter() - start
+        return action
+
+    def _decide_serial(self, agent, world_map, actions, start):
+        # Poddrzewo poprzedniej decyzji jest ważne, jeśli agent wykonał właśnie tę akcję
+        if self.root is not None and self.root_agent is agent and agent.current_action == self.last_action:
+            root = self.root
+            self.stats["reused_trees"] += 1
+        else:
+            root = Node()
+        self.stats["rollouts"] += search(agent, world_map, root, actions, self.rng, self.rollouts, self.time_budget,
+                                         self.depth, self.exploration, self.delta_time, start)
+        if not root.children:
+            # Żadna symulacja nie rozwinęła korzenia (np. agent już nie żyje)
+            self.reset()
+            return rollout_policy(agent, actions, self.rng)
+        action = max(root.children, key=lambda a: root.children[a].visits)
+        self.root = root.children[action]
+        self.root_agent = agent
+        self.last_action = action
+        return action
+
+    def _decide_parallel(self, agent, world_map, actions, start):
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(self.workers)
+        clone = agent.clone()
+        clone.knowledge = FrozenKnowledge(agent.knowledge)
+        clone.add_log = _discard_log
+        clone.q_learning = None
+        clone.planner = None
+        payload = pickle.dumps((clone, world_map), protocol=pickle.HIGHEST_PROTOCOL)
+        rollouts = None if self.rollouts is None else math.ceil(self.rollouts / self.workers)
+        time_budget = None if self.time_budget is None else max(0.0, self.time_budget - (time.perf_counter() - start))
+        futures = [self.pool.submit(_search_worker, payload, actions, self.rng.getrandbits(32), rollouts, time_budget,
+                                    self.depth, self.exploration, self.delta_time)
+                   for _ in range(self.workers)]
+        visits = {}
+        for future in futures:
+            for action, (count, value) in future.result().items():
+                visits[action] = visits.get(action, 0) + count
+                self.stats["rollouts"] += count
+        if not visits:
+            return rollout_policy(agent, actions, self.rng)
+        return max(visits, key=visits.get)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+
+def _simulation(seed, planner=None):
+    random.seed(seed)
+    q_learning = QLearningSystem(list(ACTIONS))
+    q_learning.replay_buffer.rng = np.random.default_rng(seed)
+    return Simulation(AIKnowledge(), q_learning=q_learning, save_files=False, headless=True, planner=planner)
+
+
+def compare(attempts, planner, seed=0):
+    """MCTS przez attempts prób, potem Q-learning przez ten sam czas zegarowy. Zwraca (dni MCTS, dni Q, czas)."""
+    simulation = _simulation(seed, planner)
+    start = time.perf_counter()
+    mcts_days = [simulation.run_attempt() for _ in range(attempts)]
+    elapsed = time.perf_counter() - start
+
+    simulation = _simulation(seed)
+    q_days = []
+    start = time.perf_counter()
+    while len(q_days) < attempts or time.perf_counter() - start < elapsed:
+        q_days.append(simulation.run_attempt())
+    return mcts_days, q_days, elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MCTS kontra Q-learning przy tym samym czasie obliczeń")
+    parser.add_argument("--attempts", type=int, default=3)
+    parser.add_argument("--rollouts", type=int, default=None, help="symulacji na decyzję")
+    parser.add_argument("--time-budget", type=float, default=None, help="sekund na decyzję")
+    parser.add_argument("--depth", type=int, default=8, help="horyzont w decyzjach")
+    parser.add_argument("--exploration", type=float, default=1.4)
+    parser.add_argument("--delta-time", type=float, default=0.25, help="krok symulacji w przód (s)")
+    parser.add_argument("--workers", type=int, default=0, help="procesy dla wariantu root-parallel")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if args.depth < 1:
+        parser.error("--depth musi wynosić co najmniej 1")
+
+    planner = MCTSPlanner(args.rollouts, args.time_budget, args.depth, args.exploration, args.delta_time,
+                          workers=args.workers, seed=args.seed)
+    try:
+        mcts_days, q_days, elapsed = compare(args.attempts, planner, args.seed)
+    finally:
+        planner.close()
+    stats = planner.stats
+    print(f"MCTS: dni {mcts_days}, średnio {sum(mcts_days) / len(mcts_days):.1f}, czas {elapsed:.1f} s, "
+          f"decyzji {stats['decisions']}, symulacji {stats['rollouts']}, "
+          f"ponownie użytych drzew {stats['reused_trees']}, "
+          f"{1000 * stats['search_time'] / max(stats['decisions'], 1):.1f} ms/decyzję")
+    recent = q_days[-args.attempts:]
+    print(f"Q-learning w tym samym czasie: {len(q_days)} prób, rekord {max(q_days)}, "
+          f"średnio w ostatnich {len(recent)}: {sum(recent) / len(recent):.1f}")
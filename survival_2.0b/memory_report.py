@@ -0,0 +1,227 @@
+"""Raport zużycia pamięci przez struktury symulacji wobec budżetu RAM urządzenia (np. 320 KB SRAM w ESP32).
+
+Mierzy rozmiary obiektów po kilku próbach bez renderowania (sys.getsizeof po całym grafie obiektów
+oraz tracemalloc), a potem rzutuje je na zadany rozmiar mapy i liczbę prób.
+
+Uruchomienie z katalogu repozytorium:
+    python survival_2.0b/memory_report.py --attempts 3 --map-size 20 --project-attempts 1000 --budget-kb 320
+"""
+import argparse
+import os
+import random
+import sys
+import tracemalloc
+import types
+
+import numpy as np
+
+from agent import ACTIONS, Q_ACTIONS, Agent
+from ai_system import AIKnowledge, QLearningSystem, STATE_BOUNDS, STATE_COUNT, decode_state
+from exploration import ExplorationMap
+from simulation import Simulation
+from world import Pathfinder, WorldMap
+
+# Węzłów zasobów na pole mapy - tyle ile rozmieszcza WorldMap.generate_map na mapie 20 x 20
+RESOURCE_DENSITY = (10 + 8 + 6 + 1 + 6 + 4) / (20 * 20)
+# Wrogowie są tylko w wersji 1 gry (enemy.py w katalogu nadrzędnym, 5 na mapę)
+ENEMY_DENSITY = 5 / (20 * 20)
+
+_SHARED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+
+def deep_sizeof(obj, exclude=()):
+    """Rozmiar obiektu razem ze wszystkim, do czego prowadzi (dict, list, tuple, set, __dict__, __slots__).
+
+    Każdy obiekt liczony jest raz; obiekty z exclude (np. wspólna wiedza albo mapa) są pomijane.
+    Tablice NumPy liczone są przez nbytes, klasy, moduły i funkcje pomijane jako współdzielone.
+    """
+    seen = {id(o) for o in exclude}
+    total = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen or isinstance(o, _SHARED_TYPES):
+            continue
+        seen.add(id(o))
+        if isinstance(o, np.ndarray):
+            total += sys.getsizeof(o) + (o.nbytes if o.base is not None else 0)
+            continue
+        total += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+        if hasattr(o, "__dict__"):
+            stack.append(o.__dict__)
+        for slot in getattr(type(o), "__slots__", ()):
+            if hasattr(o, slot):
+                stack.append(getattr(o, slot))
+    return total
+
+
+def _mean_size(objects, exclude=()):
+    objects = list(objects)
+    if not objects:
+        return 0.0
+    return sum(deep_sizeof(o, exclude) for o in objects) / len(objects)
+
+
+def _load_enemy_class():
+    # Wersja 1 gry leży katalog wyżej; dokładamy ją na koniec ścieżki, żeby nie przesłonić modułów 2.0b
+    parent = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if parent not in sys.path:
+        sys.path.append(parent)
+    try:
+        from enemy import Enemy
+    except ImportError:
+        return None
+    return Enemy
+
+
+def full_q_table_bytes():
+    """Rozmiar q_table i visit_counts, gdy każda para (stan, akcja) została odwiedzona - budujemy je naprawdę."""
+    all_states = np.stack(np.unravel_index(np.arange(STATE_COUNT), STATE_BOUNDS), axis=1)
+    states = [decode_state(row) for row in all_states]
+    # Nazwy akcji są wspólne dla wszystkich wierszy, więc nie liczymy ich w każdym
+    q_table = {state: {action: random.random() for action in Q_ACTIONS} for state in states}
+    visit_counts = {state: {action: 1000 + i for i, action in enumerate(Q_ACTIONS)} for state in states}
+    return deep_sizeof(q_table, Q_ACTIONS) + deep_sizeof(visit_counts, Q_ACTIONS)
+
+
+def measure(attempts=3, seed=0):
+    """Rozgrywa próby i mierzy struktury. Zwraca słownik z rozmiarami jednostkowymi potrzebnymi do projekcji."""
+    random.seed(seed)
+    q_learning = QLearningSystem(list(ACTIONS))
+    knowledge = AIKnowledge()
+    simulation = Simulation(knowledge, q_learning=q_learning, save_files=False)
+
+    tracemalloc.start()
+    days = [simulation.run_attempt() for _ in range(attempts)]
+    _, simulation_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    fresh_map = WorldMap()
+    Agent(AIKnowledge(), fresh_map, simulation.add_log, Pathfinder(fresh_map), q_learning=q_learning)
+    _, new_attempt_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    agent = simulation.agent
+    world_map = simulation.world_map
+    shared = (knowledge, q_learning, world_map, simulation.pathfinder)
+
+    q_entries = sum(len(q_values) for q_values in q_learning.q_table.values())
+    q_bytes = deep_sizeof(q_learning.q_table)
+    visit_bytes = deep_sizeof(q_learning.visit_counts)
+    attempt_count = max(knowledge.attempts, 1)
+    # successful_actions to liczniki {dzień: {akcja: ...}} - rosną z liczbą dni, nie prób
+    successful = sum(len(entries) for entries in knowledge.successful_actions.values())
+    counted_days = max(len(knowledge.successful_actions), 1)
+
+    tiles = [tile for row in world_map.tiles for tile in row]
+    enemy_class = _load_enemy_class()
+
+    return {
+        "attempts": attempts,
+        "mean_days": float(np.mean(days)),
+        "simulation_peak": simulation_peak,
+        "new_attempt_peak": new_attempt_peak,
+        "q_states": len(q_learning.q_table),
+        "q_entries": q_entries,
+        "q_table": q_bytes,
+        "visit_counts": visit_bytes,
+        "q_bytes_per_state": (q_bytes + visit_bytes) / max(len(q_learning.q_table), 1),
+        "q_bytes_per_entry": (q_bytes + visit_bytes) / max(q_entries, 1),
+        "q_table_full": full_q_table_bytes(),
+        "replay_buffer": deep_sizeof(q_learning.replay_buffer),
+        "knowledge": deep_sizeof(knowledge),
+        "successful_actions": deep_sizeof(knowledge.successful_actions),
+        "successful_actions_per_day": successful / counted_days,
+        "successful_action_bytes": deep_sizeof(knowledge.successful_actions) / max(successful, 1),
+        "death_analysis": deep_sizeof(knowledge.death_analysis),
+        "death_analysis_per_attempt": deep_sizeof(knowledge.death_analysis) / max(len(knowledge.death_analysis), 1),
+        "max_death_analysis": knowledge.max_death_analysis,
+        "death_days_per_attempt": deep_sizeof(knowledge.death_days) / attempt_count,
+        "tiles": deep_sizeof(world_map.tiles),
+        "tile_bytes": deep_sizeof(world_map.tiles) / len(tiles),
+        "resource_nodes": deep_sizeof(world_map.resource_nodes),
+        "resource_node_bytes": _mean_size(world_map.resource_nodes),
+        "enemy_bytes": _mean_size([enemy_class(0, 0)]) if enemy_class else None,
+        "agent": deep_sizeof(agent, shared),
+        "agent_lists": {name: deep_sizeof(getattr(agent, name))
+                        for name in ("inventory", "camp", "thoughts", "action_history", "position_history",
+                                     "discovered_tiles", "action_frequency", "learned_skills", "skill_tree")},
+    }
+
+
+def _fully_explored(map_size):
+    explored = ExplorationMap(map_size, map_size)
+    explored.reveal_all()
+    return explored
+
+
+def project(measured, map_size=20, project_attempts=1000):
+    """Rzut zmierzonych rozmiarów na mapę map_size x map_size i project_attempts prób (w bajtach)."""
+    area = map_size * map_size
+    agent_fixed = measured["agent"] - measured["agent_lists"]["discovered_tiles"]
+    rows = {
+        # Najgorszy przypadek: każda para (stan, akcja) odwiedzona
+        "q_table (pełna, słownik)": measured["q_table_full"],
+        "q_table (pełna, float32)": 4 * STATE_COUNT * len(Q_ACTIONS),
+        "replay_buffer": measured["replay_buffer"],
+        # Liczniki akcji na dzień: górna granica to 180 dni niezależnie od liczby prób
+        "knowledge.successful_actions": measured["successful_actions_per_day"]
+        * measured["successful_action_bytes"] * 180,
+        "knowledge.death_analysis": measured["death_analysis_per_attempt"]
+        * min(project_attempts, measured["max_death_analysis"]),
+        "knowledge.death_days": measured["death_days_per_attempt"] * project_attempts,
+        "WorldMap.tiles": measured["tile_bytes"] * area,
+        "ResourceNode": measured["resource_node_bytes"] * RESOURCE_DENSITY * area,
+        # Agent może odkryć całą mapę; pozostałe listy mają stałe limity
+        "Agent": agent_fixed + deep_sizeof(_fully_explored(map_size)),
+    }
+    if measured["enemy_bytes"] is not None:
+        rows["Enemy (wersja 1)"] = measured["enemy_bytes"] * ENEMY_DENSITY * area
+    return rows
+
+
+def report(measured, projected, budget_bytes):
+    print(f"Pomiar: {measured['attempts']} prób, średnio {measured['mean_days']:.1f} dni")
+    print(f"  tracemalloc: szczyt symulacji {measured['simulation_peak'] / 1024:.1f} KB, "
+          f"nowa próba (mapa + agent) {measured['new_attempt_peak'] / 1024:.1f} KB")
+    print(f"  q_table: {measured['q_states']} stanów, {measured['q_entries']} par, "
+          f"{measured['q_bytes_per_state']:.0f} B/stan, {measured['q_bytes_per_entry']:.0f} B/para")
+    print(f"  AIKnowledge: {measured['knowledge'] / 1024:.1f} KB "
+          f"(successful_actions {measured['successful_actions'] / 1024:.1f} KB, "
+          f"death_analysis {measured['death_analysis'] / 1024:.1f} KB)")
+    print(f"  WorldMap.tiles: {measured['tiles'] / 1024:.1f} KB ({measured['tile_bytes']:.0f} B/pole), "
+          f"ResourceNode: {measured['resource_node_bytes']:.0f} B/węzeł")
+    print(f"  Agent: {measured['agent'] / 1024:.1f} KB, w tym " + ", ".join(
+        f"{name} {size} B" for name, size in measured["agent_lists"].items()))
+
+    print(f"\nProjekcja wobec budżetu {budget_bytes / 1024:.0f} KB:")
+    for name, size in sorted(projected.items(), key=lambda item: -item[1]):
+        share = size / budget_bytes
+        flag = "  PRZEKRACZA BUDŻET" if size > budget_bytes else ""
+        print(f"  {name:<30} {size / 1024:10.1f} KB {share:8.1%}{flag}")
+    # Do sumy wchodzi tylko jedna reprezentacja tablicy Q - ta słownikowa, używana w runtime
+    total = sum(size for name, size in projected.items() if name != "q_table (pełna, float32)")
+    print(f"  {'razem (runtime)':<30} {total / 1024:10.1f} KB {total / budget_bytes:8.1%}")
+    worst = max(projected, key=projected.get)
+    print(f"\nPierwsza przekroczy budżet: {worst}")
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Raport pamięci struktur symulacji wobec budżetu RAM")
+    parser.add_argument("--attempts", type=int, default=3, help="próby do pomiaru")
+    parser.add_argument("--map-size", type=int, default=20, help="bok mapy do projekcji")
+    parser.add_argument("--project-attempts", type=int, default=1000, help="liczba prób do projekcji wiedzy")
+    parser.add_argument("--budget-kb", type=float, default=320)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    measured = measure(args.attempts, args.seed)
+    projected = project(measured, args.map_size, args.project_attempts)
+    report(measured, projected, args.budget_kb * 1024)
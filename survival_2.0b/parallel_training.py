@@ -0,0 +1,173 @@
+"""Trening równoległy: W procesów rozgrywa próby bez renderowania, a koordynator
+co K prób scala ich tablice Q średnią ważoną liczbą odwiedzin.
+
+Z --knowledge każdy proces zapisuje też własny shard wiedzy AI, a na końcu shardy są
+scalane (knowledge_merge.py) z istniejącym plikiem wiedzy.
+
+Uruchomienie z katalogu repozytorium:
+    python survival_2.0b/parallel_training.py --workers 4 --sync-every 5 --rounds 20
+    python survival_2.0b/parallel_training.py --workers 4 --rounds 20 --knowledge survival_2.0b/ai_knowledge.json
+"""
+import argparse
+import multiprocessing as mp
+import os
+import random
+
+import numpy as np
+
+from agent import ACTIONS
+from ai_system import AIKnowledge, QLearningSystem, STATE_SIZE, knowledge_log_filename
+from knowledge_merge import merge_files, shard_filename
+from simulation import Simulation
+
+
+def merge_q_arrays(base, updates):
+    """Scala tablice Q (w formacie QLearningSystem.to_arrays) z kilku procesów.
+
+    Każda aktualizacja niesie w "visits" tylko odwiedziny od ostatniej synchronizacji.
+    Wartość dla pary (stan, akcja) to średnia wartości procesów ważona tymi
+    odwiedzinami; pary, których nikt nie odwiedził, zachowują średnią zwykłą.
+    Liczniki w wyniku to liczniki bazy powiększone o sumę nowych odwiedzin.
+    """
+    tables = [base] + list(updates)
+    actions = []
+    for table in tables:
+        for action in table["actions"]:
+            if str(action) not in actions:
+                actions.append(str(action))
+    action_index = {action: i for i, action in enumerate(actions)}
+
+    all_states = np.concatenate([t["states"] for t in tables]).reshape(-1, STATE_SIZE)
+    states, inverse = np.unique(all_states, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+
+    weighted_sum = np.zeros((len(states), len(actions)))
+    weight = np.zeros((len(states), len(actions)))
+    plain_sum = np.zeros((len(states), len(actions)))
+    plain_count = np.zeros((len(states), len(actions)))
+    total_visits = np.zeros((len(states), len(actions)), dtype=np.int64)
+
+    offset = 0
+    for i, table in enumerate(tables):
+        n = len(table["states"])
+        rows = inverse[offset:offset + n]
+        offset += n
+        if n == 0:
+            continue
+        cols = np.array([action_index[str(a)] for a in table["actions"]])
+        known = ~np.isnan(table["q_values"])
+        r, c = np.nonzero(known)
+        values = table["q_values"][r, c].astype(np.float64)
+        visits = table["visits"][r, c]
+        np.add.at(total_visits, (rows[r], cols[c]), visits)
+        if i == 0:
+            # Baza nie głosuje - jej wartości są już punktem startowym każdego procesu
+            np.add.at(plain_sum, (rows[r], cols[c]), values)
+            np.add.at(plain_count, (rows[r], cols[c]), 1)
+            continue
+        np.add.at(weighted_sum, (rows[r], cols[c]), values * visits)
+        np.add.at(weight, (rows[r], cols[c]), visits)
+        np.add.at(plain_sum, (rows[r], cols[c]), values)
+        np.add.at(plain_count, (rows[r], cols[c]), 1)
+
+    q_values = np.full((len(states), len(actions)), np.nan, dtype=np.float32)
+    visited = weight > 0
+    q_values[visited] = weighted_sum[visited] / weight[visited]
+    seen = ~visited & (plain_count > 0)
+    q_values[seen] = plain_sum[seen] / plain_count[seen]
+    return {"states": states.astype(np.int16), "actions": np.array(actions, dtype=str),
+            "q_values": q_values, "visits": total_visits.astype(np.int32)}
+
+
+def worker_loop(worker_id, seed, sync_every, inbox, outbox, knowledge_filename=None, epsilon=None):
+    random.seed(seed)
+    q_learning = QLearningSystem(list(ACTIONS))
+    if epsilon is not None:
+        # Eksploracja startuje od wczytanej tablicy, a nie od zera wiedzy
+        q_learning.epsilon = epsilon
+    q_learning.replay_buffer.rng = np.random.default_rng(seed)
+    # Każdy proces ma własną wiedzę w pamięci; zapisuje ją tylko do swojego sharda
+    knowledge = AIKnowledge()
+    simulation = Simulation(knowledge, q_learning=q_learning, save_files=False, headless=True,
+                            log_knowledge=knowledge_filename is not None)
+
+    while True:
+        message = inbox.get()
+        if message is None:
+            break
+        q_learning.from_arrays(**message)
+        baseline = {state: dict(visits) for state, visits in q_learning.visit_counts.items()}
+
+        days = [simulation.run_attempt() for _ in range(sync_every)]
+        if knowledge_filename:
+            knowledge.save_to_file(shard_filename(knowledge_filename, worker_id))
+        outbox.put((worker_id, q_learning.to_arrays(visit_baseline=baseline), days, q_learning.epsilon))
+
+
+def _remove_shards(knowledge_filename, workers):
+    for i in range(workers):
+        shard = shard_filename(knowledge_filename, i)
+        for name in (shard, knowledge_log_filename(shard)):
+            if os.path.exists(name):
+                os.remove(name)
+
+
+def train(workers=4, sync_every=5, rounds=10, seed=0, filename="survival_2.0b/q_table.npz", knowledge_filename=None):
+    merged = QLearningSystem(list(ACTIONS))
+    merged.load_from_file(filename)
+    merged_arrays = merged.to_arrays()
+    if knowledge_filename:
+        # Shardy z przerwanego wcześniej treningu są już albo w pliku wiedzy, albo niepełne
+        _remove_shards(knowledge_filename, workers)
+
+    inboxes = [mp.Queue() for _ in range(workers)]
+    outbox = mp.Queue()
+    processes = [
+        mp.Process(target=worker_loop,
+                   args=(i, seed + i, sync_every, inboxes[i], outbox, knowledge_filename, merged.epsilon), daemon=True)
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    best_days = 0
+    try:
+        for round_number in range(rounds):
+            for inbox in inboxes:
+                inbox.put(merged_arrays)
+            results = [outbox.get() for _ in range(workers)]
+            results.sort(key=lambda r: r[0])
+            merged_arrays = merge_q_arrays(merged_arrays, [arrays for _, arrays, _, _ in results])
+            # Każdy proces wygasza epsilon sam - scalona tablica dostaje średnią, żeby gra nie wracała do eksploracji
+            merged.epsilon = float(np.mean([epsilon for _, _, _, epsilon in results]))
+
+            days = [d for _, _, worker_days, _ in results for d in worker_days]
+            best_days = max(best_days, max(days))
+            print(f"Runda {round_number + 1}/{rounds}: prób {len(days)}, średnio {np.mean(days):.1f} dni, "
+                  f"rekord {best_days}, stanów {len(merged_arrays['states'])}")
+    finally:
+        for inbox in inboxes:
+            inbox.put(None)
+        for process in processes:
+            process.join()
+
+    merged.from_arrays(**merged_arrays)
+    merged.save_to_file(filename)
+    if knowledge_filename:
+        shards = [shard_filename(knowledge_filename, i) for i in range(workers)]
+        existing = [knowledge_filename] if os.path.exists(knowledge_filename) else []
+        merge_files(existing + shards, knowledge_filename)
+        _remove_shards(knowledge_filename, workers)
+    return merged
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Równoległy trening Q-learning z okresowym scalaniem tablic")
+    parser.add_argument("--workers", type=int, default=mp.cpu_count())
+    parser.add_argument("--sync-every", type=int, default=5, help="liczba prób między scaleniami (K)")
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="survival_2.0b/q_table.npz")
+    parser.add_argument("--knowledge", default=None, help="plik wiedzy AI, do którego trafią shardy procesów")
+    args = parser.parse_args()
+    train(args.workers, args.sync_every, args.rounds, args.seed, args.output, args.knowledge)
@@ -0,0 +1,242 @@
+"""Eksport wyuczonej tablicy Q do skwantyzowanej polityki int8 dla mikrokontrolerów (ESP32).
+
+Format pliku (little-endian, tablice wyrównane do 4 bajtów):
+    nagłówek   "SQP1", wersja u16, liczba stanów u16, liczba akcji u16, pola stanu u8, zarezerwowane u8
+    granice    u8 x pola stanu (STATE_BOUNDS) + wyrównanie
+    akcje      dla każdej akcji: długość u8 + nazwa UTF-8, potem wyrównanie
+    skale      float32 x liczba stanów
+    zera       int8 x liczba stanów (zero-point wiersza)
+    zachłanne  u8 x liczba stanów (indeks najlepszej akcji, 255 = stan nieodwiedzony)
+    q          int8 x liczba stanów x liczba akcji
+
+Wiersz stanu to state_index z ai_system, więc urządzenie liczy go z poziomów stanu bez wyszukiwania.
+Stany usunięte z tablicy przy limicie max_states dostają wiersz stanu nadrzędnego z coarse_table -
+tak samo jak w get_q_values, więc urządzenie decyduje jak choose_action.
+Wartość Q = (q - zero) * skala; akcje nigdy niewypróbowane mają q = -128.
+
+Uruchomienie z katalogu repozytorium:
+    python survival_2.0b/policy_export.py --input survival_2.0b/q_table.npz --output survival_2.0b/policy.bin
+"""
+import argparse
+import struct
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import numpy as np
+
+from agent import ACTIONS, Q_ACTIONS
+from ai_system import (QLearningSystem, STATE_BOUNDS, STATE_COUNT, STATE_SIZE, coarsen_state, decode_state,
+                       encode_state, state_index)
+
+MAGIC = b"SQP1"
+VERSION = 1
+NO_ACTION = 255
+UNKNOWN_Q = -128
+HEADER = struct.Struct("<4sHHHBB")
+
+
+def _pad(blob):
+    return blob + bytes(-len(blob) % 4)
+
+
+def coarse_fallback_rows(q_learning):
+    """[(wiersz, stan, wartości Q)] stanów bez własnych wartości, dla których get_q_values sięga do coarse_table."""
+    if not q_learning.coarse_table:
+        return []
+    rows = []
+    for row in range(STATE_COUNT):
+        state = decode_state(np.unravel_index(row, STATE_BOUNDS))
+        if not q_learning.q_table.get(state):
+            q_values = q_learning.coarse_table.get(coarsen_state(state))
+            if q_values:
+                rows.append((row, state, q_values))
+    return rows
+
+
+def quantize_q_table(q_learning, actions=Q_ACTIONS):
+    """Tablica Q -> (skale, zera, zachłanne akcje, q int8) dla wszystkich STATE_COUNT wierszy."""
+    action_ids = {action: i for i, action in enumerate(actions)}
+    values = np.zeros((STATE_COUNT, len(actions)))
+    known = np.zeros((STATE_COUNT, len(actions)), dtype=bool)
+    greedy = np.full(STATE_COUNT, NO_ACTION, dtype=np.uint8)
+    rows = [(row, q_values) for row, _, q_values in coarse_fallback_rows(q_learning)]
+    rows += [(state_index(encode_state(state)), q_values) for state, q_values in q_learning.q_table.items()]
+    for row, q_values in rows:
+        q_values = {a: v for a, v in q_values.items() if a in action_ids}
+        if not q_values:
+            continue
+        values[row] = 0.0
+        known[row] = False
+        for action, value in q_values.items():
+            values[row, action_ids[action]] = value
+            known[row, action_ids[action]] = True
+        # Ta sama reguła co w choose_action (gałąź exploit)
+        greedy[row] = action_ids[max(q_values, key=q_values.get)]
+
+    # Kwantyzacja asymetryczna per wiersz; -128 zostaje zarezerwowane dla nieznanych akcji
+    low = np.where(known, values, np.inf).min(axis=1)
+    high = np.where(known, values, -np.inf).max(axis=1)
+    has_values = known.any(axis=1)
+    # Jak w TFLite: zakres zawsze obejmuje zero, więc zero-point mieści się w int8
+    low = np.minimum(np.where(has_values, low, 0.0), 0.0)
+    high = np.maximum(np.where(has_values, high, 0.0), 0.0)
+    scales = np.where(high > low, (high - low) / 254.0, 1.0).astype(np.float32)
+    zero_points = np.clip(np.round(-127 - low / scales), -128, 127).astype(np.int8)
+    q = np.clip(np.round(values / scales[:, None]) + zero_points[:, None], -127, 127)
+    q = np.where(known, q, UNKNOWN_Q).astype(np.int8)
+    return scales, zero_points, greedy, q
+
+
+def export_policy(q_learning, actions=Q_ACTIONS):
+    scales, zero_points, greedy, q = quantize_q_table(q_learning, actions)
+    blob = HEADER.pack(MAGIC, VERSION, STATE_COUNT, len(actions), STATE_SIZE, 0)
+    blob = _pad(blob + bytes(STATE_BOUNDS))
+    for action in actions:
+        name = action.encode("utf-8")
+        blob += bytes([len(name)]) + name
+    blob = _pad(blob)
+    blob += scales.astype("<f4").tobytes()
+    blob += zero_points.tobytes()
+    blob = _pad(blob)
+    blob += greedy.tobytes()
+    blob = _pad(blob)
+    blob += q.tobytes()
+    return blob
+
+
+def write_c_header(blob, filename, array_name="survival_policy"):
+    lines = [
+        "// Wygenerowane przez policy_export.py - nie edytować ręcznie",
+        f"#ifndef {array_name.upper()}_H",
+        f"#define {array_name.upper()}_H",
+        "",
+        f"#define {array_name.upper()}_STATE_COUNT {STATE_COUNT}",
+        f"#define {array_name.upper()}_STATE_FIELDS {STATE_SIZE}",
+        "",
+        f"const unsigned char {array_name}[] __attribute__((aligned(4))) = {{",
+    ]
+    for i in range(0, len(blob), 12):
+        lines.append("  " + ", ".join(f"0x{b:02x}" for b in blob[i:i + 12]) + ",")
+    lines += [
+        "};",
+        f"const unsigned int {array_name}_len = {len(blob)};",
+        "",
+        f"#endif  // {array_name.upper()}_H",
+        "",
+    ]
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+
+
+class PolicyInterpreter:
+    """Referencyjny interpreter pliku polityki w czystym Pythonie - robi to samo co kod na urządzeniu."""
+
+    def __init__(self, blob):
+        self.blob = memoryview(blob)
+        magic, version, self.state_count, self.action_count, fields, _ = HEADER.unpack_from(self.blob, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Nieznany format pliku polityki")
+        offset = HEADER.size
+        self.bounds = tuple(self.blob[offset:offset + fields])
+        offset += fields
+        offset += -offset % 4
+        self.actions = []
+        for _ in range(self.action_count):
+            length = self.blob[offset]
+            self.actions.append(bytes(self.blob[offset + 1:offset + 1 + length]).decode("utf-8"))
+            offset += 1 + length
+        offset += -offset % 4
+        self.scales_offset = offset
+        offset += 4 * self.state_count
+        self.zero_offset = offset
+        offset += self.state_count
+        offset += -offset % 4
+        self.greedy_offset = offset
+        offset += self.state_count
+        offset += -offset % 4
+        self.q_offset = offset
+
+    def row(self, encoded_state):
+        index = 0
+        for value, bound in zip(encoded_state, self.bounds):
+            index = index * bound + min(max(value, 0), bound - 1)
+        return index
+
+    def decide(self, encoded_state):
+        action = self.blob[self.greedy_offset + self.row(encoded_state)]
+        return None if action == NO_ACTION else self.actions[action]
+
+    def q_values(self, encoded_state):
+        row = self.row(encoded_state)
+        scale = struct.unpack_from("<f", self.blob, self.scales_offset + 4 * row)[0]
+        zero = struct.unpack_from("<b", self.blob, self.zero_offset + row)[0]
+        start = self.q_offset + row * self.action_count
+        quantized = struct.unpack_from(f"<{self.action_count}b", self.blob, start)
+        return {self.actions[i]: (q - zero) * scale for i, q in enumerate(quantized) if q != UNKNOWN_Q}
+
+
+def measure_parity(q_learning, blob, repeats=200):
+    """Zgodność decyzji interpretera z choose_action (epsilon = 0) oraz czas i pamięć jednej decyzji."""
+    interpreter = PolicyInterpreter(blob)
+    greedy_agent = SimpleNamespace(knowledge=SimpleNamespace(risk_tolerance=0.0))
+    saved_epsilon = q_learning.epsilon
+    q_learning.epsilon = 0.0
+    states = [s for s, q_values in q_learning.q_table.items() if q_values]
+    states += [state for _, state, _ in coarse_fallback_rows(q_learning)]
+    lut_matches = 0
+    int8_matches = 0
+    try:
+        for state in states:
+            expected = q_learning.choose_action(state, greedy_agent)
+            encoded = encode_state(state)
+            if interpreter.decide(encoded) == expected:
+                lut_matches += 1
+            dequantized = interpreter.q_values(encoded)
+            if dequantized and max(dequantized, key=dequantized.get) == expected:
+                int8_matches += 1
+    finally:
+        q_learning.epsilon = saved_epsilon
+
+    encoded_states = [encode_state(s) for s in states] or [(0,) * STATE_SIZE]
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for encoded in encoded_states:
+            interpreter.decide(encoded)
+    elapsed = time.perf_counter() - start
+    # Pamięć mierzymy osobno - tracemalloc spowalnia pętlę czasową
+    tracemalloc.start()
+    for encoded in encoded_states:
+        interpreter.decide(encoded)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    count = max(len(states), 1)
+    return {
+        "states": len(states),
+        "lut_agreement": lut_matches / count,
+        "int8_argmax_agreement": int8_matches / count,
+        "decision_us": elapsed / (repeats * len(encoded_states)) * 1e6,
+        "decision_peak_bytes": peak,
+        "policy_bytes": len(blob),
+        # Na urządzeniu tablica leży we flashu; w RAM potrzebny jest tylko jeden zdekwantyzowany wiersz
+        "device_ram_bytes": 4 * interpreter.action_count,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Eksport tablicy Q do polityki int8 dla ESP32")
+    parser.add_argument("--input", default="survival_2.0b/q_table.npz")
+    parser.add_argument("--output", default="survival_2.0b/policy.bin")
+    parser.add_argument("--header", default="survival_2.0b/policy.h")
+    args = parser.parse_args()
+
+    q_learning = QLearningSystem(list(ACTIONS))
+    if not q_learning.load_from_file(args.input):
+        raise SystemExit(f"Brak tablicy Q: {args.input}")
+    blob = export_policy(q_learning)
+    with open(args.output, "wb") as f:
+        f.write(blob)
+    write_c_header(blob, args.header)
+    for key, value in measure_parity(q_learning, blob).items():
+        print(f"{key}: {value:.4f}" if isinstance(value, float) else f"{key}: {value}")
@@ -0,0 +1,149 @@
+"""Macierz wymagań przepisów i planowanie wypraw po brakujące surowce.
+
+RecipeMatrix składa przepisy przedmiotów i struktur z CraftingSystem w macierz
+(przepis x surowiec, kolejność z resources.RESOURCES), więc sprawdzenie całego katalogu to jedno
+porównanie z wektorem ekwipunku (opcjonalnie z magazynem) - bez pętli po słownikach wymagań.
+plan_gathering odpowiada na pytanie "jak najtaniej zebrać brakujące surowce na przepis X":
+kolejność odwiedzenia najbliższych węzłów to mały problem komiwojażera, liczony programowaniem
+dynamicznym po podzbiorach i zapamiętywany dla tych samych pozycji startu i węzłów.
+"""
+import math
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from resources import RESOURCES
+
+CRAFT = "craft"
+BUILD = "build"
+
+# Koszt planu w ruchach agenta: kroki marszu plus akcje zbierania
+GatherPlan = namedtuple("GatherPlan", ("cost", "order", "harvests", "steps", "fits"))
+
+
+class RecipeMatrix:
+    def __init__(self, crafting):
+        self.keys = [(CRAFT, name) for name in crafting.recipes] + [(BUILD, name) for name in crafting.structure_recipes]
+        self.index = {key: i for i, key in enumerate(self.keys)}
+        self.requirements = np.zeros((len(self.keys), len(RESOURCES)), dtype=np.intc)
+        self.level_req = np.zeros(len(self.keys), dtype=np.intc)
+        self.str_req = np.zeros(len(self.keys), dtype=np.intc)
+        self.dex_req = np.zeros(len(self.keys), dtype=np.intc)
+        for i, (kind, name) in enumerate(self.keys):
+            if kind == CRAFT:
+                recipe = crafting.recipes[name]
+                requirements = recipe.requirements
+                self.level_req[i] = recipe.level_req
+                self.str_req[i] = recipe.str_req
+                self.dex_req[i] = recipe.dex_req
+            else:
+                recipe = crafting.structure_recipes[name]
+                requirements = recipe["requirements"]
+                self.level_req[i] = recipe["level_req"]
+            for resource, amount in requirements.items():
+                self.requirements[i, RESOURCES.index(resource)] = amount
+
+    def available(self, agent, include_storage=False):
+        """Wektor ilości surowców agenta - widok na array ekwipunku, bez kopiowania."""
+        have = np.frombuffer(agent.inventory.values_array, dtype=np.intc)
+        if include_storage:
+            have = have + np.frombuffer(agent.camp["storage"].values_array, dtype=np.intc)
+        return have
+
+    def feasible(self, agent, include_storage=False):
+        """Maska przepisów, które agent może teraz wykonać (surowce, poziom, siła, zręczność)."""
+        have = self.available(agent, include_storage)
+        return ((self.requirements <= have).all(axis=1) & (self.level_req <= agent.level)
+                & (self.str_req <= agent.strength) & (self.dex_req <= agent.dexterity))
+
+    def craftable(self, agent, include_storage=False):
+        return [self.keys[i] for i in np.flatnonzero(self.feasible(agent, include_storage))]
+
+    def can_make(self, agent, kind, name, include_storage=False):
+        i = self.index[(kind, name)]
+        have = self.available(agent, include_storage)
+        return bool((self.requirements[i] <= have).all() and self.level_req[i] <= agent.level
+                    and self.str_req[i] <= agent.strength and self.dex_req[i] <= agent.dexterity)
+
+    def deficit(self, agent, kind, name, include_storage=False):
+        """Brakujące ilości surowców na przepis, w kolejności RESOURCES."""
+        return np.maximum(self.requirements[self.index[(kind, name)]] - self.available(agent, include_storage), 0)
+
+
+def nearest_nodes(world_map, x, y, resource_types):
+    """Najbliższy (Manhattan, jak w _act_find_resource) niewyczerpany węzeł każdego typu."""
+    nearest = {}
+    for node in world_map.resource_nodes:
+        if node.type in resource_types and not node.depleted:
+            dist = abs(node.x - x) + abs(node.y - y)
+            if node.type not in nearest or dist < nearest[node.type][0]:
+                nearest[node.type] = (dist, node)
+    return {resource: node for resource, (_, node) in nearest.items()}
+
+
+def _steps(a, b):
+    # Agent idzie naraz w x i w y, więc liczba kroków to odległość Czebyszewa
+    return max(abs(a[0] - b[0]), abs(a[1] - b[1]))
+
+
+@lru_cache(maxsize=4096)
+def shortest_tour(start, stops, end=None):
+    """Najkrótsza trasa start -> każdy z stops w dowolnej kolejności -> end (jeśli podano).
+
+    Zwraca (liczba kroków, kolejność indeksów stops). Programowanie dynamiczne po podzbiorach - O(2^n * n^2)
+    dla n rodzajów surowców (najwyżej 6).
+    """
+    n = len(stops)
+    if not n:
+        return (_steps(start, end) if end is not None else 0), ()
+    best = {(1 << i, i): (_steps(start, stops[i]), None) for i in range(n)}
+    for mask in range(1, 1 << n):
+        for last in range(n):
+            entry = best.get((mask, last))
+            if entry is None:
+                continue
+            for nxt in range(n):
+                if mask >> nxt & 1:
+                    continue
+                key = (mask | 1 << nxt, nxt)
+                cost = entry[0] + _steps(stops[last], stops[nxt])
+                if key not in best or cost < best[key][0]:
+                    best[key] = (cost, last)
+    full = (1 << n) - 1
+    last = min(range(n), key=lambda i: best[(full, i)][0] + (_steps(stops[i], end) if end is not None else 0))
+    total = best[(full, last)][0] + (_steps(stops[last], end) if end is not None else 0)
+    order = []
+    mask = full
+    while last is not None:
+        order.append(last)
+        prev = best[(mask, last)][1]
+        mask &= ~(1 << last)
+        last = prev
+    return total, tuple(reversed(order))
+
+
+def plan_gathering(matrix, agent, world_map, kind, name, return_to_camp=None):
+    """Najtańszy plan zebrania brakujących surowców na przepis, albo None, gdy brak węzła któregoś surowca
+    albo przy obecnym mnożniku nic się z niego nie zbierze.
+
+    Struktury buduje się w obozie, więc dla nich trasa domyślnie kończy się w obozie.
+    Liczba zbierań wynika ze średniej ilości z jednego zbierania na danym węźle (ResourceNode.expected_yield).
+    fits mówi, czy brakujące surowce mieszczą się naraz w wolnym miejscu ekwipunku.
+    """
+    missing = matrix.deficit(agent, kind, name)
+    needed = [RESOURCES[i] for i in np.flatnonzero(missing)]
+    nodes = nearest_nodes(world_map, agent.x, agent.y, needed)
+    if len(nodes) < len(needed):
+        return None
+    if return_to_camp is None:
+        return_to_camp = kind == BUILD
+    end = (world_map.camp_x, world_map.camp_y) if return_to_camp else None
+    multiplier = agent.effective_stats().harvest_multiplier
+    per_harvest = {resource: nodes[resource].expected_yield(multiplier) for resource in needed}
+    if not all(per_harvest.values()):
+        return None
+    steps, order = shortest_tour((agent.x, agent.y), tuple((nodes[r].x, nodes[r].y) for r in needed), end)
+    harvests = sum(math.ceil(missing[RESOURCES.index(resource)] / per_harvest[resource]) for resource in needed)
+    fits = int(missing.sum()) <= agent.current_carry_capacity - agent.get_total_inventory_size()
+    return GatherPlan(steps + harvests, tuple(needed[i] for i in order), harvests, steps, fits)
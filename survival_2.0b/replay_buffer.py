@@ -0,0 +1,41 @@
+import numpy as np
+
+
+class ReplayBuffer:
+    """Bufor cykliczny przejść (stan, akcja, nagroda, następny stan, koniec) w tablicach NumPy."""
+
+    def __init__(self, capacity, state_size, done_weight=4.0, seed=None):
+        self.capacity = capacity
+        self.done_weight = done_weight
+        self.states = np.zeros((capacity, state_size), dtype=np.int16)
+        self.actions = np.zeros(capacity, dtype=np.int16)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros((capacity, state_size), dtype=np.int16)
+        self.dones = np.zeros(capacity, dtype=bool)
+        self.position = 0
+        self.size = 0
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.size
+
+    def push(self, state, action_id, reward, next_state, done=False):
+        i = self.position
+        self.states[i] = state
+        self.actions[i] = action_id
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.dones[i] = done
+        self.position = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def sample(self, batch_size):
+        # Przejścia kończące próbę (śmierć) losujemy done_weight razy częściej niż pozostałe
+        dones = self.dones[:self.size]
+        if self.done_weight != 1.0 and dones.any():
+            weights = np.where(dones, self.done_weight, 1.0)
+            indices = self.rng.choice(self.size, size=batch_size, p=weights / weights.sum())
+        else:
+            indices = self.rng.integers(0, self.size, size=batch_size)
+        return (self.states[indices], self.actions[indices], self.rewards[indices],
+                self.next_states[indices], self.dones[indices])
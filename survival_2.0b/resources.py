@@ -0,0 +1,82 @@
+"""Wektor ilości surowców indeksowany numerem surowca, z bieżącą sumą.
+
+Zastępuje słowniki {"wood": 0, ...} w ekwipunku i magazynie agenta: zachowuje się jak dict
+(r["food"], get, items, in, ...), ale wartości są w array("i"), a suma jest aktualizowana przy każdej
+zmianie, więc sprawdzenie zapełnienia ekwipunku nie sumuje słownika.
+"""
+from array import array
+
+RESOURCES = ("wood", "stone", "food", "water", "fiber", "metal")
+RESOURCE_IDS = {resource: i for i, resource in enumerate(RESOURCES)}
+
+
+class ResourceVector:
+    """Ilości surowców jak w słowniku; klucz pojawia się w nim po pierwszym przypisaniu (jak w dict)."""
+
+    __slots__ = ("values_array", "present", "total")
+
+    def __init__(self, initial=None):
+        self.values_array = array("i", bytes(4 * len(RESOURCES)))
+        # Maska bitowa kluczy obecnych w "słowniku" - magazyn obozu startuje pusty
+        self.present = 0
+        self.total = 0
+        if initial:
+            for resource, amount in initial.items():
+                self[resource] = amount
+
+    @classmethod
+    def full(cls):
+        """Wszystkie surowce obecne z ilością 0 (ekwipunek agenta)."""
+        vector = cls()
+        vector.present = (1 << len(RESOURCES)) - 1
+        return vector
+
+    def __getitem__(self, resource):
+        i = RESOURCE_IDS[resource]
+        if not self.present >> i & 1:
+            raise KeyError(resource)
+        return self.values_array[i]
+
+    def __setitem__(self, resource, amount):
+        i = RESOURCE_IDS[resource]
+        self.total += amount - self.values_array[i]
+        self.values_array[i] = amount
+        self.present |= 1 << i
+
+    def __contains__(self, resource):
+        i = RESOURCE_IDS.get(resource)
+        return i is not None and bool(self.present >> i & 1)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return bin(self.present).count("1")
+
+    def __eq__(self, other):
+        return dict(self.items()) == (dict(other.items()) if isinstance(other, ResourceVector) else other)
+
+    def __repr__(self):
+        return f"ResourceVector({dict(self.items())})"
+
+    def get(self, resource, default=None):
+        i = RESOURCE_IDS.get(resource)
+        if i is None or not self.present >> i & 1:
+            return default
+        return self.values_array[i]
+
+    def keys(self):
+        return [resource for i, resource in enumerate(RESOURCES) if self.present >> i & 1]
+
+    def values(self):
+        return [self.values_array[i] for i in range(len(RESOURCES)) if self.present >> i & 1]
+
+    def items(self):
+        return [(resource, self.values_array[i]) for i, resource in enumerate(RESOURCES) if self.present >> i & 1]
+
+    def copy(self):
+        vector = ResourceVector()
+        vector.values_array = array("i", self.values_array)
+        vector.present = self.present
+        vector.total = self.total
+        return vector
@@ -0,0 +1,140 @@
+from agent import Agent
+from world import WorldMap, Pathfinder
+from actions import ACTION_TYPES, ACTIONS, Q_ACTIONS
+from ai_system import QLearningSystem
+from events import INFO, EventLog
+
+
+class Simulation:
+    """Pętla symulacji bez pygame - używana przez Game oraz przez trening w tle."""
+
+    def __init__(self, knowledge, q_learning=None, save_files=True, agent_class=Agent, saver=None,
+                 history=None, headless=False, planner=None, log_knowledge=None):
+        self.knowledge = knowledge
+        # Wiedza, której nikt nie zapisuje, nie buforuje zmian do dziennika (domyślnie: gdy save_files)
+        knowledge.log_changes = save_files if log_knowledge is None else log_knowledge
+        # Jedna tablica Q (i bufor powtórek) na wszystkie próby - nowy agent nie zaczyna od pustego bufora
+        self.q_learning = q_learning if q_learning is not None else QLearningSystem(list(ACTIONS))
+        self.q_table_loaded = False
+        self.save_files = save_files
+        # Np. FixedPointAgent z fixed_point.py dla arytmetyki stałoprzecinkowej
+        self.agent_class = agent_class
+        # BackgroundSaver z background_saver.py - bez niego zapis jest synchroniczny
+        self.saver = saver
+        # AttemptHistory z attempt_history.py - kolumnowy zapis wyniku każdej próby
+        self.history = history
+        # MCTSPlanner z mcts.py - decyzje z przeszukiwania zamiast z tablicy Q
+        self.planner = planner
+
+        self.agent = None
+        self.world_map = None
+        self.pathfinder = None
+
+        self.max_log = 8
+        # headless: dziennik i myśli agenta tylko liczą wpisy, bez składania napisów
+        self.headless = headless
+        # Wyniki na poziomie DEBUG (np. marsz do surowca) są tylko liczone
+        self.log = EventLog(self.max_log, headless=headless, min_level=INFO)
+
+        self.simulation_active = False
+        self.action_cooldown = 0
+        self.action_delay = 1.0
+
+        self.last_q_step = None
+
+    def start_new_attempt(self):
+        self.world_map = WorldMap()
+        self.pathfinder = Pathfinder(self.world_map)
+        self.agent = self.agent_class(self.knowledge, self.world_map, self.add_log, self.pathfinder,
+                                      q_learning=self.q_learning, headless=self.headless)
+        if self.planner is not None:
+            self.agent.planner = self.planner
+            self.planner.reset()
+        if self.save_files and not self.q_table_loaded:
+            # Plik czytamy raz, przy pierwszej próbie - potem tablica w pamięci jest nowsza od zapisu
+            if self.saver is not None:
+                self.saver.flush()
+            self.q_learning.load_from_file()
+            self.q_table_loaded = True
+        self.log.clear()
+        self.simulation_active = True
+        self.action_cooldown = 0
+        self.last_q_step = None
+
+    def save(self, target):
+        if self.saver is not None:
+            self.saver.save(target)
+        else:
+            target.save_to_file()
+
+    def add_log(self, message, *args, level=INFO):
+        self.log.add(message, *args, level=level)
+
+    def simulate_tick(self, delta_time):
+        if not self.agent or not self.agent.alive:
+            return
+
+        self.agent.update(delta_time, self.world_map)
+
+        self.action_cooldown -= delta_time
+        if self.action_cooldown <= 0 and self.agent.stamina > 5 and self.agent.alive:
+            state = self.agent.q_learning.get_state(self.agent, self.world_map)
+            action = self.agent.ai_decide_action(self.world_map)
+
+            # ai_decide_action zwraca numer akcji - jest też kolumną Q_ACTIONS
+            action_for_q_table = Q_ACTIONS[action]
+
+            success, result, new_delay = self.agent.execute_action(action, self.world_map)
+
+            reward = self.agent.reward_values.get(action_for_q_table, 0) if success else -10
+            next_state = self.agent.q_learning.get_state(self.agent, self.world_map)
+            self.agent.q_learning.remember(state, action_for_q_table, reward, next_state)
+            self.last_q_step = (state, action_for_q_table)
+
+            # result to Message - napis powstaje dopiero przy odczycie dziennika, w trybie headless wcale
+            if success and ACTION_TYPES[action].logs_result:
+                self.add_log("[D{}] {}", self.agent.current_day + 1, result, level=result.level)
+
+            # zabezpieczenie: jeśli new_delay None lub <=0 ustaw minimalne opóźnienie
+            if new_delay is None or new_delay <= 0:
+                new_delay = 0.1
+            self.action_cooldown = new_delay
+
+        if not self.agent.alive:
+            self.end_attempt()
+        elif self.agent.current_day >= 180:
+            self.add_log("PRZEŻYTO 180 DNI!")
+            self.simulation_active = False
+            if self.history is not None:
+                self.history.append_agent(self.agent, self.knowledge)
+            if self.save_files:
+                self.save(self.knowledge)
+                self.save(self.agent.q_learning)
+
+    def end_attempt(self):
+        if self.agent:
+            self.knowledge.record_death(self.agent.current_day, self.agent.death_cause)
+            self.knowledge.analyze_death(self.agent)
+            if self.history is not None:
+                self.history.append_agent(self.agent, self.knowledge)
+            if self.save_files:
+                self.save(self.knowledge)
+            if self.last_q_step:
+                # Kara za śmierć trafia do ostatniej podjętej akcji jako przejście końcowe
+                state, action = self.last_q_step
+                death_state = self.agent.q_learning.get_state(self.agent, self.world_map)
+                self.agent.q_learning.remember(state, action, self.agent.death_penalty(), death_state, done=True)
+            if self.save_files:
+                self.save(self.agent.q_learning)
+            self.add_log("💀 Przyczyna: {}", self.agent.death_cause)
+            self.add_log("Przeżyto: {}/180 dni", self.agent.current_day)
+        self.simulation_active = False
+
+    def run_attempt(self, delta_time=1 / 60, max_ticks=None):
+        """Rozgrywa całą próbę bez renderowania. Zwraca liczbę przeżytych dni."""
+        self.start_new_attempt()
+        ticks = 0
+        while self.simulation_active and (max_ticks is None or ticks < max_ticks):
+            self.simulate_tick(delta_time)
+            ticks += 1
+        return self.agent.current_day
@@ -0,0 +1,129 @@
+"""Szybkie migawki pełnego stanu symulacji do rozgrywania przyszłości silnikiem gry.
+
+snapshot(simulation) zapisuje agenta (pola, ekwipunek, obóz, przedmioty, umiejętności, statystyki
+zachowania, odkryte pola), stan węzłów surowców mapy, liczniki Simulation i stan generatora random;
+restore(simulation, snap) przywraca go w tych samych obiektach, więc odwołania do agenta i mapy
+pozostają ważne, a jedną migawkę można przywracać wiele razy. Pola proste agenta to jedna krotka,
+kontenery kopiują własne tablice (ResourceVector, ExplorationMap, ActionWindow), a węzły mapy są
+spakowane w array("i") - całość trwa kilkadziesiąt mikrosekund.
+
+Migawka nie obejmuje wiedzy AI ani tablicy Q: są współdzielone między próbami i nie są stanem świata.
+"""
+import random
+from array import array
+from operator import attrgetter
+
+from agent import Agent
+
+# Obiekty stałe w czasie próby - migawka trzyma tylko odwołanie
+SHARED_SLOTS = frozenset(("actions", "add_log", "crafting", "development_paths", "knowledge", "pathfinder",
+                          "planner", "q_learning", "recipe_matrix", "reward_values", "skill_tree"))
+# Kontenery z własną metodą copy()
+COPIED_SLOTS = ("inventory", "action_frequency", "action_history", "discovered_tiles", "thoughts", "danger_signals")
+LIST_SLOTS = ("path", "position_history")
+DICT_SLOTS = ("equipment", "learned_skills", "memory_context")
+SCALAR_SLOTS = tuple(name for name in Agent.__slots__
+                     if name not in SHARED_SLOTS and name not in COPIED_SLOTS and name not in LIST_SLOTS
+                     and name not in DICT_SLOTS and name != "camp")
+SIMULATION_FIELDS = ("simulation_active", "action_cooldown", "last_q_step")
+
+_get_scalars = attrgetter(*SCALAR_SLOTS)
+_get_simulation = attrgetter(*SIMULATION_FIELDS)
+
+
+def _items(agent):
+    # Wyniki przepisów to te same obiekty, które trafiają do ekwipunku - ich zużycie też jest stanem
+    items = [recipe.result for recipe in agent.crafting.recipes.values()]
+    items.extend(item for item in agent.equipment.values() if item is not None and item not in items)
+    return items
+
+
+def _skills(agent):
+    return [skill for category in agent.skill_tree.skills.values() for skill in category.values()]
+
+
+class AgentState:
+    __slots__ = ("scalars", "extra", "copied", "lists", "dicts", "camp_level", "storage", "structures",
+                 "structure_durability", "items", "item_state", "skill_levels")
+
+    def __init__(self, agent):
+        self.scalars = _get_scalars(agent)
+        # Podklasy bez __slots__ (np. FixedPointAgent) trzymają część stanu w __dict__
+        self.extra = dict(agent.__dict__) if hasattr(agent, "__dict__") else None
+        self.copied = tuple(getattr(agent, name).copy() for name in COPIED_SLOTS)
+        self.lists = tuple(list(getattr(agent, name)) for name in LIST_SLOTS)
+        self.dicts = tuple(dict(getattr(agent, name)) for name in DICT_SLOTS)
+        camp = agent.camp
+        self.camp_level = camp["level"]
+        self.storage = camp["storage"].copy()
+        self.structures = tuple(camp["structures"])
+        self.structure_durability = tuple(structure.durability for structure in self.structures)
+        self.items = _items(agent)
+        self.item_state = [(item.durability, item.broken) for item in self.items]
+        self.skill_levels = array("b", [skill.level for skill in _skills(agent)])
+
+    def restore(self, agent):
+        for name, value in zip(SCALAR_SLOTS, self.scalars):
+            setattr(agent, name, value)
+        if self.extra is not None:
+            agent.__dict__.update(self.extra)
+        for name, value in zip(COPIED_SLOTS, self.copied):
+            setattr(agent, name, value.copy())
+        for name, value in zip(LIST_SLOTS, self.lists):
+            setattr(agent, name, list(value))
+        for name, value in zip(DICT_SLOTS, self.dicts):
+            setattr(agent, name, dict(value))
+        agent.camp = {"level": self.camp_level, "storage": self.storage.copy(), "structures": list(self.structures)}
+        for structure, durability in zip(self.structures, self.structure_durability):
+            structure.durability = durability
+        for item, (durability, broken) in zip(self.items, self.item_state):
+            item.durability = durability
+            item.broken = broken
+        for skill, level in zip(_skills(agent), self.skill_levels):
+            skill.level = level
+
+
+class WorldState:
+    """Stan węzłów surowców: (ilość, dni od wyczerpania, wyczerpany) na węzeł. Kafelki są stałe po generacji."""
+
+    __slots__ = ("nodes", "values")
+
+    def __init__(self, world_map):
+        self.nodes = tuple(world_map.resource_nodes)
+        values = array("i")
+        for node in self.nodes:
+            values.extend((node.current_amount, node.days_since_harvested, node.depleted))
+        self.values = values
+
+    def restore(self, world_map):
+        world_map.resource_nodes = list(self.nodes)
+        values = self.values
+        for i, node in enumerate(self.nodes):
+            node.current_amount = values[3 * i]
+            node.days_since_harvested = values[3 * i + 1]
+            node.depleted = bool(values[3 * i + 2])
+
+
+class SimulationSnapshot:
+    __slots__ = ("agent", "world", "fields", "rng")
+
+    def __init__(self, agent, world, fields, rng):
+        self.agent = agent
+        self.world = world
+        self.fields = fields
+        self.rng = rng
+
+
+def snapshot(simulation, include_rng=True):
+    """Migawka bieżącej próby. Bez include_rng przywrócenie nie cofa generatora random."""
+    return SimulationSnapshot(AgentState(simulation.agent), WorldState(simulation.world_map),
+                              _get_simulation(simulation), random.getstate() if include_rng else None)
+
+
+def restore(simulation, snap):
+    snap.agent.restore(simulation.agent)
+    snap.world.restore(simulation.world_map)
+    for name, value in zip(SIMULATION_FIELDS, snap.fields):
+        setattr(simulation, name, value)
+    if snap.rng is not None:
+        random.setstate(snap.rng)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Moduły gry są płaskie (import agent, import world), jak przy uruchomieniu z survival_2.0b
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,139 @@
+"""Zapis wiedzy: pełny plik + dziennik JSONL oraz baza SQLite po nieudanych zapisach."""
+import builtins
+import json
+import sqlite3
+
+import ai_system
+from ai_system import AIKnowledge, knowledge_log_filename
+from knowledge_db import SQLiteKnowledge
+
+
+def load(filename):
+    knowledge = AIKnowledge()
+    assert knowledge.load_from_file(filename)
+    return knowledge
+
+
+def test_log_events_are_replayed_once(tmp_path):
+    filename = str(tmp_path / "knowledge.json")
+    knowledge = AIKnowledge()
+    assert knowledge.save_to_file(filename)
+    knowledge.record_death(3, "głód")
+    knowledge.record_action(1, "eat", True, {"exp": 5})
+    assert knowledge.save_to_file(filename)
+
+    loaded = load(filename)
+    assert loaded.attempts == 1
+    assert loaded.death_days == [3]
+    assert loaded.successful_actions == {1: {"eat": {"count": 1, "exp": 5}}}
+
+
+def test_crash_before_log_truncate_does_not_double_count(tmp_path, monkeypatch):
+    filename = str(tmp_path / "knowledge.json")
+    log_filename = knowledge_log_filename(filename)
+    knowledge = AIKnowledge()
+    knowledge.save_to_file(filename)
+    knowledge.record_death(3, "głód")
+    knowledge.save_to_file(filename)
+    knowledge.record_death(5, "pragnienie")
+    knowledge.needs_compaction = True
+
+    # Awaria zaraz po os.replace: nowy pełny plik jest na dysku, stary dziennik nie został wyczyszczony
+    def crashing_open(file, mode="r", *args, **kwargs):
+        if file == log_filename and mode == "w":
+            raise OSError("awaria")
+        return builtins.open(file, mode, *args, **kwargs)
+
+    monkeypatch.setattr(ai_system, "open", crashing_open, raising=False)
+    assert not knowledge.save_to_file(filename)
+    monkeypatch.undo()
+
+    loaded = load(filename)
+    assert loaded.attempts == 2
+    assert loaded.death_days == [3, 5]
+
+    # Następny zapis jest pełny i dalej liczy każdą śmierć raz
+    knowledge.record_death(7, "zimno")
+    assert knowledge.save_to_file(filename)
+    knowledge.record_death(9, "wilk")
+    assert knowledge.save_to_file(filename)
+    assert load(filename).death_days == [3, 5, 7, 9]
+
+
+def test_log_from_another_compaction_is_skipped(tmp_path):
+    filename = str(tmp_path / "knowledge.json")
+    knowledge = AIKnowledge()
+    knowledge.save_to_file(filename)
+    knowledge.record_death(3, "głód")
+    knowledge.save_to_file(filename)
+
+    with open(knowledge_log_filename(filename), encoding="utf-8") as f:
+        header = json.loads(f.readline())
+    assert header == {"type": "log", "log_id": knowledge.log_id}
+
+    knowledge.compact(filename)
+    with open(knowledge_log_filename(filename), "w", encoding="utf-8") as f:
+        f.write(json.dumps(header) + "\n" + json.dumps({"type": "death", "day": 3, "cause": "głód"}) + "\n")
+    assert load(filename).death_days == [3]
+
+
+def test_torn_log_line_is_ignored(tmp_path):
+    filename = str(tmp_path / "knowledge.json")
+    knowledge = AIKnowledge()
+    knowledge.save_to_file(filename)
+    knowledge.record_death(3, "głód")
+    knowledge.save_to_file(filename)
+    with open(knowledge_log_filename(filename), "a", encoding="utf-8") as f:
+        f.write('{"type": "death", "da')
+    knowledge.record_death(5, "pragnienie")
+    knowledge.save_to_file(filename)
+    assert load(filename).death_days == [3, 5]
+
+
+def test_unlogged_knowledge_keeps_no_pending_changes():
+    knowledge = AIKnowledge(log_changes=False)
+    knowledge.record_death(3, "głód")
+    knowledge.record_action(1, "eat", True, {"exp": 5})
+    assert knowledge.pending_events == []
+    assert knowledge.pending_actions == {}
+    assert knowledge.death_days == [3]
+
+
+class FailingConnection:
+    """Połączenie SQLite, którego zapis liczników akcji zawodzi (transakcja jest już otwarta)."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
+
+    def executemany(self, sql, rows):
+        if "action_counts" in sql:
+            raise sqlite3.OperationalError("database is locked")
+        return self.connection.executemany(sql, rows)
+
+
+def test_sqlite_failed_write_is_retried(tmp_path, monkeypatch):
+    filename = str(tmp_path / "knowledge.db")
+    knowledge = SQLiteKnowledge(filename)
+    knowledge.record_death(3, "głód")
+    knowledge.record_action(1, "eat", True, {"exp": 5})
+
+    connection = knowledge.connection()
+    monkeypatch.setattr(knowledge, "connection", lambda: FailingConnection(connection))
+    assert not knowledge.save_to_file()
+    monkeypatch.undo()
+
+    # Wycofane zdarzenia są nadal widoczne i trafiają do bazy z następnym zapisem
+    assert knowledge.top_death_causes() == [("głód", 1)]
+    knowledge.record_death(5, "pragnienie")
+    assert knowledge.save_to_file()
+    knowledge.close()
+
+    loaded = SQLiteKnowledge(filename)
+    assert loaded.load_from_file()
+    assert loaded.attempts == 2
+    assert loaded.death_days == [3, 5]
+    assert loaded.action_counts(1) == {"eat": (1, 5)}
+    loaded.close()
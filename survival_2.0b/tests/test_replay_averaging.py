@@ -0,0 +1,49 @@
+"""Jedna aktualizacja na parę (stan, akcja) w paczce - powtórzenia z losowania ze zwracaniem się uśredniają."""
+import numpy as np
+import pytest
+
+from actions import Q_ACTIONS
+from ai_system import TIME_OF_DAY, QLearningSystem, encode_state, mean_td_errors, state_index
+from hogwild_training import Q_ACTION_IDS, SharedQLearningSystem, SharedQTable
+
+STATE = (1, 1, 1, TIME_OF_DAY[0], 0)
+NEXT_STATE = (2, 1, 1, TIME_OF_DAY[0], 0)
+
+
+def test_mean_td_errors_groups_duplicates():
+    rows, cols, means = mean_td_errors(np.array([0, 1, 0]), np.array([2, 0, 2]), np.array([1.0, 5.0, 3.0]), 4)
+    assert rows.tolist() == [0, 1]
+    assert cols.tolist() == [2, 0]
+    assert means.tolist() == [2.0, 5.0]
+
+
+def test_replay_single_death_moves_once():
+    q_learning = QLearningSystem(list(Q_ACTIONS))
+    # Śmierć kończy przebieg, więc od razu powtórka: paczka 32 losowań tego samego przejścia
+    q_learning.remember(STATE, "eat", -150.0, NEXT_STATE, done=True)
+    assert q_learning.q_table[STATE]["eat"] == pytest.approx(-150.0 * q_learning.learning_rate)
+
+
+def test_replay_averages_duplicate_rows():
+    q_learning = QLearningSystem(list(Q_ACTIONS), replay_every=10 ** 9)
+    for _ in range(4):
+        q_learning.remember(STATE, "eat", 10.0, NEXT_STATE)
+    q_learning.replay()
+    assert q_learning.q_table[STATE]["eat"] == pytest.approx(10.0 * q_learning.learning_rate)
+
+
+def test_hogwild_apply_averages_duplicate_rows():
+    table = SharedQTable(max_workers=1)
+    try:
+        q_learning = SharedQLearningSystem(list(Q_ACTIONS), table, seed=0)
+        row = state_index(encode_state(STATE))
+        next_row = state_index(encode_state(NEXT_STATE))
+        col = Q_ACTION_IDS["eat"]
+        rows = np.array([row] * 4)
+        q_learning._apply(rows, np.array([col] * 4), np.array([-150.0, -150.0, 0.0, 0.0]),
+                          np.array([next_row] * 4), np.array([True] * 4))
+        assert table.q_values[row, col] == pytest.approx(-75.0 * q_learning.learning_rate)
+        assert table.update_counts[0] == 1
+        del q_learning
+    finally:
+        table.close()
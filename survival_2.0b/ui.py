@@ -35,11 +35,11 @@ class UI:
             text = self.font_medium.render(stat, True, (255, 255, 255))
             self.screen.blit(text, (1025//2 - text.get_width()//2, y))
             y += 80
-        if self.game.knowledge.death_causes:
+        sorted_causes = self.game.knowledge.top_death_causes(4)
+        if sorted_causes:
             text = self.font_medium.render("Top przyczyny śmierci:", True, (255, 255, 0))
             self.screen.blit(text, (1025//2 - text.get_width()//2, y))
             y += 80
-            sorted_causes = sorted(self.game.knowledge.death_causes.items(), key=lambda x: x[1], reverse=True)[:4]
             for cause, count in sorted_causes:
                 text = self.font_small.render(f"{cause}: {count}x", True, (255, 0, 0))
                 self.screen.blit(text, (1025//2 - text.get_width()//2, y))
@@ -143,8 +143,8 @@ class UI:
         text = self.font_small.render("--- PRZEMYŚLENIA ---", True, (128, 0, 128))
         self.screen.blit(text, (15, y))
         y += 45
-        if self.agent.thoughts:
-            last_thought = self.agent.thoughts[-1]
+        last_thought = self.agent.thoughts.latest()
+        if last_thought:
             text = self.font_small.render(f"💭 {last_thought}"[:55], True, (144, 238, 144))
             self.screen.blit(text, (15, y))
             y += 40
@@ -153,7 +153,7 @@ class UI:
         text = self.font_small.render("--- LOG ---", True, (255, 255, 0))
         self.screen.blit(text, (15, y))
         y += 45
-        for entry in self.game.log[-self.game.max_log:]:
+        for entry in self.game.log:
             text = self.font_small.render(entry[:55], True, (255, 255, 255))
             self.screen.blit(text, (15, y))
             y += 40
@@ -0,0 +1,135 @@
+"""Wektorowe środowisko w stylu Gym nad symulacją przetrwania.
+
+    env = SurvivalVecEnv(num_envs=8)
+    obs = env.reset(seeds=range(8))
+    obs, rewards, dones, infos = env.step(action_ids)
+
+Obserwacje to zakodowane stany z QLearningSystem.get_state (N x STATE_SIZE, int16),
+a identyfikatory akcji indeksują Q_ACTIONS.
+"""
+import random
+
+import numpy as np
+
+from agent import Agent, Q_ACTIONS
+from ai_system import AIKnowledge, QLearningSystem, STATE_SIZE, encode_state
+from world import WorldMap, Pathfinder
+
+
+class SurvivalVecEnv:
+    def __init__(self, num_envs, delta_time=1 / 60, max_days=180):
+        self.num_envs = num_envs
+        self.delta_time = delta_time
+        self.max_days = max_days
+        self.actions = list(Q_ACTIONS)
+        # get_state nie zależy od tablicy Q - jedna instancja obsługuje wszystkie światy
+        self.state_encoder = QLearningSystem(list(self.actions), replay_capacity=1)
+
+        # Wiedza środowisk nie jest zapisywana - bez bufora zmian do dziennika
+        self.knowledge = [AIKnowledge(log_changes=False) for _ in range(num_envs)]
+        self.agents = [None] * num_envs
+        self.world_maps = [None] * num_envs
+        self.cooldowns = np.zeros(num_envs)
+        # Każdy świat ma własny stan generatora random, podmieniany na czas jego kroku
+        self.rng_states = [None] * num_envs
+
+    def reset(self, seeds=None):
+        if seeds is None:
+            # Bez ziaren każdy świat dostaje własne z globalnego random (które przy tym się przesuwa),
+            # więc światy się różnią, a kolejny reset() daje nowe
+            seeds = [random.getrandbits(64) for _ in range(self.num_envs)]
+        for i, seed in enumerate(seeds):
+            self._reset_env(i, seed)
+        return self._observations()
+
+    def step(self, action_ids):
+        observations = np.zeros((self.num_envs, STATE_SIZE), dtype=np.int16)
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        dones = np.zeros(self.num_envs, dtype=bool)
+        infos = []
+
+        for i, action_id in enumerate(action_ids):
+            saved_state = random.getstate()
+            random.setstate(self.rng_states[i])
+            try:
+                reward, done, info = self._step_env(i, int(action_id))
+                self.rng_states[i] = random.getstate()
+            finally:
+                random.setstate(saved_state)
+            if done:
+                # Jak w wektorowych środowiskach Gym: zakończony świat startuje od nowa od razu
+                info["terminal_observation"] = self._observe(i)
+                self._reset_env(i, None)
+            observations[i] = self._observe(i)
+            rewards[i] = reward
+            dones[i] = done
+            infos.append(info)
+        return observations, rewards, dones, infos
+
+    def _reset_env(self, i, seed):
+        saved_state = random.getstate()
+        if seed is None and self.rng_states[i] is None:
+            seed = random.getrandbits(64)
+        if seed is not None:
+            random.seed(seed)
+        else:
+            # Świat zakończony w step() startuje od nowa z własnego strumienia losowego
+            random.setstate(self.rng_states[i])
+        try:
+            world_map = WorldMap()
+            agent = Agent(self.knowledge[i], world_map, _discard_log, Pathfinder(world_map),
+                          q_learning=self.state_encoder, headless=True)
+            self.world_maps[i] = world_map
+            self.agents[i] = agent
+            self.cooldowns[i] = 0
+            self._advance_to_decision(i)
+            self.rng_states[i] = random.getstate()
+        finally:
+            random.setstate(saved_state)
+
+    def _step_env(self, i, action_id):
+        agent = self.agents[i]
+        world_map = self.world_maps[i]
+        action_key = self.actions[action_id]
+
+        success, result, new_delay = agent.execute_action(action_id, world_map)
+        reward = agent.reward_values.get(action_key, 0) if success else -10
+        if new_delay is None or new_delay <= 0:
+            new_delay = 0.1
+        self.cooldowns[i] = new_delay
+
+        self._advance_to_decision(i)
+        # result to events.Message - str(result) daje napis
+        info = {"day": agent.current_day, "success": success, "result": result}
+        if not agent.alive:
+            reward += agent.death_penalty()
+            self.knowledge[i].record_death(agent.current_day, agent.death_cause)
+            self.knowledge[i].analyze_death(agent)
+            info["death_cause"] = agent.death_cause
+            return reward, True, info
+        if agent.current_day >= self.max_days:
+            info["truncated"] = True
+            return reward, True, info
+        return reward, False, info
+
+    def _advance_to_decision(self, i):
+        # Tak jak Simulation.simulate_tick: agent decyduje, gdy minie cooldown i ma staminę
+        agent = self.agents[i]
+        world_map = self.world_maps[i]
+        while agent.alive and agent.current_day < self.max_days:
+            if self.cooldowns[i] <= 0 and agent.stamina > 5:
+                if agent.pending_skill_choice:
+                    agent.auto_choose_skill()
+                return
+            agent.update(self.delta_time, world_map)
+            self.cooldowns[i] -= self.delta_time
+
+    def _observe(self, i):
+        return encode_state(self.state_encoder.get_state(self.agents[i], self.world_maps[i]))
+
+    def _observations(self):
+        return np.array([self._observe(i) for i in range(self.num_envs)], dtype=np.int16)
+
+
+def _discard_log(message, *args, **kwargs):
+    pass
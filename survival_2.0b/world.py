@@ -1,6 +1,8 @@
 import random
 import heapq
 
+from events import Message
+
 class Pathfinder:
     def __init__(self, world_map):
         self.world_map = world_map
@@ -66,6 +68,10 @@ class CampStructure:
     def repair(self, amount):
         self.durability = min(self.durability + amount, self.max_durability)
 
+# Losowa ilość z jednego zbierania przed mnożnikiem narzędzia (Agent._act_find_resource)
+HARVEST_MIN = 1
+HARVEST_MAX = 3
+
 class ResourceNode:
     def __init__(self, resource_type, amount, x, y, respawn_days=3):
         self.type = resource_type
@@ -90,6 +96,11 @@ class ResourceNode:
             self.days_since_harvested = 0
         return actual
 
+    def expected_yield(self, multiplier):
+        """Średnia ilość z jednego zbierania przy danym mnożniku, ograniczona zapasem węzła."""
+        rolls = [int(roll * multiplier) for roll in range(HARVEST_MIN, HARVEST_MAX + 1)]
+        return min(sum(rolls) / len(rolls), self.current_amount)
+
     def update_day(self):
         if self.depleted:
             self.days_since_harvested += 1
@@ -183,17 +194,17 @@ class CraftingRecipe:
 
     def can_craft(self, agent, inventory):
         if agent.level < self.level_req:
-            return False, "Za niski poziom"
+            return False, Message("Za niski poziom")
         if agent.strength < self.str_req:
-            return False, f"Wymaga Siły: {self.str_req}"
+            return False, Message("Wymaga Siły: {}", self.str_req)
         if agent.dexterity < self.dex_req:
-            return False, f"Wymaga Zręczności: {self.dex_req}"
+            return False, Message("Wymaga Zręczności: {}", self.dex_req)
 
         for resource, amount in self.requirements.items():
             if inventory.get(resource, 0) < amount:
-                return False, f"Brak {resource}"
+                return False, Message("Brak {}", resource)
 
-        return True, "OK"
+        return True, Message("OK")
 
 class CraftingSystem:
     def __init__(self):